@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""Render a timed list of key triggers to a WAV file without an audio device.
+
+Usage:
+    python bounce.py triggers.txt mix.wav [--samplerate 48000] [--float]
+
+The trigger list is text with one ``<seconds> <key> [gain]`` line per
+trigger, or a JSON list of ``{"time": seconds, "key": "1"}`` objects.
+"""
+
+import argparse
+import logging
+import sys
+import os
+
+# Add the project root to the Python path
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+from src.config import Config
+from src.render import bounce, load_triggers
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Bounce key triggers to a WAV file.")
+    parser.add_argument('triggers', help="Trigger list (text or JSON)")
+    parser.add_argument('output', help="WAV file to write")
+    parser.add_argument('--config', help="Path to config.json (default: app config)")
+    parser.add_argument('--samplerate', type=int, help="Output sample rate in Hz")
+    parser.add_argument('--float', action='store_true', help="Write 32-bit float samples")
+    parser.add_argument('--blocksize', type=int, default=256, help="Mixer block size in frames")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s: %(message)s')
+
+    stats = bounce(
+        load_triggers(args.triggers),
+        args.output,
+        config=Config(args.config),
+        samplerate=args.samplerate,
+        float32=args.float,
+        blocksize=args.blocksize,
+    )
+    print(
+        f"Wrote {args.output}: {stats['seconds']:.2f}s of audio, "
+        f"decoded in {stats['load_seconds']:.3f}s, mixed in {stats['mix_seconds']:.3f}s "
+        f"({stats['realtime_factor']:.0f}x realtime)"
+    )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -23,6 +23,10 @@ fi
 echo "🧹 Cleaning previous builds..."
 rm -rf build dist
 
+# Pack the clips into one pre-decoded bank
+echo "🎵 Compiling clip bank..."
+python3 scripts/compile_bank.py
+
 # Build the app
 echo "⚙️  Building app bundle..."
 pyinstaller swampizz_mac.spec
@@ -23,6 +23,10 @@ Write-Host "🧹 Cleaning previous builds..." -ForegroundColor Yellow
 if (Test-Path "build") { Remove-Item -Recurse -Force "build" }
 if (Test-Path "dist") { Remove-Item -Recurse -Force "dist" }
 
+# Pack the clips into one pre-decoded bank
+Write-Host "🎵 Compiling clip bank..." -ForegroundColor Yellow
+python scripts\compile_bank.py
+
 # Build the exe
 Write-Host "⚙️  Building executable..." -ForegroundColor Yellow
 pyinstaller swampizz_windows.spec
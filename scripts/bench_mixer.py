@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Benchmark mixer CPU per block for many simultaneous voices.
+
+Usage:
+    python scripts/bench_mixer.py [--voices 32] [--blocksize 256] [--seconds 10] [--audit]
+
+Reports the time spent in Mixer.render() per block, with and without the
+master limiter, as a share of the block's real-time duration. With
+--audit, also checks with tracemalloc that steady-state blocks allocate
+nothing. Needs no audio device.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.audio import DEFAULT_LIMITER_SETTINGS, Mixer, Voice
+from src.rtaudit import DEFAULT_AUDIT_BLOCKS, audit_mixer
+
+
+def bench(voices: int, blocksize: int, seconds: float, samplerate: int, limiter: bool) -> tuple:
+    """Render ``seconds`` of ``voices`` looping noise voices.
+
+    Returns:
+        Tuple of (mean, p99) microseconds per block
+    """
+    rng = np.random.default_rng(0)
+    # Loud enough that the limiter is working the whole time
+    clip = (rng.standard_normal((samplerate, 2)) * 0.3).astype(np.float32)
+    mixer = Mixer(samplerate, 2, blocksize)
+    mixer.set_polyphony(max_voices=None)
+    mixer.set_master(1.0, dict(DEFAULT_LIMITER_SETTINGS) if limiter else None)
+
+    out = np.zeros((blocksize, 2), dtype=np.float32)
+    timings = []
+    for _ in range(int(seconds * samplerate / blocksize)):
+        while mixer.active_voices < voices:
+            # Stagger voices so they do not all end on the same block
+            voice = Voice(clip)
+            voice.position = int(rng.integers(0, len(clip)))
+            mixer.add_voice(voice)
+            mixer.render(out)
+        started = time.perf_counter()
+        mixer.render(out)
+        timings.append(time.perf_counter() - started)
+    timings = np.array(timings) * 1e6
+    return float(timings.mean()), float(np.percentile(timings, 99))
+
+
+def audit(voices: int, blocksize: int, samplerate: int) -> dict:
+    """Count allocations over steady-state blocks of ``voices`` long voices."""
+    rng = np.random.default_rng(0)
+    frames = (DEFAULT_AUDIT_BLOCKS + 200) * blocksize
+    clip = (rng.standard_normal((frames, 2)) * 0.3).astype(np.float32)
+    mixer = Mixer(samplerate, 2, blocksize)
+    mixer.set_polyphony(max_voices=None)
+    mixer.set_master(1.0, dict(DEFAULT_LIMITER_SETTINGS))
+    for i in range(voices):
+        mixer.add_voice(Voice(clip, start=i))
+    return audit_mixer(mixer)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark mixer CPU per block.")
+    parser.add_argument('--voices', type=int, default=32)
+    parser.add_argument('--blocksize', type=int, default=256)
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--samplerate', type=int, default=48000)
+    parser.add_argument('--audit', action='store_true', help="check steady-state blocks allocate nothing")
+    args = parser.parse_args()
+
+    budget_us = args.blocksize / args.samplerate * 1e6
+    print(f"{args.voices} voices, block {args.blocksize} @ {args.samplerate} Hz "
+          f"({budget_us:.0f} us per block)")
+    for limiter in (False, True):
+        mean, p99 = bench(args.voices, args.blocksize, args.seconds, args.samplerate, limiter)
+        print(f"  limiter {'on ' if limiter else 'off'}: mean {mean:7.1f} us "
+              f"({mean / budget_us:5.1%}), p99 {p99:7.1f} us ({p99 / budget_us:5.1%})")
+    if args.audit:
+        result = audit(args.voices, args.blocksize, args.samplerate)
+        print(f"  allocations: {result['allocating_calls']} of {result['calls']} blocks allocated "
+              f"(largest {result['max_bytes']} bytes)")
+        return 1 if result['allocating_calls'] else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -20,6 +20,10 @@ source venv/bin/activate
 echo "Installing dependencies..."
 pip install -r requirements.txt
 
+# Pack the clips into one pre-decoded bank
+echo "Compiling clip bank..."
+python scripts/compile_bank.py
+
 # Build with PyInstaller
 echo "Building application..."
 pyinstaller swampizz_mac.spec
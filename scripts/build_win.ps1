@@ -18,6 +18,10 @@ python -m venv venv
 Write-Host "Installing dependencies..."
 pip install -r requirements.txt
 
+# Pack the clips into one pre-decoded bank
+Write-Host "Compiling clip bank..."
+python scripts\compile_bank.py
+
 # Build with PyInstaller
 Write-Host "Building application..."
 pyinstaller swampizz_windows.spec
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Compile audio clips into one pre-decoded clip bank file.
+
+Usage:
+    python scripts/compile_bank.py [paths ...] [--output assets/audio.sizbank] [--samplerate 48000 ...]
+
+Decodes every clip (by default all supported files under assets/audio)
+once per sample rate into the engine's float32 format, measures its
+loudness, onset and waveform peaks, and packs everything into a single
+file with an index header. With ``audio.clip_bank`` pointing at the bank,
+the app maps that one file at startup and plays clips straight out of it
+instead of opening and decoding each source file.
+
+Without --samplerate, clips are rendered at ``audio.samplerate`` from
+config.json, or at both 44.1 and 48 kHz when that follows the device.
+Rebuild the bank whenever clips are added or changed.
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.audio import SUPPORTED_EXTENSIONS, AudioCache, write_clip_bank
+from src.config import Config
+
+# Rates rendered when the engine follows the device's default rate
+DEVICE_SAMPLERATES = (44100, 48000)
+
+
+def find_clips(paths: list) -> list:
+    """Expand files and folders into audio files under the project root.
+
+    Returns:
+        Sorted list of clip paths relative to the project root
+    """
+    root = Path(project_root)
+    found = set()
+    for name in paths:
+        path = Path(name) if Path(name).is_absolute() else root / name
+        if path.is_dir():
+            found.update(p for p in path.rglob('*') if p.suffix.lower() in SUPPORTED_EXTENSIONS)
+        elif path.is_file():
+            found.add(path)
+        else:
+            print(f"Skipping missing path: {name}", file=sys.stderr)
+    return sorted(p.resolve().relative_to(root).as_posix() for p in found)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compile audio clips into a clip bank.")
+    parser.add_argument('paths', nargs='*', default=['assets/audio'], help="clip files or folders")
+    parser.add_argument('--output', default='assets/audio.sizbank', help="bank file to write")
+    parser.add_argument('--samplerate', type=int, action='append', help="engine rate to render for (repeatable)")
+    args = parser.parse_args()
+
+    settings = Config().get_audio_settings()
+    samplerates = args.samplerate or ([settings['samplerate']] if settings.get('samplerate') else list(DEVICE_SAMPLERATES))
+    clips = find_clips(args.paths)
+    if not clips:
+        print("No clips found", file=sys.stderr)
+        return 1
+
+    started = time.perf_counter()
+    cache = AudioCache(budget_bytes=None)
+    # Whole clips only: the bank is mapped, so long clips cost no memory
+    cache.configure({'trim_silence_db': settings.get('trim_silence_db'), 'stream_threshold_bytes': None})
+    packed = []
+    try:
+        for samplerate in samplerates:
+            cache.set_samplerate(samplerate)
+            loaded = cache.preload_many(os.path.join(project_root, clip) for clip in clips)
+            for clip in clips:
+                decoded = loaded.get(os.path.join(project_root, clip))
+                if decoded is None:
+                    print(f"Could not decode {clip}", file=sys.stderr)
+                    return 1
+                packed.append((clip, decoded))
+
+        output = args.output if os.path.isabs(args.output) else os.path.join(project_root, args.output)
+        size = write_clip_bank(output, packed, cache.mixer.channels, settings.get('trim_silence_db'))
+    finally:
+        cache.stop_all()
+
+    rates = ', '.join(f"{rate} Hz" for rate in samplerates)
+    print(f"Wrote {output}: {len(clips)} clips at {rates}, "
+          f"{size / 1e6:.1f} MB in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,20 +3,25 @@
 __version__ = '1.0.0'
 __author__ = 'Swamp Izzo'
 
-from .app import main, SoundboardApp
-from .config import Config
-from .audio import play_audio, preload_audio
-from .hotkeys import start_hotkeys, stop_hotkeys, register_hotkey
-from .ui import SoundboardWindow
+# Exports are resolved on first use so headless tools (bounce.py, tests)
+# can import src.audio or src.render without Qt or a hotkey backend
+_EXPORTS = {
+    'main': '.app',
+    'SoundboardApp': '.app',
+    'Config': '.config',
+    'play_audio': '.audio',
+    'preload_audio': '.audio',
+    'start_hotkeys': '.hotkeys',
+    'stop_hotkeys': '.hotkeys',
+    'register_hotkey': '.hotkeys',
+    'SoundboardWindow': '.ui',
+}
 
-__all__ = [
-    'main',
-    'SoundboardApp',
-    'Config',
-    'play_audio',
-    'preload_audio',
-    'start_hotkeys',
-    'stop_hotkeys',
-    'register_hotkey',
-    'SoundboardWindow',
-]
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        import importlib
+        return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
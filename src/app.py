@@ -3,6 +3,7 @@
 import sys
 import os
 import logging
+import multiprocessing
 import time
 from pathlib import Path
 from PySide6.QtWidgets import QApplication, QLabel, QVBoxLayout, QWidget
@@ -14,7 +15,9 @@ try:
     from .config import Config
     from .ui import SoundboardWindow
     from .hotkeys import start_hotkeys, register_hotkey, stop_hotkeys
-    from .audio import play_audio, preload_audio, get_audio_cache
+    from .audio import play_audio, preload_audio, get_audio_cache, get_audio_engine, set_audio_engine
+    from .engine import EngineProcess
+    from .latency import get_latency_tracker
 except Exception:
     # Fallback for PyInstaller where relative imports don't resolve
     root_dir = Path(__file__).resolve().parent.parent
@@ -22,7 +25,9 @@ except Exception:
     from src.config import Config  # type: ignore
     from src.ui import SoundboardWindow  # type: ignore
     from src.hotkeys import start_hotkeys, register_hotkey, stop_hotkeys  # type: ignore
-    from src.audio import play_audio, preload_audio, get_audio_cache  # type: ignore
+    from src.audio import play_audio, preload_audio, get_audio_cache, get_audio_engine, set_audio_engine  # type: ignore
+    from src.engine import EngineProcess  # type: ignore
+    from src.latency import get_latency_tracker  # type: ignore
 
 # Setup logging to a user-writable location
 def _log_file_path() -> Path:
@@ -38,6 +43,20 @@ def _log_file_path() -> Path:
     except Exception:
         return Path('soundboard.log')
 
+def _cache_dir_path() -> Path:
+    """Directory for the decoded-audio cache, next to the log directory."""
+    try:
+        if sys.platform == 'darwin':
+            base = Path.home() / 'Library' / 'Caches' / 'SwampIzzo'
+        elif sys.platform.startswith('win'):
+            base = Path(os.environ.get('APPDATA', Path.home())) / 'SwampIzzo' / 'Cache'
+        else:
+            base = Path.home() / '.swamp_izzo' / 'cache'
+        base.mkdir(parents=True, exist_ok=True)
+        return base
+    except Exception:
+        return Path('cache')
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -92,6 +111,7 @@ class LoadingScreen(QWidget):
         font.setBold(True)
         label.setFont(font)
         label.setStyleSheet("color: white;")
+        self.label = label
         
         layout.addStretch()
         layout.addWidget(label)
@@ -99,6 +119,15 @@ class LoadingScreen(QWidget):
         
         # Center on screen
         self.move(100, 100)
+    
+    def set_progress(self, done: int, total: int):
+        """Show how many clips have been loaded.
+        
+        Args:
+            done: Clips loaded so far
+            total: Clips to load
+        """
+        self.label.setText(f"Loading Swamp Izzo...\n{done}/{total} clips")
 
 
 class SoundboardApp:
@@ -110,6 +139,24 @@ class SoundboardApp:
         self.config = Config()
         self.main_window = None
         self.loading_screen = None
+        self.engine = None
+        audio_settings = self.config.get_audio_settings()
+        key_settings = {key: self.config.get_key_config(key) for key in self.config.get_all_keys()}
+        cache_dir = _cache_dir_path() if audio_settings.get('disk_cache', True) else None
+        if audio_settings.get('engine_process'):
+            self.engine = EngineProcess(
+                audio_settings, key_settings,
+                str(cache_dir) if cache_dir else None, str(_log_file_path()),
+            )
+            if self.engine.start():
+                set_audio_engine(self.engine)
+                return
+            logger.warning("Falling back to in-process audio engine")
+            self.engine = None
+        get_audio_cache().configure(audio_settings)
+        get_audio_cache().configure_keys(key_settings)
+        if cache_dir is not None:
+            get_audio_cache().set_disk_cache(cache_dir)
     
     def show_loading_screen(self):
         """Display loading screen."""
@@ -136,20 +183,43 @@ class SoundboardApp:
         time.sleep(1.0)
     
     def preload_audio_assets(self):
-        """Preload all configured audio files."""
+        """Preload all configured audio files in parallel."""
         logger.info("Preloading audio assets")
+        audio_cache = get_audio_engine()
         
+        clip_paths = [self.config.get_startup_audio()]
         for key in self.config.get_all_keys():
             key_config = self.config.get_key_config(key)
             clips = key_config.get('clips', [])
-            
-            for clip_path in clips:
-                try:
-                    preload_audio(clip_path)
-                except Exception as e:
-                    logger.error(f"Error preloading {clip_path}: {e}")
+            audio_cache.pin(clips)
+            clip_paths.extend(clips)
+        
+        started = time.perf_counter()
+        try:
+            results = audio_cache.preload_many(clip_paths, progress=self._on_preload_progress)
+        except Exception as e:
+            logger.error(f"Error preloading audio: {e}")
+            return
+        
+        for clip_path, clip in results.items():
+            if not clip:
+                logger.error(f"Error preloading {clip_path}")
         
-        logger.info("Audio preloading complete")
+        logger.info(
+            f"Audio preloading complete: {len(results)} clips "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+    
+    def _on_preload_progress(self, done: int, total: int):
+        """Report preload progress on the loading screen.
+        
+        Args:
+            done: Clips loaded so far
+            total: Clips to load
+        """
+        if self.loading_screen:
+            self.loading_screen.set_progress(done, total)
+        self.app.processEvents()
     
     def setup_hotkeys(self):
         """Setup global hotkeys."""
@@ -231,12 +301,30 @@ class SoundboardApp:
         finally:
             # Cleanup
             stop_hotkeys()
-            get_audio_cache().stop_all()
+            if self.engine is not None:
+                stats = self.engine.stats() or {}
+                logger.info(f"Audio cache stats: {stats.get('cache')}")
+                if stats.get('backend') is not None:
+                    logger.info(f"Audio backend stats: {stats['backend']}")
+                latency = stats.get('latency', [])
+                set_audio_engine(None)
+                self.engine.stop_all()
+            else:
+                audio_cache = get_audio_cache()
+                logger.info(f"Audio cache stats: {audio_cache.stats()}")
+                if audio_cache.mixer.backend is not None:
+                    logger.info(f"Audio backend stats: {audio_cache.mixer.backend.stats()}")
+                latency = get_latency_tracker().format_summary()
+                audio_cache.stop_all()
+            for line in latency:
+                logger.info(f"Trigger latency: {line}")
             logger.info("Application shutdown complete")
 
 
 def main():
     """Entry point for the application."""
+    # Frozen builds re-run this entry point to start the engine process
+    multiprocessing.freeze_support()
     app = SoundboardApp()
     sys.exit(app.run())
 
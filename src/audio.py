@@ -1,37 +1,1230 @@
 """Audio playback with caching for low-latency cross-platform support."""
 
 import logging
+from concurrent.futures import CancelledError, Future, InvalidStateError, ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+from collections import OrderedDict, deque
 import threading
-import queue
 import time
-import wave
-import io
+import json
+import mmap
+import os
+import struct
 import sys
 
-try:
-    import simpleaudio as sa
-    SIMPLEAUDIO_AVAILABLE = True
-except ImportError:
-    SIMPLEAUDIO_AVAILABLE = False
+from .backends import (
+    DEFAULT_MAX_BLOCKSIZE,
+    DEFAULT_MIN_BLOCKSIZE,
+    OutputBackend,
+    create_backend,
+    default_output_samplerate,
+)
+from .diskcache import DiskCache
+from .sharedbank import SharedBank
+from .dsp import (
+    ENVELOPE_WINDOW_FRAMES,
+    LOUDNESS_ABSOLUTE_GATE,
+    Limiter,
+    PeakPyramid,
+    Resampler,
+    analyze_loudness,
+    find_onset,
+    resample,
+    rms_envelope,
+)
+from .latency import Trace, get_latency_tracker
 
 try:
-    import sounddevice as sd
     import numpy as np
-    SOUNDDEVICE_AVAILABLE = True
+    NUMPY_AVAILABLE = True
 except ImportError:
-    SOUNDDEVICE_AVAILABLE = False
+    NUMPY_AVAILABLE = False
+
+try:
+    import soundfile as sf
+    SOUNDFILE_AVAILABLE = True
+except (ImportError, OSError):
+    # OSError is raised when the libsndfile shared library is missing
+    SOUNDFILE_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# Formats the decoder layer understands; WAV is parsed natively, the rest
+# go through soundfile (libsndfile >= 1.1 for MP3)
+SUPPORTED_EXTENSIONS = ('.wav', '.mp3', '.flac', '.ogg')
+
+# Threads used to decode clips in the background
+DEFAULT_DECODE_WORKERS = os.cpu_count() or 4
+
+# Default memory budget for decoded clips (bytes)
+DEFAULT_CACHE_BUDGET_BYTES = 256 * 1024 * 1024
+
+# WAV files at least this large are memory-mapped instead of read
+DEFAULT_MMAP_THRESHOLD_BYTES = 1024 * 1024
+
+# Clips whose decoded size reaches this are streamed instead of cached
+DEFAULT_STREAM_THRESHOLD_BYTES = 16 * 1024 * 1024
+
+# Source frames decoded per read, and mixer-rate frames buffered ahead,
+# by a streaming voice
+STREAM_CHUNK_FRAMES = 4096
+STREAM_BUFFER_FRAMES = 4 * STREAM_CHUNK_FRAMES
+
+# Clip bank file written by scripts/compile_bank.py: a header, a JSON
+# index, then each clip's float32 samples, RMS envelope and peak pyramid
+# at 64-byte aligned offsets
+CLIP_BANK_MAGIC = b'SIZPACK1'
+_CLIP_BANK_HEADER = struct.Struct('<8sIIQ')  # magic, engine channels, entries, index bytes
+_CLIP_BANK_ALIGN = 64
+
+# WAV format tags
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# Output format of the shared mixer stream
+DEFAULT_SAMPLERATE = 44100
+DEFAULT_CHANNELS = 2
+DEFAULT_BLOCKSIZE = 256
+
+# Polyphony: which voice is stopped when a limit is reached
+STEAL_OLDEST = 'oldest'
+STEAL_QUIETEST = 'quietest'
+STEAL_RETRIGGER = 'retrigger'
+STEAL_POLICIES = (STEAL_OLDEST, STEAL_QUIETEST, STEAL_RETRIGGER)
+DEFAULT_MAX_VOICES = 32
+
+# Quantized triggering: tempo, and the grid's note value (4 = quarter
+# notes, 16 = sixteenth notes)
+DEFAULT_BPM = 120.0
+DEFAULT_QUANTIZE_GRID = 16
+
+# Loudness normalization: most a clip is boosted, and the true peak a
+# boost may push a clip to (dBTP)
+DEFAULT_NORMALIZE_MAX_GAIN_DB = 12.0
+NORMALIZE_PEAK_CEILING_DB = -1.0
+
+# Level below which leading frames count as silence and are skipped, in
+# dBFS; the default when silence trimming is enabled without a threshold
+DEFAULT_TRIM_SILENCE_DB = -60.0
+
+# Ramps applied when a voice starts and when it is stopped or stolen
+DEFAULT_FADE_IN_MS = 0.0
+DEFAULT_FADE_OUT_MS = 10.0
+
+# Master bus limiter defaults
+DEFAULT_LIMITER_SETTINGS = {
+    'ceiling_db': -1.0,
+    'lookahead_ms': 2.0,
+    'release_ms': 100.0,
+}
+
+
+class Voice:
+    """A single playing instance of a clip inside the mixer.
+
+    While a voice is past its attack, not stopping, and its next block
+    lies wholly inside the clip, the mixer reads it by gathering through
+    a preallocated array of frame indices that is advanced in place (see
+    begin_gather()), so steady playback allocates nothing per block.
+    """
+
+    # In-memory voices can be read by index gather
+    gatherable = True
+
+    def __init__(
+        self,
+        samples: 'np.ndarray',
+        gain: float = 1.0,
+        key: Optional[str] = None,
+        envelope: Optional['np.ndarray'] = None,
+        start: int = 0,
+    ):
+        """Create a voice.
+
+        Args:
+            samples: float32 samples shaped (frames, channels)
+            gain: Linear gain applied while mixing
+            key: Pad that triggered the voice, for per-key voice limits
+            envelope: Coarse RMS envelope of ``samples`` (see
+                dsp.rms_envelope), used to find the quietest voice
+            start: Frame of ``samples`` playback begins at
+        """
+        self.samples = samples
+        self.gain = gain
+        self.key = key
+        self.envelope = envelope
+        self._position = start
+        # Latency trace finished when the first block is rendered
+        self.trace = None
+        # Mixer frame the voice is scheduled to start on (None for the
+        # next block), and the frames of silence before it in its first
+        # block once admitted
+        self.at = None
+        self.delay = 0
+        # Fade state kept by the mixer: frames mixed so far, whether a
+        # release was requested, and how much of the release ramp is done
+        self.mixed = 0
+        self.stopping = False
+        self.released = 0
+        # Gather state: the array to take from and its axis, the frame
+        # indices of the next block (for a mono clip on a wider bus, one
+        # column per bus channel into the flattened samples), the step
+        # between blocks, the last index and the clip length as 0-d
+        # arrays, and whether the next block is wholly inside the clip
+        self.gathering = False
+        self.source = None
+        self.take_axis = None
+        self.sample_index = None
+        self.index_step = None
+        self.last_index = None
+        self.end = None
+        self.in_range = None
+        self.gain_array = None
+        self._gather_start = 0
+
+    @property
+    def position(self) -> int:
+        """Next frame of ``samples`` to be mixed."""
+        if self.gathering:
+            return int(self.sample_index.flat[0])
+        return self._position
+
+    @position.setter
+    def position(self, value: int) -> None:
+        self.gathering = False
+        self._position = value
+
+    def begin_gather(self, frames: int, channels: int) -> bool:
+        """Switch to gather reads of ``frames``-frame blocks.
+
+        Args:
+            frames: Mixer block size
+            channels: Mixer channel count
+
+        Returns:
+            True if the voice is now gathering; False if it cannot, or
+            its next block would run past the end of the clip
+        """
+        samples = self.samples
+        start = self._position
+        if (
+            not self.gatherable
+            or start + frames > len(samples)
+            or samples.dtype != np.float32
+            or not samples.flags.c_contiguous
+        ):
+            return False
+        # Whole rows when the clip is as wide as the bus; a mono clip is
+        # read from its flattened samples with each index repeated
+        shape = (frames,) if samples.shape[1] == channels else (frames, channels)
+        if self.sample_index is None or self.sample_index.shape != shape:
+            if len(shape) == 1:
+                self.source, self.take_axis = samples, 0
+            else:
+                self.source, self.take_axis = samples.reshape(-1), None
+            self.sample_index = np.empty(shape, dtype=np.intp)
+            self.index_step = np.array(frames, dtype=np.intp)
+            self.last_index = self.sample_index.reshape(-1)[-1:].reshape(())
+            self.end = np.array(len(samples), dtype=np.intp)
+            self.in_range = np.ones((), dtype=bool)
+            self.gain_array = np.array(self.gain, dtype=np.float32)
+        rows = np.arange(start, start + frames, dtype=np.intp)
+        self.sample_index[:] = rows if len(shape) == 1 else rows[:, None]
+        self._gather_start = start
+        self.gathering = True
+        return True
+
+    def end_gather(self) -> None:
+        """Return to slice reads from the current position."""
+        if self.gathering:
+            position = self.position
+            self.mixed += position - self._gather_start
+            self.position = position
+
+    @property
+    def finished(self) -> bool:
+        """True once every frame has been mixed."""
+        return self.position >= len(self.samples)
+
+    def read(self, frames: int) -> 'np.ndarray':
+        """Take up to ``frames`` frames for the next block and advance.
+
+        A chunk shorter than ``frames`` means the voice ended (or, for a
+        streaming voice, ran dry) partway through the block.
+        """
+        start = self.position
+        chunk = self.samples[start:start + frames]
+        self.position = start + len(chunk)
+        return chunk
+
+    @property
+    def level(self) -> float:
+        """Approximate current output level, for quietest-voice stealing."""
+        if self.envelope is None or len(self.envelope) == 0:
+            return self.gain
+        window = min(self.position // ENVELOPE_WINDOW_FRAMES, len(self.envelope) - 1)
+        return self.gain * float(self.envelope[window])
+
+    def stop(self) -> None:
+        """Fade the voice out; the mixer drops it when the release ends."""
+        self.end_gather()
+        self.stopping = True
+
+    def kill(self) -> None:
+        """End the voice at once, without a release."""
+        self.position = len(self.samples)
+
+
+class StreamingVoice(Voice):
+    """A voice that decodes its file in chunks while it plays.
+
+    A background thread reads the file with soundfile, converts each chunk
+    to the mixer's rate and channel count, and writes it into a small ring
+    buffer that the stream callback drains. Only STREAM_BUFFER_FRAMES
+    frames are held in memory however long the file is, and playback can
+    start as soon as the first chunk is decoded.
+    """
+
+    gatherable = False
+
+    def __init__(
+        self,
+        file_path: str,
+        samplerate: int,
+        channels: int,
+        gain: float = 1.0,
+        key: Optional[str] = None,
+    ):
+        """Open a file for streaming and decode its first chunk.
+
+        Args:
+            file_path: Path of a file soundfile can read
+            samplerate: Mixer output rate
+            channels: Mixer channel count
+            gain: Linear gain applied while mixing
+            key: Pad that triggered the voice, for per-key voice limits
+
+        Raises:
+            Exception: If the file cannot be opened or decoded
+        """
+        super().__init__(None, gain, key)
+        self.path = file_path
+        self._file = sf.SoundFile(file_path)
+        self._resampler = None
+        if self._file.samplerate != samplerate:
+            source_channels = 1 if self._file.channels == 1 else channels
+            self._resampler = Resampler(self._file.samplerate, samplerate, source_channels)
+        self._channels = channels
+        self._ring = np.zeros((STREAM_BUFFER_FRAMES, channels), dtype=np.float32)
+        # Single producer, single consumer: the decoder thread only moves
+        # _written and the callback only moves _read
+        self._written = 0
+        self._read = 0
+        self._eof = False
+        self._stopped = False
+        self._space = threading.Event()
+
+        self._decode_chunk()
+        self._thread = threading.Thread(
+            target=self._decode_loop, name='audio-stream', daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def finished(self) -> bool:
+        """True once the file is exhausted and drained, or on kill()."""
+        return self._stopped or (self._eof and self._read == self._written)
+
+    def read(self, frames: int) -> 'np.ndarray':
+        """Take buffered frames, stopping at the ring's end or an underrun."""
+        start = self._read
+        n = min(frames, self._written - start)
+        offset = start % STREAM_BUFFER_FRAMES
+        n = min(n, STREAM_BUFFER_FRAMES - offset)
+        chunk = self._ring[offset:offset + n]
+        self._read = start + n
+        self.position += n
+        self._space.set()
+        return chunk
+
+    def kill(self) -> None:
+        """End the voice and let the decoder thread exit."""
+        self._stopped = True
+        self._space.set()
+
+    def _decode_loop(self) -> None:
+        try:
+            while not self._stopped and not self._eof:
+                if STREAM_BUFFER_FRAMES - (self._written - self._read) < STREAM_BUFFER_FRAMES // 2:
+                    self._space.wait(0.05)
+                    self._space.clear()
+                    continue
+                self._decode_chunk()
+        except Exception as e:
+            logger.error(f"Error streaming {self.path}: {e}")
+            self._eof = True
+        finally:
+            self._file.close()
+
+    def _decode_chunk(self) -> None:
+        """Decode one chunk of the file into the ring buffer."""
+        block = self._file.read(STREAM_CHUNK_FRAMES, dtype='float32', always_2d=True)
+        final = len(block) < STREAM_CHUNK_FRAMES
+        block = _match_channels(block, self._channels)
+        if self._resampler is not None:
+            block = self._resampler.process(block, final=final)
+        self._write(block)
+        if final:
+            self._eof = True
+
+    def _write(self, block: 'np.ndarray') -> None:
+        done = 0
+        while done < len(block) and not self._stopped:
+            free = STREAM_BUFFER_FRAMES - (self._written - self._read)
+            if free == 0:
+                self._space.wait(0.05)
+                self._space.clear()
+                continue
+            offset = self._written % STREAM_BUFFER_FRAMES
+            n = min(len(block) - done, free, STREAM_BUFFER_FRAMES - offset)
+            self._ring[offset:offset + n] = block[done:done + n]
+            done += n
+            self._written += n
+
+
+class Mixer:
+    """One long-lived output stream that mixes any number of voices.
+
+    Triggers only enqueue a Voice. The output backend pulls blocks with
+    render(), which picks up pending voices at the start of each block and
+    sums all active voices into the output buffer, so overlapping pads
+    overlap instead of cutting each other off and the device is never
+    reopened per press.
+
+    The mixer also keeps the audio clock: the number of frames rendered
+    so far. A voice queued for a given clock frame starts exactly on that
+    frame, at its offset inside the block that contains it, however late
+    or early the triggering thread ran.
+    """
+
+    def __init__(
+        self,
+        samplerate: int = DEFAULT_SAMPLERATE,
+        channels: int = DEFAULT_CHANNELS,
+        blocksize: int = DEFAULT_BLOCKSIZE,
+        backend: Optional[OutputBackend] = None,
+    ):
+        self.samplerate = samplerate
+        self.channels = channels
+        self.blocksize = blocksize
+        # (min, max) block size the backend may adapt between, or None
+        self.adaptive_blocksize: Optional[tuple] = None
+        self.backend = backend
+        # Triggers append and render() pops: deque operations are atomic,
+        # so the handoff takes no lock and allocates nothing when empty
+        self._pending: deque = deque()
+        self._voices: List[Voice] = []
+        # Voices waiting for a clock frame past the current block
+        self._scheduled: List[Voice] = []
+        # Frames rendered so far, advanced after every block. An in-place
+        # add on a 0-d array allocates, so the sum goes to a spare array
+        # and the two are swapped
+        self._clock = np.zeros((), dtype=np.int64)
+        self._next_clock = np.zeros((), dtype=np.int64)
+        self._clock_step = np.zeros((), dtype=np.int64)
+        self._clear_requested = False
+        self._lock = threading.Lock()
+        self.max_voices = DEFAULT_MAX_VOICES
+        self.steal_policy = STEAL_OLDEST
+        self._key_limits: Dict[str, tuple] = {}
+        self.master_gain = 1.0
+        self._master = np.ones((), dtype=np.float32)
+        self.limiter: Optional[Limiter] = None
+        # (attack, release) ramp tables, replaced as one tuple so a block
+        # never mixes an old attack with a new release
+        self._fade_tables = (np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.float32))
+        # Per-block scratch, sized on the first block of each block size
+        self._frames = 0
+        self._scratch = None
+
+    @property
+    def running(self) -> bool:
+        """True while the output backend is pulling blocks."""
+        return self.backend is not None and self.backend.running
+
+    @property
+    def active_voices(self) -> int:
+        """Number of voices mixed in the last block."""
+        return len(self._voices)
+
+    def playhead(self, key: str) -> Optional[float]:
+        """Where the newest playing voice of a key is within its clip.
+
+        Safe to call from any thread; the answer may be a block behind.
+
+        Args:
+            key: Pad whose voice to look at
+
+        Returns:
+            Fraction of the clip played (0 to 1), or None if no in-memory
+            voice of the key is playing
+        """
+        voices = self._voices
+        for index in range(len(voices) - 1, -1, -1):
+            voice = voices[index]
+            if voice.key == key and voice.samples is not None and not voice.stopping:
+                frames = len(voice.samples)
+                return min(voice.position / frames, 1.0) if frames else 1.0
+        return None
+
+    @property
+    def clock(self) -> int:
+        """Frames rendered since the mixer was created (the audio clock)."""
+        return int(self._clock)
+
+    @property
+    def earliest_frame(self) -> int:
+        """First clock frame a voice queued now is sure to start on.
+
+        render() may be partway through the block starting at the clock,
+        past the point where it picks up new voices, so a voice queued
+        now can only be relied on to start after that block.
+        """
+        return int(self._clock) + self._frames
+
+    @property
+    def latency(self) -> int:
+        """Frames the master bus delays the mix by (the limiter look-ahead)."""
+        limiter = self.limiter
+        return limiter.lookahead if limiter is not None else 0
+
+    def start(self) -> bool:
+        """Start the output backend if it is not running yet.
+
+        Without a backend set, the default one is created (see
+        backends.create_backend).
+
+        Returns:
+            True if the backend is running
+        """
+        with self._lock:
+            if self.backend is None:
+                self.backend = create_backend()
+            return self.backend.start(self)
+
+    def set_blocksize(
+        self,
+        blocksize: int = DEFAULT_BLOCKSIZE,
+        adaptive: bool = False,
+        min_blocksize: int = DEFAULT_MIN_BLOCKSIZE,
+        max_blocksize: int = DEFAULT_MAX_BLOCKSIZE,
+    ) -> None:
+        """Set the frames rendered per block.
+        
+        A running backend is closed and restarts with the new size on the
+        next trigger.
+        
+        Args:
+            blocksize: Frames per block; smaller means lower latency
+            adaptive: Let the backend shrink the block size while it has
+                headroom and grow it after repeated xruns (see
+                backends.BlocksizeController)
+            min_blocksize: Smallest adaptive block size
+            max_blocksize: Largest adaptive block size
+        """
+        adaptive_blocksize = (int(min_blocksize), int(max_blocksize)) if adaptive else None
+        if int(blocksize) == self.blocksize and adaptive_blocksize == self.adaptive_blocksize:
+            return
+        self.close()
+        self.blocksize = int(blocksize)
+        self.adaptive_blocksize = adaptive_blocksize
+    
+    def set_backend(self, backend: OutputBackend) -> None:
+        """Replace the output backend; it starts on the next trigger."""
+        self.close()
+        self.backend = backend
+
+    def close(self, fade: bool = True) -> None:
+        """Stop the output backend, ending every voice.
+        
+        Args:
+            fade: Let playing voices finish their release ramp before the
+                backend stops, so closing does not click
+        """
+        with self._lock:
+            backend = self.backend
+        release = self._fade_tables[1]
+        if fade and backend is not None and backend.running and release.size:
+            self.clear()
+            # Release ramp, limiter delay and a couple of blocks of slack
+            frames = len(release) + self.latency + 2 * self.blocksize
+            deadline = time.monotonic() + frames / self.samplerate + 0.05
+            while (self._clear_requested or self._voices) and time.monotonic() < deadline:
+                time.sleep(0.002)
+            time.sleep((self.latency + self.blocksize) / self.samplerate)
+        if backend is not None:
+            backend.close()
+        # The backend no longer renders, so the voice list is ours
+        for voice in self._voices + self._scheduled:
+            voice.kill()
+        self._voices = []
+        self._scheduled = []
+        self._drain_pending(discard=True)
+
+    def set_polyphony(
+        self,
+        max_voices: Optional[int] = DEFAULT_MAX_VOICES,
+        steal_policy: str = STEAL_OLDEST,
+        key_limits: Optional[Dict[str, tuple]] = None,
+    ) -> None:
+        """Bound the number of simultaneous voices.
+        
+        Args:
+            max_voices: Global voice limit, or None/0 for unlimited
+            steal_policy: Voice stopped to make room once the global limit
+                is reached: 'oldest', 'quietest', or 'retrigger' (oldest
+                voice of the triggering key first)
+            key_limits: Per-key (max_voices, steal_policy) tuples; with
+                'retrigger' every voice of the key is choked
+        """
+        limits = {}
+        for key, (key_max, key_policy) in (key_limits or {}).items():
+            if key_max:
+                limits[key] = (int(key_max), _check_policy(key_policy))
+        self.steal_policy = _check_policy(steal_policy)
+        self.max_voices = int(max_voices) if max_voices else None
+        self._key_limits = limits
+
+    def set_master(self, gain: float = 1.0, limiter: Optional[Dict[str, float]] = None) -> None:
+        """Configure the master bus.
+        
+        Args:
+            gain: Linear gain applied to the summed voices
+            limiter: Limiter settings (ceiling_db, lookahead_ms, release_ms),
+                or None to disable the limiter
+        """
+        self.master_gain = float(gain)
+        self._master = np.array(self.master_gain, dtype=np.float32)
+        if limiter is None:
+            self.limiter = None
+        else:
+            self.limiter = Limiter(self.samplerate, self.channels, **limiter)
+
+    def set_fades(self, fade_in_ms: float = 0.0, fade_out_ms: float = 0.0) -> None:
+        """Set the ramps that start and stop voices without clicks.
+        
+        Both are half-cosine tables computed here once; render() only
+        multiplies by them in the blocks a voice is fading in or out. The
+        new pair is published in one assignment and render() reads it
+        once per block, so this is safe to call during playback.
+        
+        Args:
+            fade_in_ms: Attack ramp at the start of every voice
+            fade_out_ms: Release ramp when a voice is stopped or stolen
+        """
+        attack = _ramp(int(round(fade_in_ms * self.samplerate / 1000.0)))
+        release = _ramp(int(round(fade_out_ms * self.samplerate / 1000.0)))[::-1].copy()
+        self._fade_tables = (attack, release)
+    
+    def add_voice(self, voice: Voice, at: Optional[int] = None) -> None:
+        """Queue a voice.
+
+        Args:
+            voice: Voice to play
+            at: Clock frame to start on (see clock and earliest_frame);
+                None starts it at the next block boundary. A frame the
+                clock has already passed starts at the next block too.
+        """
+        voice.at = at
+        self._pending.append(voice)
+
+    def clear(self) -> None:
+        """Release active voices and drop pending and scheduled ones at the next block."""
+        self._clear_requested = True
+
+    def render(self, out: 'np.ndarray') -> None:
+        """Mix one block of every active voice into ``out``.
+
+        Runs on the audio thread, so it takes no locks and does not log.
+        A block where every voice is gathering (see Voice.begin_gather)
+        allocates no Python objects: it only runs ufuncs into ``out`` and
+        preallocated scratch. Voices starting, fading or ending, and
+        streaming voices, take the general path, which may allocate.
+
+        Args:
+            out: float32 buffer shaped (frames, channels), overwritten
+        """
+        frames = len(out)
+        if frames != self._frames:
+            self._prepare(out)
+        out.fill(0.0)
+
+        if self._clear_requested:
+            self._clear_requested = False
+            for voice in self._voices:
+                voice.stop()
+            for voice in self._scheduled:
+                voice.kill()
+            self._scheduled = []
+            self._drain_pending(discard=True)
+        if self._pending:
+            self._drain_pending()
+        if self._scheduled:
+            self._admit_scheduled(frames)
+
+        voices = self._voices
+        scratch = self._scratch
+        fade_tables = self._fade_tables
+        attack_frames = len(fade_tables[0])
+        any_finished = False
+        # Indexed loop: iterating the list would allocate an iterator
+        count = len(voices)
+        i = 0
+        while i < count:
+            voice = voices[i]
+            i += 1
+            if voice.gathering:
+                voice.source.take(voice.sample_index, voice.take_axis, scratch, 'clip')
+                if voice.gain != 1.0:
+                    np.multiply(scratch, voice.gain_array, out=scratch)
+                np.add(out, scratch, out=out)
+                np.add(voice.sample_index, voice.index_step, out=voice.sample_index)
+                np.less(voice.last_index, voice.end, out=voice.in_range)
+                if not voice.in_range:
+                    voice.end_gather()
+                continue
+
+            self._mix_voice(out, voice, fade_tables)
+            if voice.finished:
+                any_finished = True
+            elif not voice.stopping and voice.mixed >= attack_frames:
+                voice.begin_gather(frames, scratch.shape[1])
+
+        if any_finished:
+            self._voices = [v for v in voices if not v.finished]
+
+        if self.master_gain != 1.0:
+            np.multiply(out, self._master, out=out)
+        limiter = self.limiter
+        if limiter is not None:
+            limiter.process(out)
+        np.add(self._clock, self._clock_step, out=self._next_clock)
+        self._clock, self._next_clock = self._next_clock, self._clock
+
+    def _prepare(self, out: 'np.ndarray') -> None:
+        """Allocate the per-block scratch for blocks shaped like ``out``."""
+        self._frames = len(out)
+        self._clock_step[()] = self._frames
+        self._scratch = np.empty_like(out, dtype=np.float32)
+        for voice in self._voices:
+            voice.end_gather()
+
+    def _mix_voice(self, out: 'np.ndarray', voice: Voice, fade_tables: tuple) -> None:
+        """Mix one block of a voice that is not gathering, with its ramps."""
+        attack, release = fade_tables
+        release_frames = len(release)
+        # A scheduled voice starts partway into its first block
+        filled = voice.delay
+        voice.delay = 0
+        todo = len(out)
+        if voice.stopping:
+            todo = min(todo, filled + release_frames - voice.released)
+        while filled < todo:
+            chunk = voice.read(todo - filled)
+            n = len(chunk)
+            if n == 0:
+                break
+            if voice.mixed < len(attack) or voice.stopping:
+                self._mix_ramped(out[filled:filled + n], chunk, voice, attack, release)
+            elif voice.gain != 1.0:
+                out[filled:filled + n] += chunk * voice.gain
+            else:
+                out[filled:filled + n] += chunk
+            voice.mixed += n
+            filled += n
+        if voice.stopping and voice.released >= release_frames:
+            voice.kill()
+        if voice.trace is not None:
+            voice.trace.finish()
+            voice.trace = None
+
+    def _mix_ramped(
+        self,
+        dest: 'np.ndarray',
+        chunk: 'np.ndarray',
+        voice: Voice,
+        attack: 'np.ndarray',
+        release: 'np.ndarray',
+    ) -> None:
+        """Mix a chunk that overlaps the voice's attack or release ramp."""
+        n = len(chunk)
+        ramp = np.full(n, voice.gain, dtype=np.float32)
+        if voice.mixed < len(attack):
+            m = min(n, len(attack) - voice.mixed)
+            ramp[:m] *= attack[voice.mixed:voice.mixed + m]
+        if voice.stopping:
+            ramp *= release[voice.released:voice.released + n]
+            voice.released += n
+        dest += chunk * ramp[:, None]
+
+    def _drain_pending(self, discard: bool = False) -> None:
+        pending = self._pending
+        while pending:
+            voice = pending.popleft()
+            if discard:
+                voice.kill()
+            elif voice.at is not None:
+                self._scheduled.append(voice)
+            else:
+                self._admit(voice)
+
+    def _admit_scheduled(self, frames: int) -> None:
+        """Start the scheduled voices whose frame falls in this block.
+
+        Voice limits are applied as each voice starts, so a choke or
+        steal lands on the grid with the voice that causes it.
+        """
+        start = int(self._clock)
+        waiting = []
+        for voice in sorted(self._scheduled, key=lambda v: v.at):
+            if voice.at < start + frames:
+                voice.delay = max(voice.at - start, 0)
+                self._admit(voice)
+            else:
+                waiting.append(voice)
+        self._scheduled = waiting
+
+    def _admit(self, voice: Voice) -> None:
+        """Start a voice, stealing others to respect the voice limits.
+
+        Voices already fading out no longer count towards the limits.
+        """
+        limits = self._key_limits.get(voice.key) if voice.key is not None else None
+        if limits is not None:
+            key_max, key_policy = limits
+            same_key = [v for v in self._voices if v.key == voice.key and not (v.finished or v.stopping)]
+            if len(same_key) >= key_max:
+                if key_policy == STEAL_RETRIGGER:
+                    self._steal(same_key, STEAL_OLDEST, len(same_key))
+                else:
+                    self._steal(same_key, key_policy, len(same_key) - key_max + 1)
+
+        if self.max_voices:
+            live = [v for v in self._voices if not (v.finished or v.stopping)]
+            excess = len(live) - self.max_voices + 1
+            if excess > 0:
+                policy = self.steal_policy
+                if policy == STEAL_RETRIGGER:
+                    # Oldest voices of the same key first, then oldest overall
+                    live.sort(key=lambda v: v.key != voice.key or voice.key is None)
+                    policy = STEAL_OLDEST
+                self._steal(live, policy, excess)
+
+        self._voices.append(voice)
+
+    def _steal(self, candidates: List[Voice], policy: str, count: int) -> None:
+        if policy == STEAL_QUIETEST:
+            candidates = sorted(candidates, key=lambda v: v.level)
+        for voice in candidates[:count]:
+            voice.stop()
+
+
+def _ramp(frames: int) -> 'np.ndarray':
+    """Rising half-cosine ramp of ``frames`` values strictly between 0 and 1."""
+    phase = (np.arange(frames) + 0.5) / max(frames, 1)
+    return (0.5 - 0.5 * np.cos(np.pi * phase)).astype(np.float32)
+
+
+def _check_policy(policy: str) -> str:
+    if policy in STEAL_POLICIES:
+        return policy
+    logger.warning(f"Unknown steal policy {policy!r}, using {STEAL_OLDEST!r}")
+    return STEAL_OLDEST
+
+
+def _match_channels(samples: 'np.ndarray', channels: int) -> 'np.ndarray':
+    """Shape (frames, ch) samples so they sum into a ``channels`` wide bus.
+
+    Mono stays (frames, 1) and is broadcast by the mixer.
+    """
+    have = samples.shape[1]
+    if have == channels or have == 1:
+        return samples
+    if channels == 1:
+        return samples.mean(axis=1, keepdims=True, dtype=np.float32)
+    if have > channels:
+        return samples[:, :channels]
+    padded = np.zeros((len(samples), channels), dtype=np.float32)
+    padded[:, :have] = samples
+    return padded
+
+
+def _read_wav_layout(buf) -> Optional[tuple]:
+    """Walk the RIFF chunks of a WAV image without copying it.
+
+    Args:
+        buf: bytes-like object or mmap holding the whole file
+
+    Returns:
+        Tuple of (format_tag, channels, framerate, bits_per_sample,
+        block_align, data_offset, data_size), or None if not a WAV file
+    """
+    if len(buf) < 12 or buf[0:4] != b'RIFF' or buf[8:12] != b'WAVE':
+        return None
+    fmt = None
+    pos = 12
+    while pos + 8 <= len(buf):
+        chunk_id = buf[pos:pos + 4]
+        size = struct.unpack_from('<I', buf, pos + 4)[0]
+        body = pos + 8
+        if chunk_id == b'fmt ':
+            tag, channels, framerate, _, block_align, bits = struct.unpack_from(
+                '<HHIIHH', buf, body
+            )
+            if tag == WAVE_FORMAT_EXTENSIBLE and size >= 26:
+                # Sub-format GUID starts with the real format tag
+                tag = struct.unpack_from('<H', buf, body + 24)[0]
+            fmt = (tag, channels, framerate, bits, block_align)
+        elif chunk_id == b'data' and fmt is not None:
+            return fmt + (body, min(size, len(buf) - body))
+        pos = body + size + (size & 1)
+    return None
+
+
+def _open_wav_map(file_path: str) -> Optional[tuple]:
+    """Memory-map a WAV file and locate its chunks.
+
+    Returns:
+        Tuple of (mmap, layout) as returned by _read_wav_layout, or None
+    """
+    with open(file_path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    layout = _read_wav_layout(mm)
+    if layout is None:
+        mm.close()
+        return None
+    return mm, layout
+
+
+def _map_wav(file_path: str) -> Optional[tuple]:
+    """Memory-map a float32 WAV file and view its data chunk in place.
+
+    Only 32-bit float data is already in the engine format; anything else
+    returns None so the caller falls back to decoding.
+
+    Returns:
+        Tuple of (samples view shaped (frames, channels), framerate)
+    """
+    opened = _open_wav_map(file_path)
+    if opened is None:
+        return None
+    mm, (tag, channels, framerate, bits, block_align, offset, size) = opened
+    if tag != WAVE_FORMAT_IEEE_FLOAT or bits != 32 or block_align != channels * 4:
+        mm.close()
+        return None
+    frames = size // block_align
+    samples = np.frombuffer(mm, dtype='<f4', count=frames * channels, offset=offset)
+    return samples.reshape(frames, channels), framerate
+
+
+def _pcm_to_float32(buf, offset: int, size: int, format_tag: int, bits: int, channels: int) -> Optional['np.ndarray']:
+    """Convert interleaved WAV sample data to the engine's float32 format.
+
+    Integer PCM maps to [-1, 1): 8-bit data is unsigned and re-centred,
+    24-bit data is widened to int32 by placing each 3-byte sample in the
+    top of a 4-byte word. Every conversion is a handful of whole-array
+    numpy operations reading straight from ``buf``.
+
+    Args:
+        buf: bytes-like object or mmap holding the data chunk
+        offset: Byte offset of the sample data in ``buf``
+        size: Byte length of the sample data
+        format_tag: WAVE_FORMAT_PCM or WAVE_FORMAT_IEEE_FLOAT
+        bits: Bits per sample
+        channels: Interleaved channel count
+
+    Returns:
+        float32 samples shaped (frames, channels), or None if unsupported
+    """
+    width = bits // 8
+    if width == 0 or channels == 0:
+        return None
+    count = size // (width * channels) * channels
+
+    if format_tag == WAVE_FORMAT_IEEE_FLOAT and bits in (32, 64):
+        raw = np.frombuffer(buf, dtype=f'<f{width}', count=count, offset=offset)
+        samples = raw.astype(np.float32)
+    elif format_tag == WAVE_FORMAT_PCM and bits == 8:
+        raw = np.frombuffer(buf, dtype=np.uint8, count=count, offset=offset)
+        samples = raw.astype(np.float32)
+        samples -= 128.0
+        samples *= 1.0 / 128.0
+    elif format_tag == WAVE_FORMAT_PCM and bits == 16:
+        raw = np.frombuffer(buf, dtype='<i2', count=count, offset=offset)
+        samples = raw.astype(np.float32)
+        samples *= 1.0 / 32768.0
+    elif format_tag == WAVE_FORMAT_PCM and bits == 24:
+        raw = np.frombuffer(buf, dtype=np.uint8, count=count * 3, offset=offset)
+        widened = np.zeros((count, 4), dtype=np.uint8)
+        widened[:, 1:] = raw.reshape(count, 3)
+        samples = widened.view('<i4').ravel().astype(np.float32)
+        samples *= 1.0 / 2147483648.0
+    elif format_tag == WAVE_FORMAT_PCM and bits == 32:
+        raw = np.frombuffer(buf, dtype='<i4', count=count, offset=offset)
+        samples = raw.astype(np.float32)
+        samples *= 1.0 / 2147483648.0
+    else:
+        return None
+    return samples.reshape(-1, channels)
+
+
+class Clip:
+    """Decoded, ready-to-play PCM for one audio file.
+
+    ``samples`` is a read-only float32 array shaped (frames, channels)
+    already in the mixer's rate and channel layout, so a trigger only has
+    to wrap it in a Voice. ``mapped`` clips view a memory-mapped file or
+    the shared sample bank instead of owning heap memory. ``loudness``
+    holds the measurements of dsp.analyze_loudness, computed once when the
+    clip is loaded. ``onset`` is the first audible frame; voices of
+    trimmed keys start there, while ``samples`` itself always keeps the
+    leading silence. ``peaks`` is the dsp.PeakPyramid pads draw the
+    clip's waveform from.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        samples: 'np.ndarray',
+        samplerate: int,
+        mapped: bool = False,
+        loudness: Optional[Dict[str, float]] = None,
+        onset: int = 0,
+        peaks: Optional[PeakPyramid] = None,
+        envelope: Optional['np.ndarray'] = None,
+    ):
+        self.path = path
+        self.samples = samples
+        self.samplerate = samplerate
+        self.mapped = mapped
+        self.envelope = envelope if envelope is not None else rms_envelope(samples)
+        self.loudness = loudness if loudness is not None else analyze_loudness(samples, samplerate)
+        self.onset = onset
+        self.peaks = peaks if peaks is not None else PeakPyramid.from_samples(samples)
+
+    @property
+    def channels(self) -> int:
+        """Number of channels in ``samples``."""
+        return self.samples.shape[1]
+
+    @property
+    def frames(self) -> int:
+        """Number of frames in ``samples``."""
+        return self.samples.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        """Heap memory held by the samples; mapped files count as zero."""
+        return 0 if self.mapped else self.samples.nbytes
+
+
+class ClipBank:
+    """Pre-decoded clips packed into one memory-mapped file.
+    
+    The bank is opened and mapped once; every clip in it is then a
+    zero-copy view of the mapping, already in the engine's format, with
+    its load-time analysis, envelope and peak pyramid stored next to it,
+    so loading a clip reads none of its samples. Clips are
+    listed by their path relative to the assets root (e.g.
+    ``assets/audio/snare/snare_1.mp3``), once per sample rate they were
+    compiled for; AudioCache resamples the nearest of them for engines at
+    other rates. Source files are not checked: recompile the bank after
+    changing them.
+    """
+    
+    def __init__(self, bank_path: str):
+        """Map a bank file and read its index.
+        
+        Args:
+            bank_path: File written by write_clip_bank()
+            
+        Raises:
+            ValueError: If the file is not a clip bank
+        """
+        self.path = str(bank_path)
+        with open(bank_path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, channels, count, index_bytes = _CLIP_BANK_HEADER.unpack_from(self._map, 0)
+        if magic != CLIP_BANK_MAGIC:
+            self._map.close()
+            raise ValueError(f"Not a clip bank: {bank_path}")
+        self.channels = channels
+        start = _CLIP_BANK_HEADER.size
+        entries = json.loads(self._map[start:start + index_bytes])
+        if len(entries) != count:
+            self._map.close()
+            raise ValueError(f"Truncated clip bank index: {bank_path}")
+        self._entries: Dict[tuple, Dict[str, Any]] = {
+            (entry['path'], entry['samplerate']): entry for entry in entries
+        }
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def paths(self) -> List[str]:
+        """Relative paths of the clips in the bank."""
+        return sorted({path for path, _ in self._entries})
+    
+    def has(self, path: str, samplerate: int) -> bool:
+        """Whether the bank holds ``path`` rendered at ``samplerate``."""
+        return (path, samplerate) in self._entries
+    
+    def samplerates(self, path: str) -> List[int]:
+        """Sample rates the bank holds ``path`` rendered at."""
+        return sorted(rate for name, rate in self._entries if name == path)
+    
+    def get(self, path: str, samplerate: int) -> Optional[tuple]:
+        """View a clip in the bank.
+        
+        Args:
+            path: Clip path relative to the assets root, with / separators
+            samplerate: Engine sample rate
+            
+        Returns:
+            Tuple of (read-only float32 samples, RMS envelope, PeakPyramid,
+            metadata dict with the clip's analysis), or None if the bank
+            lacks the clip at this rate
+        """
+        entry = self._entries.get((path, samplerate))
+        if entry is None:
+            return None
+        frames, channels = entry['frames'], entry['channels']
+        samples = np.frombuffer(self._map, dtype='<f4', count=frames * channels, offset=entry['offset'])
+        envelope = np.frombuffer(self._map, dtype='<f4', count=entry['envelope_values'], offset=entry['envelope_offset'])
+        peaks = np.frombuffer(self._map, dtype='<f4', count=entry['peak_buckets'] * 2, offset=entry['peaks_offset'])
+        return samples.reshape(frames, channels), envelope, PeakPyramid(peaks.reshape(-1, 2), frames), entry
+
+
+def write_clip_bank(
+    bank_path: str,
+    clips: Iterable[tuple],
+    channels: int = DEFAULT_CHANNELS,
+    trim_silence_db: Optional[float] = None,
+) -> int:
+    """Pack decoded clips into a bank file for ClipBank.
+    
+    Args:
+        bank_path: File to write; replaced atomically
+        clips: (relative path, Clip) pairs; a path may appear once per
+            sample rate
+        channels: Engine channel count the clips were rendered for; mono
+            clips stay mono
+        trim_silence_db: Threshold the clips' onsets were found with
+        
+    Returns:
+        Number of bytes written
+    """
+    def aligned(offset: int) -> int:
+        return -(-offset // _CLIP_BANK_ALIGN) * _CLIP_BANK_ALIGN
+    
+    clips = list(clips)
+    # Offsets depend on the index size and the index lists the offsets, so
+    # lay the data out after a first, generous estimate of the index
+    entries = []
+    for path, clip in clips:
+        if clip.channels not in (1, channels):
+            raise ValueError(f"{path} has {clip.channels} channels, expected 1 or {channels}")
+        entries.append({
+            'path': path,
+            'samplerate': clip.samplerate,
+            'frames': clip.frames,
+            'channels': clip.channels,
+            'offset': 0,
+            'envelope_offset': 0,
+            'envelope_values': len(clip.envelope),
+            'peaks_offset': 0,
+            'peak_buckets': len(clip.peaks.data),
+            'loudness': clip.loudness,
+            'onset': {'threshold_db': trim_silence_db, 'frame': clip.onset},
+        })
+    index_bytes = len(json.dumps(entries).encode('utf-8')) + 40 * len(entries) + 64
+    offset = aligned(_CLIP_BANK_HEADER.size + index_bytes)
+    for entry, (_, clip) in zip(entries, clips):
+        entry['offset'] = offset
+        offset = aligned(offset + clip.samples.nbytes)
+        entry['envelope_offset'] = offset
+        offset = aligned(offset + clip.envelope.nbytes)
+        entry['peaks_offset'] = offset
+        offset = aligned(offset + clip.peaks.data.nbytes)
+    index = json.dumps(entries).encode('utf-8')
+    index += b' ' * (index_bytes - len(index))
+    
+    tmp_path = f"{bank_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(_CLIP_BANK_HEADER.pack(CLIP_BANK_MAGIC, channels, len(entries), index_bytes))
+        f.write(index)
+        for entry, (_, clip) in zip(entries, clips):
+            arrays = (
+                (entry['offset'], clip.samples),
+                (entry['envelope_offset'], clip.envelope),
+                (entry['peaks_offset'], clip.peaks.data),
+            )
+            for start, array in arrays:
+                f.seek(start)
+                f.write(np.ascontiguousarray(array, dtype='<f4').tobytes())
+        f.truncate(offset)
+    os.replace(tmp_path, bank_path)
+    return offset
+
 
 class AudioCache:
-    """Cache audio data to avoid reload lag."""
+    """Cache decoded audio to avoid reload and re-parse lag.
+    
+    Clips are kept in least-recently-used order and evicted once their
+    total size exceeds the memory budget. Pinned clips (the ones bound to
+    the current pads) are never evicted.
+    """
     
-    def __init__(self):
-        self._cache: Dict[str, bytes] = {}
+    def __init__(self, budget_bytes: Optional[int] = DEFAULT_CACHE_BUDGET_BYTES):
+        # Keyed by (resolved path, sample rate) so each output rate is
+        # rendered once and switching back to a previous rate is free
+        self._cache: 'OrderedDict[tuple, Clip]' = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._budget_bytes = budget_bytes
+        self._cached_bytes = 0
+        self._pinned: Set[str] = set()
+        self._mmap_threshold = DEFAULT_MMAP_THRESHOLD_BYTES
+        self._stream_threshold = DEFAULT_STREAM_THRESHOLD_BYTES
+        self._stream_decisions: Dict[tuple, bool] = {}
+        self._disk_cache: Optional[DiskCache] = None
+        self._shared_bank: Optional[SharedBank] = None
+        self._clip_bank: Optional[ClipBank] = None
+        self._clip_bank_root: Optional[Path] = None
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
         self._running = True
+        self.mixer = Mixer()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._decode_workers = DEFAULT_DECODE_WORKERS
+        self._polyphony = (DEFAULT_MAX_VOICES, STEAL_OLDEST)
+        self._key_limits: Dict[str, tuple] = {}
+        self._key_gains: Dict[str, float] = {}
+        self._master = (1.0, dict(DEFAULT_LIMITER_SETTINGS))
+        self._fades = (DEFAULT_FADE_IN_MS, DEFAULT_FADE_OUT_MS)
+        self._normalize_lufs: Optional[float] = None
+        self._normalize_max_gain_db = DEFAULT_NORMALIZE_MAX_GAIN_DB
+        self._trim_silence_db: Optional[float] = None
+        self._untrimmed_keys: Set[str] = set()
+        self._quantize = False
+        self._bpm = DEFAULT_BPM
+        self._quantize_grid = DEFAULT_QUANTIZE_GRID
+        self._quantized_keys: Dict[str, bool] = {}
+        self._pending_loads: Dict[tuple, Future] = {}
+        self._pending_lock = threading.Lock()
+        self._apply_mix_settings()
     
     def _resolve_path(self, file_path: str) -> Path:
         """Resolve relative paths to absolute within app bundle or project.
@@ -39,166 +1232,990 @@ class AudioCache:
         p = Path(file_path)
         if p.is_absolute():
             return p
-        # Resolve against PyInstaller temp dir when frozen, else project root
+        return (self._asset_root() / p).resolve()
+    
+    @staticmethod
+    def _asset_root() -> Path:
+        """PyInstaller temp dir when frozen, else the project root."""
         if getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS'):
-            base = Path(getattr(sys, '_MEIPASS'))
-        else:
-            base = Path(__file__).resolve().parent.parent
-        return (base / p).resolve()
+            return Path(getattr(sys, '_MEIPASS'))
+        return Path(__file__).resolve().parent.parent
 
-    def load_audio_file(self, file_path: str) -> bytes:
-        """Load audio file into cache.
+    def load_audio_file(self, file_path: str) -> Optional[Clip]:
+        """Load and decode an audio file into the cache.
+        
+        Loads are single-flight: if another thread (or the worker pool) is
+        already decoding the same file, this waits for that decode instead
+        of starting a second one.
+        
+        Args:
+            file_path: Path to a WAV, MP3, FLAC or OGG file
+            
+        Returns:
+            Cached Clip, or None if the file could not be loaded
+        """
+        key = self._cache_key(file_path)
+        
+        clip = self._lookup(key)
+        if clip is not None:
+            return clip
+        
+        future, owner = self._claim_load(key)
+        if owner:
+            self._run_load(key, future)
+        try:
+            return future.result()
+        except CancelledError:
+            return None
+    
+    def configure(self, settings: Dict[str, Any]) -> None:
+        """Apply engine settings from the ``audio`` section of config.json.
         
         Args:
-            file_path: Path to WAV file
+            settings: Audio settings dictionary
+        """
+        if 'samplerate' in settings:
+            self.set_samplerate(settings['samplerate'])
+        if 'cache_budget_bytes' in settings:
+            self.set_budget(settings['cache_budget_bytes'])
+        if 'mmap_threshold_bytes' in settings:
+            self._mmap_threshold = settings['mmap_threshold_bytes']
+        if 'backend' in settings or 'backend_file' in settings or 'stream_latency' in settings:
+            self.mixer.set_backend(create_backend(
+                settings.get('backend'), settings.get('backend_file'), settings.get('stream_latency'),
+            ))
+        if any(name in settings for name in ('blocksize', 'adaptive_blocksize', 'min_blocksize', 'max_blocksize')):
+            self.mixer.set_blocksize(
+                settings.get('blocksize') or DEFAULT_BLOCKSIZE,
+                bool(settings.get('adaptive_blocksize', False)),
+                settings.get('min_blocksize') or DEFAULT_MIN_BLOCKSIZE,
+                settings.get('max_blocksize') or DEFAULT_MAX_BLOCKSIZE,
+            )
+        if 'stream_threshold_bytes' in settings:
+            self._stream_threshold = settings['stream_threshold_bytes']
+            self._stream_decisions.clear()
+        if settings.get('decode_workers'):
+            self._decode_workers = int(settings['decode_workers'])
+        if 'max_voices' in settings or 'steal_policy' in settings:
+            self._polyphony = (
+                settings.get('max_voices', DEFAULT_MAX_VOICES),
+                settings.get('steal_policy', STEAL_OLDEST),
+            )
+            self._apply_mix_settings()
+        if 'master_gain' in settings or 'limiter' in settings:
+            self._master = (settings.get('master_gain', 1.0), self._limiter_settings(settings))
+            self._apply_mix_settings()
+        if 'fade_in_ms' in settings or 'fade_out_ms' in settings:
+            self._fades = (
+                float(settings.get('fade_in_ms', DEFAULT_FADE_IN_MS)),
+                float(settings.get('fade_out_ms', DEFAULT_FADE_OUT_MS)),
+            )
+            self._apply_mix_settings()
+        if 'normalize_lufs' in settings:
+            target = settings['normalize_lufs']
+            self._normalize_lufs = float(target) if target is not None else None
+        if 'normalize_max_gain_db' in settings:
+            self._normalize_max_gain_db = float(settings['normalize_max_gain_db'])
+        if 'trim_silence_db' in settings:
+            self.set_trim_threshold(settings['trim_silence_db'])
+        if any(name in settings for name in ('quantize', 'bpm', 'quantize_grid')):
+            self.set_quantize(
+                bool(settings.get('quantize', False)),
+                settings.get('bpm') or DEFAULT_BPM,
+                settings.get('quantize_grid') or DEFAULT_QUANTIZE_GRID,
+            )
+        if 'shared_bank' in settings:
+            self.set_shared_bank(settings['shared_bank'])
+        if 'clip_bank' in settings:
+            self.set_clip_bank(settings['clip_bank'])
+    
+    @staticmethod
+    def _limiter_settings(settings: Dict[str, Any]) -> Optional[Dict[str, float]]:
+        if not settings.get('limiter', True):
+            return None
+        return {
+            name: float(settings.get(f'limiter_{name}', default))
+            for name, default in DEFAULT_LIMITER_SETTINGS.items()
+        }
+    
+    def configure_keys(self, keys: Dict[str, Dict[str, Any]]) -> None:
+        """Apply per-key playback settings from the ``keys`` section.
+        
+        Args:
+            keys: Mapping of key identifier to its config dictionary
+        """
+        self._key_limits = {
+            key: (key_config.get('max_voices'), key_config.get('steal_policy', STEAL_OLDEST))
+            for key, key_config in keys.items()
+            if key_config.get('max_voices')
+        }
+        self._key_gains = {
+            key: float(key_config['gain'])
+            for key, key_config in keys.items()
+            if 'gain' in key_config
+        }
+        self._untrimmed_keys = {
+            key for key, key_config in keys.items()
+            if not key_config.get('trim_silence', True)
+        }
+        self._quantized_keys = {
+            key: bool(key_config['quantize'])
+            for key, key_config in keys.items()
+            if 'quantize' in key_config
+        }
+        self._apply_mix_settings()
+    
+    def key_gain(self, key: Optional[str]) -> float:
+        """Linear gain configured for a key (1.0 if none)."""
+        return self._key_gains.get(key, 1.0) if key is not None else 1.0
+    
+    def set_quantize(
+        self,
+        enabled: bool,
+        bpm: float = DEFAULT_BPM,
+        grid: int = DEFAULT_QUANTIZE_GRID,
+    ) -> bool:
+        """Set the tempo grid quantized triggers snap to.
+        
+        Args:
+            enabled: Quantize every key that does not set ``quantize``
+                itself
+            bpm: Tempo in beats (quarter notes) per minute
+            grid: Note value of the grid lines, e.g. 16 for sixteenths
             
         Returns:
-            Raw audio bytes
+            True if the settings were applied
+        """
+        if bpm <= 0 or grid <= 0:
+            logger.error(f"Invalid tempo grid: {bpm} BPM, 1/{grid} notes")
+            return False
+        self._quantize = bool(enabled)
+        self._bpm = float(bpm)
+        self._quantize_grid = grid
+        return True
+    
+    def quantizes(self, key: Optional[str]) -> bool:
+        """True if triggers of ``key`` wait for the next grid line."""
+        if key is not None and key in self._quantized_keys:
+            return self._quantized_keys[key]
+        return self._quantize
+    
+    def grid_frames(self, samplerate: Optional[int] = None) -> float:
+        """Frames between grid lines at ``samplerate`` (default: the mixer's)."""
+        samplerate = samplerate or self.mixer.samplerate
+        return samplerate * 60.0 / self._bpm * 4.0 / self._quantize_grid
+    
+    def quantize_frame(self, frame: int, key: Optional[str] = None, samplerate: Optional[int] = None) -> int:
+        """Frame a trigger of ``key`` at ``frame`` starts on.
+        
+        Quantized keys move to the next grid line, counted from frame 0
+        and rounded to the nearest frame, so the grid never drifts;
+        other keys keep ``frame``.
+        """
+        if not self.quantizes(key):
+            return frame
+        step = self.grid_frames(samplerate)
+        return int(round(-(-frame // step) * step))
+    
+    def _grid_frame(self, key: Optional[str]) -> Optional[int]:
+        """Mixer clock frame a live trigger of ``key`` is scheduled for.
+        
+        Returns:
+            The next grid line the mixer can still reach, or None to
+            start at the next block
+        """
+        if not self.quantizes(key):
+            return None
+        return self.quantize_frame(self.mixer.earliest_frame, key)
+    
+    def set_trim_threshold(self, threshold_db: Optional[float]) -> None:
+        """Set the level leading silence is trimmed below.
+        
+        Onsets of clips already in the cache are found again right away;
+        the scan only reads each clip's leading silence.
+        
+        Args:
+            threshold_db: Threshold in dBFS, or None to play clips from
+                their first frame
+        """
+        threshold_db = float(threshold_db) if threshold_db is not None else None
+        if threshold_db == self._trim_silence_db:
+            return
+        self._trim_silence_db = threshold_db
+        with self._cache_lock:
+            clips = list(self._cache.values())
+        for clip in clips:
+            clip.onset = self._find_onset(clip.samples)
+    
+    def start_frame(self, clip: Clip, key: Optional[str] = None) -> int:
+        """Frame a voice of ``clip`` triggered by ``key`` starts at.
+        
+        Leading silence is skipped unless the key sets ``trim_silence``
+        to false, which plays the clip exactly as recorded.
+        """
+        if key is not None and key in self._untrimmed_keys:
+            return 0
+        return clip.onset
+    
+    def _find_onset(self, samples: 'np.ndarray') -> int:
+        if self._trim_silence_db is None:
+            return 0
+        return find_onset(samples, self._trim_silence_db)
+    
+    def _analyze(self, samples: 'np.ndarray', samplerate: int, meta: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Load-time analysis of a clip, reusing results stored in ``meta``.
+        
+        Returns:
+            Dictionary with 'loudness' (see dsp.analyze_loudness) and
+            'onset' (threshold_db and the first audible frame)
+        """
+        meta = meta or {}
+        loudness = meta.get('loudness') or analyze_loudness(samples, samplerate)
+        onset = meta.get('onset')
+        if not onset or onset.get('threshold_db') != self._trim_silence_db:
+            onset = {'threshold_db': self._trim_silence_db, 'frame': self._find_onset(samples)}
+        return {'loudness': loudness, 'onset': onset}
+    
+    @staticmethod
+    def _new_clip(
+        file_path: str,
+        samples: 'np.ndarray',
+        samplerate: int,
+        analysis: Dict[str, Any],
+        mapped: bool = False,
+        peaks: Optional[PeakPyramid] = None,
+        envelope: Optional['np.ndarray'] = None,
+    ) -> Clip:
+        return Clip(
+            file_path, samples, samplerate, mapped=mapped,
+            loudness=analysis['loudness'], onset=analysis['onset']['frame'], peaks=peaks, envelope=envelope,
+        )
+    
+    def normalization_gain(self, clip: Clip) -> float:
+        """Linear gain that brings a clip to the ``normalize_lufs`` target.
+        
+        Boosts are capped at ``normalize_max_gain_db`` and so the clip's
+        true peak stays at or below NORMALIZE_PEAK_CEILING_DB; cuts are
+        not limited. Returns 1.0 when normalization is off or the clip is
+        silent.
+        
+        Args:
+            clip: Loaded clip
+        """
+        target = self._normalize_lufs
+        loudness = clip.loudness
+        if target is None or not loudness or loudness['lufs'] <= LOUDNESS_ABSOLUTE_GATE:
+            return 1.0
+        gain_db = target - loudness['lufs']
+        if gain_db > 0:
+            gain_db = min(
+                gain_db,
+                self._normalize_max_gain_db,
+                max(0.0, NORMALIZE_PEAK_CEILING_DB - loudness['true_peak_db']),
+            )
+        return float(10.0 ** (gain_db / 20.0))
+    
+    def _apply_mix_settings(self, mixer: Optional[Mixer] = None) -> None:
+        mixer = mixer or self.mixer
+        max_voices, steal_policy = self._polyphony
+        mixer.set_polyphony(max_voices, steal_policy, self._key_limits)
+        master_gain, limiter = self._master
+        mixer.set_master(master_gain, limiter)
+        mixer.set_fades(*self._fades)
+    
+    def offline_mixer(self, blocksize: int = DEFAULT_BLOCKSIZE) -> Mixer:
+        """Create a Mixer for rendering without an output device.
+        
+        It matches the live mixer's rate, channels, voice limits and master
+        bus; call render() on it directly instead of start().
+        
+        Args:
+            blocksize: Frames per render() call when the caller does not
+                choose its own buffer size
+        """
+        mixer = Mixer(self.mixer.samplerate, self.mixer.channels, blocksize)
+        self._apply_mix_settings(mixer)
+        return mixer
+    
+    def set_samplerate(self, samplerate: Optional[int]) -> None:
+        """Change the engine's output sample rate.
+        
+        Clips are resampled to the new rate once, on their next load;
+        renders for earlier rates stay cached until evicted, so switching
+        back costs nothing.
+        
+        Args:
+            samplerate: Output rate in Hz, or None for the device default
         """
-        file_path = str(self._resolve_path(file_path))
+        samplerate = int(samplerate or default_output_samplerate(DEFAULT_SAMPLERATE))
+        if samplerate == self.mixer.samplerate:
+            return
+        self.mixer.close()
+        self.mixer.samplerate = samplerate
+        self._apply_mix_settings()
+        logger.info(f"Audio output rate set to {samplerate} Hz")
+    
+    def set_disk_cache(self, cache_dir: Optional[Path]) -> None:
+        """Enable the persistent decoded-audio cache.
         
-        if file_path in self._cache:
-            logger.debug(f"Audio cache hit: {file_path}")
-            return self._cache[file_path]
+        Args:
+            cache_dir: Directory for cache entries, or None to disable
+        """
+        if cache_dir is None:
+            self._disk_cache = None
+            return
+        try:
+            self._disk_cache = DiskCache(cache_dir)
+            logger.info(f"Decoded audio disk cache: {cache_dir}")
+        except Exception as e:
+            logger.warning(f"Disk cache unavailable at {cache_dir}: {e}")
+            self._disk_cache = None
+    
+    def set_shared_bank(self, name: Optional[str]) -> None:
+        """Share decoded clips with other processes on this host.
+        
+        Clips found in the bank are attached instead of decoded, and clips
+        decoded here are published to it (see sharedbank.SharedBank).
         
+        Args:
+            name: Bank name used by every cooperating process, or None to
+                keep decoded clips private
+        """
+        if not name:
+            self._shared_bank = None
+            return
         try:
-            path = Path(file_path)
-            if not path.exists():
-                logger.error(f"Audio file not found: {file_path}")
-                return b''
+            self._shared_bank = SharedBank(name)
+            logger.info(f"Shared sample bank: {name} ({self._shared_bank.stats()['clips']} clips)")
+        except Exception as e:
+            logger.warning(f"Shared sample bank {name!r} unavailable: {e}")
+            self._shared_bank = None
+    
+    def set_clip_bank(self, bank_path: Optional[str], root: Optional[Path] = None) -> None:
+        """Serve clips from a bank compiled by scripts/compile_bank.py.
+        
+        Clips in the bank load as views of its mapping without touching
+        their source files; others are decoded as usual, so a missing bank
+        file only costs the speed-up.
+        
+        Args:
+            bank_path: Bank file, relative to the assets root like clip
+                paths, or None to stop using one
+            root: Directory the bank's clip paths are relative to; defaults
+                to the assets root
+        """
+        self._clip_bank = None
+        self._clip_bank_root = Path(root) if root is not None else None
+        if not bank_path:
+            return
+        path = self._resolve_path(bank_path)
+        if not path.exists():
+            logger.info(f"No clip bank at {path}; clips are decoded from their files")
+            return
+        try:
+            self._clip_bank = ClipBank(str(path))
+            logger.info(f"Clip bank: {path} ({len(self._clip_bank)} clips)")
+        except Exception as e:
+            logger.warning(f"Could not open clip bank {path}: {e}")
+    
+    def bank_paths(self) -> List[str]:
+        """Paths of the clips in the clip bank, relative to its root."""
+        bank = self._clip_bank
+        return bank.paths() if bank is not None else []
+    
+    def _bank_path(self, file_path: str) -> Optional[str]:
+        """Name of a resolved clip path in the clip bank."""
+        try:
+            relative = os.path.relpath(file_path, self._clip_bank_root or self._asset_root())
+        except ValueError:
+            return None  # another drive on Windows
+        if relative.startswith('..'):
+            return None
+        return relative.replace(os.sep, '/')
+    
+    def _bank_clip(self, file_path: str, samplerate: int) -> Optional[Clip]:
+        """Clip from the clip bank, or None if the bank lacks it.
+        
+        A clip compiled for the engine's rate and layout is a view of the
+        bank. Otherwise the nearest rate in the bank is converted like a
+        decoded file, so builds that ship only the bank play on any device.
+        """
+        bank = self._clip_bank
+        if bank is None:
+            return None
+        path = self._bank_path(file_path)
+        rates = bank.samplerates(path)
+        if not rates:
+            return None
+        rate = samplerate if samplerate in rates else min(rates, key=lambda r: abs(r - samplerate))
+        samples, envelope, peaks, meta = bank.get(path, rate)
+        if rate == samplerate and bank.channels == self.mixer.channels:
+            analysis = self._analyze(samples, samplerate, meta)
+            return self._new_clip(file_path, samples, samplerate, analysis, mapped=True, peaks=peaks, envelope=envelope)
+        
+        samples = _match_channels(samples, self.mixer.channels)
+        samples = resample(samples, rate, samplerate)
+        samples = np.ascontiguousarray(samples, dtype=np.float32)
+        samples.flags.writeable = False
+        return self._new_clip(file_path, samples, samplerate, self._analyze(samples, samplerate))
+    
+    def set_budget(self, budget_bytes: Optional[int]) -> None:
+        """Set the decoded-audio memory budget and evict down to it.
+        
+        Args:
+            budget_bytes: Budget in bytes, or None for unlimited
+        """
+        with self._cache_lock:
+            self._budget_bytes = budget_bytes
+            self._evict_locked()
+    
+    def pin(self, file_paths: Iterable[str]) -> None:
+        """Exempt clips from eviction, e.g. the clips bound to the pads.
+        
+        Args:
+            file_paths: Paths to pin; they need not be loaded yet
+        """
+        with self._cache_lock:
+            self._pinned.update(str(self._resolve_path(p)) for p in file_paths)
+    
+    def unpin(self, file_paths: Iterable[str]) -> None:
+        """Make previously pinned clips evictable again.
+        
+        Args:
+            file_paths: Paths to unpin
+        """
+        with self._cache_lock:
+            self._pinned.difference_update(str(self._resolve_path(p)) for p in file_paths)
+            self._evict_locked()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get cache counters for sizing the memory budget.
+        
+        Returns:
+            Dictionary with hits, misses, evictions, clip count and bytes,
+            plus the shared bank's stats when one is in use
+        """
+        with self._cache_lock:
+            stats = {
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'clips': len(self._cache),
+                'pinned': len(self._pinned),
+                'bytes': self._cached_bytes,
+                'budget_bytes': self._budget_bytes,
+            }
+        bank = self._shared_bank
+        if bank is not None:
+            stats['shared_bank'] = bank.stats()
+        clip_bank = self._clip_bank
+        if clip_bank is not None:
+            stats['clip_bank'] = {'path': clip_bank.path, 'clips': len(clip_bank)}
+        return stats
+    
+    def _cache_key(self, file_path: str) -> tuple:
+        """Cache key for a file rendered at the current output rate."""
+        return (str(self._resolve_path(file_path)), self.mixer.samplerate)
+    
+    def _lookup(self, key: tuple) -> Optional[Clip]:
+        """Return a cached clip and mark it most recently used."""
+        with self._cache_lock:
+            clip = self._cache.get(key)
+            if clip is None:
+                self._misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self._hits += 1
+            return clip
+    
+    def _store(self, key: tuple, clip: Clip) -> None:
+        """Insert a clip and evict least recently used clips over budget."""
+        with self._cache_lock:
+            previous = self._cache.pop(key, None)
+            if previous is not None:
+                self._cached_bytes -= previous.nbytes
+            self._cache[key] = clip
+            self._cached_bytes += clip.nbytes
+            self._evict_locked()
+    
+    def _evict_locked(self) -> None:
+        if self._budget_bytes is None:
+            return
+        for key in list(self._cache):
+            if self._cached_bytes <= self._budget_bytes:
+                return
+            file_path, samplerate = key
+            if file_path in self._pinned and samplerate == self.mixer.samplerate:
+                continue
+            clip = self._cache.pop(key)
+            self._cached_bytes -= clip.nbytes
+            self._evictions += 1
+            logger.debug(f"Evicted from audio cache: {file_path} @ {samplerate} Hz")
+        if self._cached_bytes > self._budget_bytes:
+            logger.warning(
+                f"Pinned clips ({self._cached_bytes} bytes) exceed the audio "
+                f"cache budget ({self._budget_bytes} bytes)"
+            )
+    
+    def preload_async(self, file_path: str) -> Future:
+        """Decode an audio file into the cache on the worker pool.
+        
+        Args:
+            file_path: Path to a WAV, MP3, FLAC or OGG file
             
-            with open(file_path, 'rb') as f:
-                data = f.read()
+        Returns:
+            Future resolving to the cached Clip (or None on failure)
+        """
+        key = self._cache_key(file_path)
+        
+        clip = self._lookup(key)
+        if clip is not None:
+            future: Future = Future()
+            future.set_result(clip)
+            return future
+        
+        future, owner = self._claim_load(key)
+        if owner:
+            with self._pending_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self._decode_workers,
+                        thread_name_prefix='audio-decode',
+                    )
+                executor = self._executor
+            executor.submit(self._run_load, key, future)
+        return future
+    
+    def preload_many(
+        self,
+        file_paths: Iterable[str],
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> Dict[str, Optional[Clip]]:
+        """Decode many files in parallel on the worker pool and wait for them.
+        
+        Files large enough to be streamed are skipped; they are decoded
+        while they play instead.
+        
+        Args:
+            file_paths: Paths to load; duplicates are loaded once
+            progress: Called as progress(done, total) on the calling thread
+                before the first and after each completed load
             
-            self._cache[file_path] = data
-            logger.info(f"Loaded audio to cache: {file_path} ({len(data)} bytes)")
-            return data
+        Returns:
+            Dictionary mapping each preloaded path to its Clip (or None)
+        """
+        paths = [p for p in dict.fromkeys(file_paths) if not self.is_streamed(p)]
+        futures = {self.preload_async(p): p for p in paths}
+        total = len(futures)
+        results: Dict[str, Optional[Clip]] = {}
+        if progress:
+            progress(0, total)
+        for done, future in enumerate(as_completed(futures), start=1):
+            try:
+                results[futures[future]] = future.result()
+            except CancelledError:
+                results[futures[future]] = None
+            if progress:
+                progress(done, total)
+        return results
+    
+    def waveform(self, file_path: str, pixels: int, start: int = 0, end: Optional[int] = None) -> Optional['np.ndarray']:
+        """Waveform of a cached clip for drawing, from its peak pyramid.
+        
+        Costs O(pixels) at any zoom and never decodes: clips that are not
+        cached yet (or are streamed) have no waveform.
+        
+        Args:
+            file_path: Path to a WAV, MP3, FLAC or OGG file
+            pixels: Number of columns to draw
+            start: First frame of the range to draw
+            end: Frame after the range; defaults to the end of the clip
+            
+        Returns:
+            float32 array shaped (pixels, 2) of (min, max) per column, or
+            None if the clip is not cached
+        """
+        key = self._cache_key(file_path)
+        with self._cache_lock:
+            clip = self._cache.get(key)
+        if clip is None:
+            return None
+        return clip.peaks.peaks(pixels, start, end)
+    
+    def playhead(self, key: str) -> Optional[float]:
+        """Fraction of its clip the newest voice of a key has played.
+        
+        Args:
+            key: Pad to look at
+            
+        Returns:
+            0 to 1, or None if the key is not playing
+        """
+        return self.mixer.playhead(key)
+    
+    def playheads(self, keys: Iterable[str]) -> Dict[str, Optional[float]]:
+        """Playhead fractions of several keys (see playhead())."""
+        return {key: self.mixer.playhead(key) for key in keys}
+    
+    def is_streamed(self, file_path: str) -> bool:
+        """Whether a file plays through a StreamingVoice instead of the cache.
+        
+        A file is streamed when it is not already cached and its decoded
+        size at the engine rate would reach ``stream_threshold_bytes``.
+        
+        Args:
+            file_path: Path to a WAV, MP3, FLAC or OGG file
+        """
+        if not self._stream_threshold or not SOUNDFILE_AVAILABLE:
+            return False
+        key = self._cache_key(file_path)
+        with self._cache_lock:
+            if key in self._cache:
+                return False
+        bank = self._clip_bank
+        if bank is not None and bank.samplerates(self._bank_path(key[0])):
+            return False
+        decision = self._stream_decisions.get(key)
+        if decision is None:
+            try:
+                info = sf.info(key[0])
+                frames = info.frames * key[1] / info.samplerate
+                decision = frames * self.mixer.channels * 4 >= self._stream_threshold
+            except Exception:
+                decision = False
+            self._stream_decisions[key] = decision
+        return decision
+    
+    def _claim_load(self, key: tuple) -> tuple:
+        """Join an in-flight load of a file or register a new one.
+        
+        Returns:
+            Tuple of (future, owner); the owner must call _run_load
+        """
+        with self._pending_lock:
+            # A load may have finished since the caller's cache lookup.
+            # Eviction and LRU reordering mutate the cache under its own
+            # lock, so read it under that lock too
+            with self._cache_lock:
+                clip = self._cache.get(key)
+            if clip is not None:
+                future: Future = Future()
+                future.set_result(clip)
+                return future, False
+            future = self._pending_loads.get(key)
+            if future is not None:
+                return future, False
+            future = Future()
+            self._pending_loads[key] = future
+            return future, True
+    
+    def _run_load(self, key: tuple, future: Future) -> None:
+        """Perform a claimed load and publish the result to every waiter."""
+        clip = None
+        try:
+            clip = self._load_uncached(key)
+        finally:
+            # The clip is already in the cache, so late callers hit it there
+            with self._pending_lock:
+                self._pending_loads.pop(key, None)
+            try:
+                future.set_result(clip)
+            except InvalidStateError:
+                pass  # cancelled by stop_all()
+    
+    def _load_uncached(self, key: tuple) -> Optional[Clip]:
+        """Decode a resolved path at a sample rate and cache the result."""
+        file_path, samplerate = key
+        try:
+            if not NUMPY_AVAILABLE:
+                logger.error("numpy is required to decode audio")
+                return None
+            
+            clip = self._bank_clip(file_path, samplerate)
+            if clip is None:
+                if not Path(file_path).exists():
+                    logger.error(f"Audio file not found: {file_path}")
+                    return None
+                clip = self._decode_file(file_path, samplerate)
+            if clip is None:
+                return None
+            
+            self._store(key, clip)
+            logger.info(
+                f"Loaded audio to cache: {file_path} "
+                f"({clip.frames} frames, "
+                f"{'memory-mapped' if clip.mapped else f'{clip.nbytes} bytes'}, "
+                f"{clip.loudness['lufs']:.1f} LUFS)"
+            )
+            return clip
         
         except Exception as e:
             logger.error(f"Error loading audio file {file_path}: {e}")
-            return b''
+            return None
     
-    def play_audio(self, file_path: str) -> bool:
-        """Play audio file using best available method.
+    def play_audio(self, file_path: str, gain: float = 1.0, key: Optional[str] = None) -> bool:
+        """Play audio file through the mixer and its output backend.
         
         Args:
-            file_path: Path to WAV file
+            file_path: Path to a WAV, MP3, FLAC or OGG file
+            gain: Linear gain for this voice
+            key: Pad that triggered playback, for per-key voice limits
             
         Returns:
             True if playback started successfully
         """
+        trace = get_latency_tracker().begin(key)
+        gain *= self.key_gain(key)
         try:
-            audio_data = self.load_audio_file(file_path)
+            if self.is_streamed(file_path):
+                return self._stream_on_mixer(file_path, gain, key, trace)
             
-            if not audio_data:
+            clip = self.load_audio_file(file_path)
+            trace.stamp('lookup')
+            
+            if clip is None or clip.frames == 0:
                 logger.warning(f"No audio data to play for {file_path}")
                 return False
             
-            if SOUNDDEVICE_AVAILABLE:
-                return self._play_with_sounddevice(file_path, audio_data)
-            elif SIMPLEAUDIO_AVAILABLE:
-                return self._play_with_simpleaudio(file_path, audio_data)
-            else:
-                logger.error("No audio playback library available")
-                return False
+            gain *= self.normalization_gain(clip)
+            return self._play_on_mixer(clip, gain, key, trace)
         
         except Exception as e:
             logger.error(f"Error playing audio: {e}")
             return False
     
-    def _parse_wav(self, audio_data: bytes) -> tuple:
-        """Parse WAV file data.
+    def _decode_file(self, file_path: str, samplerate: int) -> Optional[Clip]:
+        """Decode any supported file once into mixer-ready float32 samples.
+        
+        Args:
+            file_path: Resolved path of the source file
+            samplerate: Output rate to render the clip at
+        """
+        suffix = Path(file_path).suffix.lower()
+        large = Path(file_path).stat().st_size >= self._mmap_threshold
+        if suffix == '.wav' and large:
+            # Mapped WAVs already share the OS page cache between
+            # processes, so they are not published to the shared bank
+            clip = self._map_wav_clip(file_path, samplerate)
+            if clip is not None:
+                return clip
+        
+        channels = self.mixer.channels
+        bank = self._shared_bank
+        if bank is not None:
+            shared = bank.load(file_path, samplerate, channels)
+            if shared is not None:
+                samples, meta = shared
+                return self._new_clip(file_path, samples, samplerate, self._analyze(samples, samplerate, meta), mapped=True)
+        
+        disk_cache = self._disk_cache
+        if disk_cache is not None:
+            cached = disk_cache.load(file_path, samplerate, self.mixer.channels)
+            if cached is not None:
+                samples, meta = cached
+                analysis = self._analyze(samples, samplerate, meta)
+                if any(meta.get(name) != value for name, value in analysis.items()):
+                    # Entry predates an analysis or used other settings
+                    disk_cache.update(file_path, samplerate, self.mixer.channels, analysis)
+                peaks = self._cached_peaks(disk_cache, file_path, samplerate, samples)
+                if bank is not None:
+                    # Publish for instances whose disk cache is cold or off
+                    shared = bank.store(file_path, samplerate, channels, samples, analysis)
+                    if shared is not None:
+                        samples = shared
+                return self._new_clip(file_path, samples, samplerate, analysis, mapped=True, peaks=peaks)
+        
+        if suffix == '.wav':
+            decoded = self._decode_wav(file_path)
+        elif suffix in SUPPORTED_EXTENSIONS:
+            decoded = self._decode_with_soundfile(file_path)
+        else:
+            logger.error(f"Unsupported audio format: {file_path}")
+            return None
+        if decoded is None:
+            return None
+        
+        samples, framerate = decoded
+        samples = _match_channels(samples, self.mixer.channels)
+        samples = resample(samples, framerate, samplerate)
+        samples = np.ascontiguousarray(samples, dtype=np.float32)
+        samples.flags.writeable = False
+        analysis = self._analyze(samples, samplerate)
+        peaks = PeakPyramid.from_samples(samples)
+        if disk_cache is not None:
+            disk_cache.store(file_path, samplerate, self.mixer.channels, samples, analysis, peaks.data)
+        if bank is not None:
+            shared = bank.store(file_path, samplerate, channels, samples, analysis)
+            if shared is not None:
+                # Drop the private copy; every process plays the shared one
+                return self._new_clip(file_path, shared, samplerate, analysis, mapped=True, peaks=peaks)
+        if disk_cache is not None and large:
+            # Serve large clips from the page cache rather than the heap
+            cached = disk_cache.load(file_path, samplerate, self.mixer.channels)
+            if cached is not None:
+                return self._new_clip(file_path, cached[0], samplerate, analysis, mapped=True, peaks=peaks)
+        return self._new_clip(file_path, samples, samplerate, analysis, peaks=peaks)
+    
+    @staticmethod
+    def _cached_peaks(disk_cache: DiskCache, file_path: str, samplerate: int, samples: 'np.ndarray') -> PeakPyramid:
+        """Waveform peaks kept with a disk cache entry, added if missing."""
+        data = disk_cache.load_peaks(file_path, samplerate, samples.shape[1])
+        if data is not None:
+            try:
+                return PeakPyramid(data, len(samples))
+            except ValueError:
+                pass
+        peaks = PeakPyramid.from_samples(samples)
+        disk_cache.store_peaks(file_path, samplerate, samples.shape[1], peaks.data)
+        return peaks
+    
+    def _map_wav_clip(self, file_path: str, samplerate: int) -> Optional[Clip]:
+        """Build a zero-copy Clip over a memory-mapped WAV file.
+        
+        Returns None when the file still needs converting, i.e. it is not
+        float32 or its rate or channel layout does not match the mixer.
+        Only IEEE float32 WAVs at or above ``mmap_threshold_bytes``,
+        exported at the engine's rate and with a mono or bus-wide layout,
+        play in place. Integer PCM and small WAVs, which includes every
+        bundled asset, are converted as usual. With ``disk_cache`` on,
+        their converted entry is what gets mapped instead.
+        """
+        try:
+            mapped = _map_wav(file_path)
+        except Exception as e:
+            logger.debug(f"Could not memory-map {file_path}: {e}")
+            return None
+        if mapped is None:
+            return None
+        samples, framerate = mapped
+        if framerate != samplerate:
+            return None
+        if samples.shape[1] not in (1, self.mixer.channels):
+            return None
+        return self._new_clip(file_path, samples, framerate, self._analyze(samples, framerate), mapped=True)
+    
+    def _decode_with_soundfile(self, file_path: str) -> Optional[tuple]:
+        """Decode a compressed file with soundfile.
+        
+        Returns:
+            Tuple of (float32 samples shaped (frames, channels), framerate)
+        """
+        if not SOUNDFILE_AVAILABLE:
+            logger.error(f"soundfile is required to decode {file_path}")
+            return None
+        try:
+            samples, framerate = sf.read(file_path, dtype='float32', always_2d=True)
+            return samples, framerate
+        except Exception as e:
+            logger.error(f"Error decoding {file_path}: {e}")
+            return None
+    
+    def _decode_wav(self, file_path: str) -> Optional[tuple]:
+        """Decode a WAV file to float32, reading samples through a mmap.
         
         Returns:
-            Tuple of (frames, channels, sample_width, framerate)
+            Tuple of (float32 samples shaped (frames, channels), framerate)
         """
         try:
-            with io.BytesIO(audio_data) as f:
-                with wave.open(f, 'rb') as wav_file:
-                    frames = wav_file.readframes(wav_file.getnframes())
-                    channels = wav_file.getnchannels()
-                    sample_width = wav_file.getsampwidth()
-                    framerate = wav_file.getframerate()
-                    return frames, channels, sample_width, framerate
+            opened = _open_wav_map(file_path)
+            if opened is None:
+                logger.error(f"Not a WAV file: {file_path}")
+                return None
+            mm, (tag, channels, framerate, bits, _, offset, size) = opened
+            try:
+                samples = _pcm_to_float32(mm, offset, size, tag, bits, channels)
+            finally:
+                # The samples are a copy; release the mapping now, not at GC
+                mm.close()
+            if samples is None:
+                logger.error(f"Unsupported WAV sample format ({tag}, {bits}-bit): {file_path}")
+                return None
+            return samples, framerate
         except Exception as e:
             logger.error(f"Error parsing WAV file: {e}")
-            return None, None, None, None
+            return None
     
-    def _play_with_simpleaudio(self, file_path: str, audio_data: bytes) -> bool:
-        """Play audio using simpleaudio."""
+    def _play_on_mixer(
+        self,
+        clip: Clip,
+        gain: float = 1.0,
+        key: Optional[str] = None,
+        trace: Optional[Trace] = None,
+    ) -> bool:
+        """Play audio by handing a voice to the shared mixer."""
         try:
-            frames, channels, sample_width, framerate = self._parse_wav(audio_data)
-            if frames is None:
+            if not self.mixer.start():
                 return False
+            voice = Voice(clip.samples, gain, key, clip.envelope, self.start_frame(clip, key))
+            at = self._grid_frame(key)
+            if trace is not None:
+                trace.stamp('voice_start')
+                self._attach_trace(voice, trace, at)
+            self.mixer.add_voice(voice, at)
             
-            play_obj = sa.play_buffer(
-                frames,
-                channels,
-                sample_width,
-                framerate
-            )
-            logger.debug(f"Started playback with simpleaudio: {file_path}")
+            logger.debug(f"Queued voice on mixer: {clip.path}")
             return True
         
         except Exception as e:
-            logger.error(f"Error with simpleaudio playback: {e}")
+            logger.error(f"Error queuing voice: {e}")
             return False
     
-    def _play_with_sounddevice(self, file_path: str, audio_data: bytes) -> bool:
-        """Play audio using sounddevice."""
+    @staticmethod
+    def _attach_trace(voice: Voice, trace: Trace, at: Optional[int]) -> None:
+        """Let the mixer finish a trace, unless the voice waits for the grid.
+        
+        A quantized voice waits on purpose, so its trace ends at the
+        voice start instead of counting the wait as output latency.
+        """
+        if at is None:
+            voice.trace = trace
+        else:
+            trace.finish(output=False)
+    
+    def _stream_on_mixer(
+        self,
+        file_path: str,
+        gain: float = 1.0,
+        key: Optional[str] = None,
+        trace: Optional[Trace] = None,
+    ) -> bool:
+        """Play a long file through a StreamingVoice on the shared mixer."""
         try:
-            frames, channels, sample_width, framerate = self._parse_wav(audio_data)
-            if frames is None:
+            if not self.mixer.start():
                 return False
+            voice = StreamingVoice(
+                str(self._resolve_path(file_path)),
+                self.mixer.samplerate,
+                self.mixer.channels,
+                gain,
+                key,
+            )
+            at = self._grid_frame(key)
+            if trace is not None:
+                trace.stamp('lookup')
+                trace.stamp('voice_start')
+                self._attach_trace(voice, trace, at)
+            self.mixer.add_voice(voice, at)
             
-            # Convert byte frames to numpy array for sounddevice
-            if sample_width == 1:
-                dtype = np.uint8
-            elif sample_width == 2:
-                dtype = np.int16
-            elif sample_width == 3:
-                # 24-bit audio - convert to 16-bit
-                dtype = np.int16
-                # Simplified 24-bit to 16-bit conversion
-                frames_array = np.frombuffer(frames, dtype=np.int8).reshape(-1, 3)
-                frames_16bit = frames_array[:, :2].astype(np.int16)
-                frames_array = frames_16bit
-            else:
-                dtype = np.int32
-            
-            if sample_width != 3:
-                frames_array = np.frombuffer(frames, dtype=dtype)
-            
-            # Reshape for stereo/mono
-            if channels > 1:
-                frames_array = frames_array.reshape(-1, channels)
-            
-            # Play in background thread
-            threading.Thread(
-                target=lambda: sd.play(frames_array, framerate),
-                daemon=True
-            ).start()
-            
-            logger.debug(f"Started playback with sounddevice: {file_path}")
+            logger.debug(f"Streaming voice on mixer: {file_path}")
             return True
         
         except Exception as e:
-            logger.error(f"Error with sounddevice playback: {e}")
+            logger.error(f"Error streaming {file_path}: {e}")
             return False
     
     def stop_all(self):
         """Stop all playback and cleanup."""
         self._running = False
-        if SIMPLEAUDIO_AVAILABLE:
-            try:
-                sa.stop_all()
-            except:
-                pass
-        if SOUNDDEVICE_AVAILABLE:
-            try:
-                sd.stop()
-            except:
-                pass
+        # Fades out whatever is playing before the backend stops
+        self.mixer.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        with self._pending_lock:
+            for future in self._pending_loads.values():
+                future.cancel()
+            self._pending_loads.clear()
     
     def __del__(self):
         self.stop_all()
@@ -207,6 +2224,9 @@ class AudioCache:
 # Global audio cache instance
 _audio_cache: Optional[AudioCache] = None
 
+# Engine running in another process (engine.EngineProcess), if any
+_audio_engine = None
+
 
 def get_audio_cache() -> AudioCache:
     """Get or create the global audio cache."""
@@ -216,22 +2236,88 @@ def get_audio_cache() -> AudioCache:
     return _audio_cache
 
 
-def play_audio(file_path: str) -> bool:
+def set_audio_engine(engine) -> None:
+    """Route playback and preloads to an engine in another process.
+    
+    Args:
+        engine: Running engine.EngineProcess, or None to play through
+            this process's AudioCache again
+    """
+    global _audio_engine
+    _audio_engine = engine
+
+
+def get_audio_engine():
+    """Get whatever plays audio: the engine process if set, else the cache."""
+    if _audio_engine is not None:
+        return _audio_engine
+    return get_audio_cache()
+
+
+def play_audio(file_path: str, gain: float = 1.0, key: Optional[str] = None) -> bool:
     """Play an audio file.
     
     Args:
-        file_path: Path to WAV file
+        file_path: Path to a WAV, MP3, FLAC or OGG file
+        gain: Linear gain for this voice
+        key: Pad that triggered playback, for per-key voice limits
         
     Returns:
         True if playback started successfully
     """
-    return get_audio_cache().play_audio(file_path)
+    return get_audio_engine().play_audio(file_path, gain, key)
+
+
+def clip_waveform(file_path: str, pixels: int) -> Optional['np.ndarray']:
+    """Get a cached clip's waveform for drawing.
+    
+    With the engine in a child process this never waits: it returns None
+    until the engine has answered, so callers ask again on a later frame.
+    
+    Args:
+        file_path: Path to a WAV, MP3, FLAC or OGG file
+        pixels: Number of columns to draw
+        
+    Returns:
+        (pixels, 2) array of (min, max) per column, or None if the clip is
+        not loaded (or not answered yet)
+    """
+    return get_audio_engine().waveform(file_path, pixels)
+
+
+def clip_playheads(keys: Iterable[str]) -> Dict[str, Optional[float]]:
+    """Get how far the clips playing on several pads have got, in one query.
+    
+    With the engine in a child process this never waits: it returns the
+    positions from the previous query.
+    
+    Args:
+        keys: Pads to look at
+        
+    Returns:
+        Dictionary mapping each key to the fraction played, or None if
+        the pad is not playing
+    """
+    return get_audio_engine().playheads(keys)
 
 
 def preload_audio(file_path: str) -> None:
     """Preload audio file into cache.
     
     Args:
-        file_path: Path to WAV file
+        file_path: Path to a WAV, MP3, FLAC or OGG file
     """
     get_audio_cache().load_audio_file(file_path)
+
+
+def preload_audio_async(file_path: str) -> Future:
+    """Decode an audio file into the cache on a background worker.
+    
+    Args:
+        file_path: Path to a WAV, MP3, FLAC or OGG file
+        
+    Returns:
+        Future resolving to the cached Clip (to True or False when the
+        engine runs in another process)
+    """
+    return get_audio_engine().preload_async(file_path)
@@ -0,0 +1,570 @@
+"""Audio output backends that drive the mixer."""
+
+import logging
+import os
+import threading
+import time
+import wave
+from collections import deque
+from typing import Any, Dict, Optional, Set, Union
+
+try:
+    import simpleaudio as sa
+    SIMPLEAUDIO_AVAILABLE = True
+except ImportError:
+    SIMPLEAUDIO_AVAILABLE = False
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    import sounddevice as sd
+    SOUNDDEVICE_AVAILABLE = NUMPY_AVAILABLE
+except (ImportError, OSError):
+    # OSError is raised when the PortAudio shared library is missing
+    SOUNDDEVICE_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Overrides the "backend" audio setting, e.g. "null" or "file:/tmp/out.wav"
+BACKEND_ENV_VAR = 'SWAMP_IZZO_AUDIO_BACKEND'
+
+BACKEND_NAMES = ('auto', 'sounddevice', 'simpleaudio', 'null', 'file')
+
+# Default output of the file sink
+DEFAULT_FILE_SINK_PATH = 'soundboard_output.wav'
+
+# simpleaudio opens a new device stream per buffer, so it is fed in large
+# blocks to keep the seams between them rare
+SIMPLEAUDIO_BLOCK_FRAMES = 4096
+
+# How far behind the render schedule simpleaudio buffers are started, so a
+# block is always rendered before it is due
+SIMPLEAUDIO_LEAD_SECONDS = 0.02
+
+# PortAudio latency hint for the sounddevice stream: 'low', 'high' or seconds
+DEFAULT_STREAM_LATENCY = 'low'
+
+# Adaptive block size bounds
+DEFAULT_MIN_BLOCKSIZE = 64
+DEFAULT_MAX_BLOCKSIZE = 2048
+
+# This many xruns within XRUN_WINDOW_SECONDS of audio double the block
+# size; after SHRINK_AFTER_SECONDS without one, and with the mixer never
+# using more than SHRINK_LOAD of a block's time, it is halved
+XRUN_GROW_COUNT = 2
+XRUN_WINDOW_SECONDS = 10.0
+SHRINK_AFTER_SECONDS = 30.0
+SHRINK_LOAD = 0.25
+
+
+class BlocksizeController:
+    """Finds the smallest block size that plays without dropouts.
+
+    Fed once per block with the mixer's render time and whether the
+    output reported an xrun. Repeated xruns double the block size; a long
+    clean run with plenty of headroom halves it, but never back to a size
+    that has already dropped out. Time is counted in audio frames, so the
+    decisions do not depend on the wall clock.
+    """
+
+    def __init__(
+        self,
+        blocksize: int,
+        samplerate: int,
+        min_blocksize: int = DEFAULT_MIN_BLOCKSIZE,
+        max_blocksize: int = DEFAULT_MAX_BLOCKSIZE,
+    ):
+        """Create a controller.
+
+        Args:
+            blocksize: Block size the stream starts with
+            samplerate: Stream sample rate
+            min_blocksize: Smallest block size to shrink to
+            max_blocksize: Largest block size to grow to
+        """
+        self.blocksize = blocksize
+        self.samplerate = samplerate
+        self.min_blocksize = min_blocksize
+        self.max_blocksize = max_blocksize
+        self._clock = 0.0
+        self._xruns: deque = deque()
+        self._stable_since = 0.0
+        self._peak_load = 0.0
+        self._failed: Set[int] = set()
+
+    def update(self, frames: int, render_seconds: float, xrun: bool = False) -> Optional[int]:
+        """Account for one block.
+
+        Args:
+            frames: Frames in the block
+            render_seconds: Time the mixer took to render it
+            xrun: True if the output under- or overran before this block
+
+        Returns:
+            The new block size when it should change, else None
+        """
+        period = frames / self.samplerate
+        self._clock += period
+        now = self._clock
+        if xrun:
+            xruns = self._xruns
+            xruns.append(now)
+            while xruns[0] < now - XRUN_WINDOW_SECONDS:
+                xruns.popleft()
+            if len(xruns) >= XRUN_GROW_COUNT and self.blocksize < self.max_blocksize:
+                self._failed.add(self.blocksize)
+                return self._resize(min(self.blocksize * 2, self.max_blocksize))
+            self._stable_since = now
+            self._peak_load = 0.0
+            return None
+
+        # Not max(): it allocates an iterator, and this runs every block
+        load = render_seconds / period
+        if load > self._peak_load:
+            self._peak_load = load
+        if now - self._stable_since < SHRINK_AFTER_SECONDS:
+            return None
+        smaller = max(self.min_blocksize, self.blocksize // 2)
+        if smaller < self.blocksize and smaller not in self._failed and self._peak_load < SHRINK_LOAD:
+            return self._resize(smaller)
+        self._stable_since = now
+        self._peak_load = 0.0
+        return None
+
+    def _resize(self, blocksize: int) -> int:
+        self.blocksize = blocksize
+        self._xruns.clear()
+        self._stable_since = self._clock
+        self._peak_load = 0.0
+        return blocksize
+
+
+class OutputBackend:
+    """Pulls blocks from a Mixer and delivers them somewhere.
+
+    Subclasses implement _open() and _close(); every rendered block goes
+    through _render() so all backends report the same mixer load and xrun
+    figures. Backends that can change block size while running implement
+    _request_blocksize() and set ``resizable``; they then follow a
+    BlocksizeController when the mixer has adaptive block size enabled.
+    """
+
+    name = 'base'
+    resizable = False
+
+    def __init__(self):
+        self._mixer = None
+        self._running = False
+        # Blocks and frames rendered, counted in place: Python ints above
+        # 256 are new objects, and _render() must not allocate
+        self._counts = np.zeros(2, dtype=np.int64)
+        self._count_step = np.array([1, 0], dtype=np.int64)
+        self._step_frames = 0
+        self._render_seconds = 0.0
+        self._underruns = 0
+        self._overruns = 0
+        self._resizes = 0
+        self._controller: Optional[BlocksizeController] = None
+
+    @property
+    def running(self) -> bool:
+        """True while the backend is consuming blocks."""
+        return self._running
+
+    def start(self, mixer) -> bool:
+        """Start pulling blocks from ``mixer``.
+
+        Returns:
+            True if the backend is running
+        """
+        if self._running:
+            return True
+        self.attach(mixer)
+        self._running = True
+        try:
+            self._open(mixer)
+        except Exception as e:
+            self._running = False
+            logger.error(f"Error starting {self.name} audio backend: {e}")
+            return False
+        logger.info(
+            f"{self.name} audio backend started ({mixer.samplerate} Hz, "
+            f"{mixer.channels} ch, block {mixer.blocksize})"
+        )
+        return True
+
+    def attach(self, mixer) -> None:
+        """Render from ``mixer`` without starting the output.
+
+        Sets up block size adaptation when the mixer asks for it.
+        """
+        self._mixer = mixer
+        self._controller = None
+        if self.resizable and mixer.adaptive_blocksize is not None:
+            self._controller = BlocksizeController(
+                mixer.blocksize, mixer.samplerate, *mixer.adaptive_blocksize
+            )
+
+    def close(self) -> None:
+        """Stop pulling blocks and release the output."""
+        if not self._running:
+            return
+        self._running = False
+        try:
+            self._close()
+        except Exception as e:
+            logger.debug(f"Error closing {self.name} audio backend: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Get mixer load figures.
+
+        Returns:
+            Dictionary with blocks rendered, render_seconds spent in the
+            mixer, load (render time as a fraction of audio time),
+            underruns and overruns reported by the output, the current
+            blocksize and how many times it was adapted
+        """
+        blocks, frames = (int(count) for count in self._counts)
+        audio_seconds = 0.0
+        if self._mixer is not None and self._mixer.samplerate:
+            audio_seconds = frames / self._mixer.samplerate
+        return {
+            'backend': self.name,
+            'blocks': blocks,
+            'render_seconds': self._render_seconds,
+            'load': self._render_seconds / audio_seconds if audio_seconds else 0.0,
+            'underruns': self._underruns,
+            'overruns': self._overruns,
+            'blocksize': self._mixer.blocksize if self._mixer is not None else None,
+            'blocksize_changes': self._resizes,
+        }
+
+    def _render(self, out, xrun: bool = False) -> None:
+        started = time.perf_counter()
+        self._mixer.render(out)
+        elapsed = time.perf_counter() - started
+        self._render_seconds += elapsed
+        frames = len(out)
+        if frames != self._step_frames:
+            self._step_frames = frames
+            self._count_step[1] = frames
+        np.add(self._counts, self._count_step, out=self._counts)
+        controller = self._controller
+        if controller is not None:
+            blocksize = controller.update(frames, elapsed, xrun)
+            if blocksize is not None:
+                self._request_blocksize(blocksize)
+
+    def _request_blocksize(self, blocksize: int) -> None:
+        pass
+
+    def _open(self, mixer) -> None:
+        raise NotImplementedError
+
+    def _close(self) -> None:
+        raise NotImplementedError
+
+
+class SoundDeviceBackend(OutputBackend):
+    """Low-latency callback stream through PortAudio.
+
+    Output underflow and overflow flags passed to the callback are counted
+    as underruns and overruns. A block size change reopens the stream from
+    a helper thread, since the callback itself must not block.
+    """
+
+    name = 'sounddevice'
+    resizable = True
+
+    def __init__(self, latency: Union[str, float] = DEFAULT_STREAM_LATENCY):
+        """Create the backend.
+
+        Args:
+            latency: PortAudio latency hint, 'low', 'high' or seconds
+        """
+        super().__init__()
+        self.latency = latency
+        self._stream = None
+        self._stream_lock = threading.RLock()
+        self._resizing = False
+
+    def _open(self, mixer) -> None:
+        with self._stream_lock:
+            stream = sd.OutputStream(
+                samplerate=mixer.samplerate,
+                channels=mixer.channels,
+                dtype='float32',
+                blocksize=mixer.blocksize,
+                latency=self.latency,
+                callback=self._callback,
+            )
+            stream.start()
+            self._stream = stream
+
+    def _callback(self, outdata, frames, time_info, status) -> None:
+        underflow = status.output_underflow
+        overflow = status.output_overflow
+        if underflow:
+            self._underruns += 1
+        if overflow:
+            self._overruns += 1
+        self._render(outdata, underflow or overflow)
+
+    def _close(self) -> None:
+        with self._stream_lock:
+            stream, self._stream = self._stream, None
+            if stream is not None:
+                stream.stop()
+                stream.close()
+
+    def _request_blocksize(self, blocksize: int) -> None:
+        if self._resizing:
+            return
+        self._resizing = True
+        threading.Thread(
+            target=self._reopen, args=(blocksize,), name='audio-resize', daemon=True
+        ).start()
+
+    def _reopen(self, blocksize: int) -> None:
+        try:
+            with self._stream_lock:
+                if not self._running:
+                    return
+                self._close()
+                self._mixer.blocksize = blocksize
+                self._open(self._mixer)
+                self._resizes += 1
+            logger.info(f"Audio block size adapted to {blocksize} frames")
+        except Exception as e:
+            logger.error(f"Error reopening audio stream with block size {blocksize}: {e}")
+            self._running = False
+        finally:
+            self._resizing = False
+
+
+class _ThreadBackend(OutputBackend):
+    """Backend that renders on its own thread, paced to real time.
+
+    A block that misses its deadline by more than a block period counts
+    as an underrun.
+    """
+
+    block_frames: Optional[int] = None
+
+    def __init__(self):
+        super().__init__()
+        self._thread: Optional[threading.Thread] = None
+        self._next_blocksize: Optional[int] = None
+
+    @property
+    def resizable(self) -> bool:
+        """Whether the block size follows the mixer's."""
+        return self.block_frames is None
+
+    def _open(self, mixer) -> None:
+        self._prepare(mixer)
+        self._thread = threading.Thread(
+            target=self._run, name=f'audio-{self.name}', daemon=True
+        )
+        self._thread.start()
+
+    def _run(self) -> None:
+        mixer = self._mixer
+        frames = self.block_frames or mixer.blocksize
+        out = np.zeros((frames, mixer.channels), dtype=np.float32)
+        period = frames / mixer.samplerate
+        deadline = time.perf_counter()
+        late = False
+        try:
+            while self._running:
+                if self._next_blocksize is not None:
+                    frames, self._next_blocksize = self._next_blocksize, None
+                    mixer.blocksize = frames
+                    out = np.zeros((frames, mixer.channels), dtype=np.float32)
+                    period = frames / mixer.samplerate
+                    self._resizes += 1
+                self._render(out, late)
+                self._deliver(out)
+                deadline += period
+                delay = deadline - time.perf_counter()
+                late = delay < -period
+                if delay > 0:
+                    time.sleep(delay)
+                elif late:
+                    # Fell behind (e.g. the process was suspended); resync
+                    self._underruns += 1
+                    deadline = time.perf_counter()
+        except Exception as e:
+            logger.error(f"{self.name} audio backend stopped: {e}")
+            self._running = False
+        finally:
+            self._finish()
+
+    def _close(self) -> None:
+        thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=2.0)
+
+    def _request_blocksize(self, blocksize: int) -> None:
+        self._next_blocksize = blocksize
+
+    def _prepare(self, mixer) -> None:
+        pass
+
+    def _deliver(self, out) -> None:
+        pass
+
+    def _finish(self) -> None:
+        pass
+
+
+class NullBackend(_ThreadBackend):
+    """Discards blocks, consuming them at the real-time rate.
+
+    Runs the whole engine without audio hardware, e.g. for load tests.
+    """
+
+    name = 'null'
+
+
+class FileBackend(_ThreadBackend):
+    """Writes the real-time mix to a 16-bit WAV file."""
+
+    name = 'file'
+
+    def __init__(self, file_path: str = DEFAULT_FILE_SINK_PATH):
+        super().__init__()
+        self.file_path = file_path
+        self._wav = None
+
+    def _prepare(self, mixer) -> None:
+        wav_file = wave.open(self.file_path, 'wb')
+        wav_file.setnchannels(mixer.channels)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(mixer.samplerate)
+        self._wav = wav_file
+
+    def _deliver(self, out) -> None:
+        pcm = (np.clip(out, -1.0, 1.0) * 32767.0).astype('<i2')
+        self._wav.writeframes(pcm.tobytes())
+
+    def _finish(self) -> None:
+        wav_file, self._wav = self._wav, None
+        if wav_file is not None:
+            wav_file.close()
+            logger.info(f"Wrote audio output to {self.file_path}")
+
+
+class SimpleAudioBackend(_ThreadBackend):
+    """Fallback that plays mixed blocks as successive simpleaudio buffers.
+
+    simpleaudio has no streaming API, so blocks are large and latency is
+    higher than with sounddevice. Each buffer is started on a fixed real-
+    time schedule, one block period after the previous one, while that
+    one is still playing. Waiting for a buffer to finish before starting
+    the next would leave a gap the length of a stream restart at every
+    block boundary.
+    """
+
+    name = 'simpleaudio'
+    block_frames = SIMPLEAUDIO_BLOCK_FRAMES
+
+    def __init__(self):
+        super().__init__()
+        # The playing buffer and the one queued behind it
+        self._play_objs: deque = deque(maxlen=2)
+        self._due: Optional[float] = None
+
+    def _prepare(self, mixer) -> None:
+        self._due = None
+
+    def _deliver(self, out) -> None:
+        pcm = (np.clip(out, -1.0, 1.0) * 32767.0).astype(np.int16)
+        period = len(out) / self._mixer.samplerate
+        now = time.perf_counter()
+        if self._due is None or now - self._due > period:
+            # First block, or fell behind: restart the schedule
+            self._due = now + SIMPLEAUDIO_LEAD_SECONDS
+        delay = self._due - now
+        if delay > 0:
+            time.sleep(delay)
+        self._play_objs.append(sa.play_buffer(pcm, out.shape[1], 2, self._mixer.samplerate))
+        self._due += period
+
+    def _finish(self) -> None:
+        play_objs = list(self._play_objs)
+        self._play_objs.clear()
+        for play_obj in play_objs:
+            play_obj.stop()
+
+
+def default_output_samplerate(fallback: int) -> int:
+    """Sample rate of the default output device, so it never resamples.
+
+    Args:
+        fallback: Rate returned when there is no device to ask
+    """
+    if SOUNDDEVICE_AVAILABLE:
+        try:
+            return int(sd.query_devices(kind='output')['default_samplerate'])
+        except Exception as e:
+            logger.debug(f"Could not query output device: {e}")
+    return fallback
+
+
+def create_backend(
+    name: Optional[str] = None,
+    file_path: Optional[str] = None,
+    latency: Union[str, float, None] = None,
+) -> OutputBackend:
+    """Create an output backend.
+
+    The SWAMP_IZZO_AUDIO_BACKEND environment variable overrides ``name``;
+    its "file" backend may carry the output path as "file:<path>".
+
+    Args:
+        name: One of BACKEND_NAMES; None or 'auto' picks sounddevice, then
+            simpleaudio, then the null sink
+        file_path: Output path of the file sink
+        latency: PortAudio latency hint of the sounddevice backend ('low',
+            'high' or seconds); defaults to DEFAULT_STREAM_LATENCY
+
+    Returns:
+        An unstarted backend
+    """
+    override = os.environ.get(BACKEND_ENV_VAR)
+    if override:
+        name = override
+    name = (name or 'auto').strip()
+    if name.startswith('file:'):
+        name, file_path = 'file', name[len('file:'):]
+
+    if name not in BACKEND_NAMES:
+        logger.warning(f"Unknown audio backend {name!r}, using auto")
+        name = 'auto'
+    if name == 'sounddevice' and not SOUNDDEVICE_AVAILABLE:
+        logger.warning("sounddevice is not available, using auto")
+        name = 'auto'
+    if name == 'simpleaudio' and not SIMPLEAUDIO_AVAILABLE:
+        logger.warning("simpleaudio is not available, using auto")
+        name = 'auto'
+    if name == 'auto':
+        if SOUNDDEVICE_AVAILABLE:
+            name = 'sounddevice'
+        elif SIMPLEAUDIO_AVAILABLE:
+            name = 'simpleaudio'
+        else:
+            logger.warning("No audio playback library available, using the null backend")
+            name = 'null'
+
+    if name == 'sounddevice':
+        return SoundDeviceBackend(latency if latency is not None else DEFAULT_STREAM_LATENCY)
+    if name == 'simpleaudio':
+        return SimpleAudioBackend()
+    if name == 'file':
+        return FileBackend(file_path or DEFAULT_FILE_SINK_PATH)
+    return NullBackend()
@@ -7,6 +7,41 @@ from typing import Dict, List, Any
 
 logger = logging.getLogger(__name__)
 
+# Defaults for the "audio" section of config.json
+DEFAULT_AUDIO_SETTINGS: Dict[str, Any] = {
+    "samplerate": None,
+    "cache_budget_bytes": 256 * 1024 * 1024,
+    "mmap_threshold_bytes": 1024 * 1024,
+    "stream_threshold_bytes": 16 * 1024 * 1024,
+    "disk_cache": True,
+    "shared_bank": None,
+    "clip_bank": None,
+    "engine_process": False,
+    "decode_workers": None,
+    "backend": "auto",
+    "backend_file": None,
+    "blocksize": 256,
+    "stream_latency": "low",
+    "adaptive_blocksize": False,
+    "min_blocksize": 64,
+    "max_blocksize": 2048,
+    "max_voices": 32,
+    "steal_policy": "oldest",
+    "master_gain": 1.0,
+    "limiter": True,
+    "limiter_ceiling_db": -1.0,
+    "limiter_lookahead_ms": 2.0,
+    "limiter_release_ms": 100.0,
+    "normalize_lufs": -16.0,
+    "normalize_max_gain_db": 12.0,
+    "trim_silence_db": -60.0,
+    "fade_in_ms": 0.0,
+    "fade_out_ms": 10.0,
+    "quantize": False,
+    "bpm": 120.0,
+    "quantize_grid": 16,
+}
+
 
 class Config:
     """Load and validate soundboard configuration."""
@@ -119,3 +154,9 @@ class Config:
         """Get window size (width, height)."""
         app = self.data.get('app', {})
         return (app.get('window_width', 420), app.get('window_height', 420))
+    
+    def get_audio_settings(self) -> Dict[str, Any]:
+        """Get audio engine settings merged over the defaults."""
+        settings = dict(DEFAULT_AUDIO_SETTINGS)
+        settings.update(self.data.get('audio', {}))
+        return settings
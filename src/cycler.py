@@ -0,0 +1,57 @@
+"""Clip cycling shared by live triggering and offline rendering."""
+
+import time
+from typing import Dict, Optional, Tuple
+
+from .config import Config
+
+
+class ClipCycler:
+    """Pick the next clip for each key press.
+
+    Each press of a key plays the key's next clip in order. If more than
+    ``reset_seconds`` pass between presses, the cycle starts again from
+    the first clip.
+    """
+
+    def __init__(self, config: Config):
+        """Initialize the cycler.
+
+        Args:
+            config: Configuration object
+        """
+        self.config = config
+        self.button_states: Dict[str, int] = {}  # Track cycle index for each key
+        self.last_press_time: Dict[str, float] = {}  # Track last press time
+
+    def next_clip(self, key: str, now: Optional[float] = None) -> Optional[Tuple[int, int, str]]:
+        """Advance a key's cycle.
+
+        Args:
+            key: Key identifier (1-9)
+            now: Press time in seconds; defaults to the wall clock. Offline
+                renders pass their timeline position.
+
+        Returns:
+            Tuple of (clip index, clip count, clip path), or None if the key
+            has no clips
+        """
+        key_config = self.config.get_key_config(key)
+        clips = key_config.get('clips', [])
+        reset_seconds = key_config.get('reset_seconds', 10)
+        if not clips:
+            return None
+
+        if now is None:
+            now = time.time()
+
+        # Check if we should reset the cycle
+        last_press = self.last_press_time.get(key)
+        if last_press is None or now - last_press > reset_seconds:
+            self.button_states[key] = 0
+        self.last_press_time[key] = now
+
+        clip_idx = self.button_states[key] % len(clips)
+        # Advance to next clip for next press
+        self.button_states[key] = (clip_idx + 1) % len(clips)
+        return clip_idx, len(clips), clips[clip_idx]
@@ -0,0 +1,218 @@
+"""Persistent on-disk cache of decoded audio."""
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever decoded output changes so stale renders are ignored
+CACHE_FORMAT_VERSION = 3
+
+_HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def file_content_hash(file_path: str) -> str:
+    """Get the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(_HASH_CHUNK_BYTES), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class DiskCache:
+    """Store decoded PCM per clip so warm starts skip decoding.
+
+    Each entry is a ``.npy`` file of float32 samples plus a ``.json``
+    sidecar recording the source path, size, mtime and content hash, and
+    optionally a ``.peaks.npy`` file with the clip's waveform peaks.
+    Entries are memory-mapped on load. An entry whose source size or mtime
+    changed is revalidated against the content hash and dropped if the
+    contents differ.
+    """
+
+    def __init__(self, cache_dir: Path):
+        """Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding cache entries; created if missing
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _entry_paths(self, file_path: str, samplerate: int, channels: int) -> tuple:
+        key = f"{file_path}|{samplerate}|{channels}|v{CACHE_FORMAT_VERSION}"
+        name = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return self.cache_dir / f"{name}.npy", self.cache_dir / f"{name}.json"
+
+    @staticmethod
+    def _peaks_path(data_path: Path) -> Path:
+        return data_path.with_suffix('.peaks.npy')
+
+    def load(self, file_path: str, samplerate: int, channels: int) -> Optional[tuple]:
+        """Load a valid entry for a source file.
+
+        Args:
+            file_path: Resolved source audio path
+            samplerate: Engine sample rate the entry was rendered for
+            channels: Engine channel count the entry was rendered for
+
+        Returns:
+            Tuple of (read-only float32 samples, metadata dict), or None on
+            a miss or stale entry
+        """
+        data_path, meta_path = self._entry_paths(file_path, samplerate, channels)
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable audio cache entry {meta_path}: {e}")
+            self._remove(data_path, meta_path, self._peaks_path(data_path))
+            return None
+
+        try:
+            stat = os.stat(file_path)
+            if stat.st_size != meta.get('size') or stat.st_mtime_ns != meta.get('mtime_ns'):
+                if stat.st_size != meta.get('size') or file_content_hash(file_path) != meta.get('content_hash'):
+                    logger.info(f"Audio cache entry stale, re-decoding: {file_path}")
+                    self._remove(data_path, meta_path, self._peaks_path(data_path))
+                    return None
+                # Same bytes, new mtime (e.g. touched or copied): refresh
+                meta['mtime_ns'] = stat.st_mtime_ns
+                self._write_meta(meta_path, meta)
+
+            samples = np.load(data_path, mmap_mode='r', allow_pickle=False)
+        except Exception as e:
+            logger.warning(f"Discarding audio cache entry for {file_path}: {e}")
+            self._remove(data_path, meta_path, self._peaks_path(data_path))
+            return None
+
+        # Plain ndarray view over the mapping; slicing memmap objects is slower
+        return np.asarray(samples), meta
+
+    def load_peaks(self, file_path: str, samplerate: int, channels: int) -> Optional[np.ndarray]:
+        """Load the waveform peaks stored with an entry.
+
+        Call after load() has validated the entry.
+
+        Args:
+            file_path: Resolved source audio path
+            samplerate: Engine sample rate of the entry
+            channels: Engine channel count of the entry
+
+        Returns:
+            Read-only float32 peak data (see dsp.PeakPyramid), or None if
+            the entry has none
+        """
+        data_path, _ = self._entry_paths(file_path, samplerate, channels)
+        try:
+            return np.asarray(np.load(self._peaks_path(data_path), mmap_mode='r', allow_pickle=False))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.debug(f"Could not load waveform peaks for {file_path}: {e}")
+            return None
+
+    def store(
+        self,
+        file_path: str,
+        samplerate: int,
+        channels: int,
+        samples: np.ndarray,
+        extra: Optional[Dict[str, Any]] = None,
+        peaks: Optional[np.ndarray] = None,
+    ) -> None:
+        """Write decoded samples for a source file.
+
+        Args:
+            file_path: Resolved source audio path
+            samplerate: Engine sample rate the samples were rendered for
+            channels: Engine channel count the samples were rendered for
+            samples: float32 samples shaped (frames, channels)
+            extra: Additional metadata to keep with the entry
+            peaks: Waveform peak data to keep with the entry
+        """
+        data_path, meta_path = self._entry_paths(file_path, samplerate, channels)
+        try:
+            stat = os.stat(file_path)
+            meta = {
+                'version': CACHE_FORMAT_VERSION,
+                'path': file_path,
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'content_hash': file_content_hash(file_path),
+                'samplerate': samplerate,
+                'channels': channels,
+            }
+            if extra:
+                meta.update(extra)
+
+            self._write_array(data_path, samples)
+            if peaks is not None:
+                self._write_array(self._peaks_path(data_path), peaks)
+            self._write_meta(meta_path, meta)
+            logger.debug(f"Stored decoded audio in disk cache: {file_path}")
+        except Exception as e:
+            logger.warning(f"Could not write audio cache entry for {file_path}: {e}")
+
+    def update(self, file_path: str, samplerate: int, channels: int, extra: Dict[str, Any]) -> None:
+        """Add metadata to an existing entry, e.g. a later analysis result.
+
+        Args:
+            file_path: Resolved source audio path
+            samplerate: Engine sample rate of the entry
+            channels: Engine channel count of the entry
+            extra: Metadata to merge into the entry
+        """
+        _, meta_path = self._entry_paths(file_path, samplerate, channels)
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            meta.update(extra)
+            self._write_meta(meta_path, meta)
+        except Exception as e:
+            logger.warning(f"Could not update audio cache entry for {file_path}: {e}")
+
+    def store_peaks(self, file_path: str, samplerate: int, channels: int, peaks: np.ndarray) -> None:
+        """Add waveform peaks to an existing entry.
+
+        Args:
+            file_path: Resolved source audio path
+            samplerate: Engine sample rate of the entry
+            channels: Engine channel count of the entry
+            peaks: Peak data (see dsp.PeakPyramid)
+        """
+        data_path, _ = self._entry_paths(file_path, samplerate, channels)
+        try:
+            self._write_array(self._peaks_path(data_path), peaks)
+        except Exception as e:
+            logger.warning(f"Could not store waveform peaks for {file_path}: {e}")
+
+    def _write_array(self, path: Path, array: np.ndarray) -> None:
+        tmp_path = path.with_name(path.name + f'.{os.getpid()}.tmp')
+        with open(tmp_path, 'wb') as f:
+            np.save(f, np.ascontiguousarray(array, dtype=np.float32), allow_pickle=False)
+        os.replace(tmp_path, path)
+
+    def _write_meta(self, meta_path: Path, meta: Dict[str, Any]) -> None:
+        tmp_path = meta_path.with_name(meta_path.name + f'.{os.getpid()}.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+
+    def _remove(self, *paths: Path) -> None:
+        for path in paths:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.debug(f"Could not remove {path}: {e}")
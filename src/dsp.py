@@ -0,0 +1,778 @@
+"""Vectorized signal processing helpers for the audio engine."""
+
+from fractions import Fraction
+from functools import lru_cache
+
+import numpy as np
+
+# Zero crossings of the sinc kernel on each side of the centre tap
+RESAMPLER_ZERO_CROSSINGS = 16
+
+# Kaiser window shape; ~90 dB stopband attenuation
+RESAMPLER_KAISER_BETA = 8.6
+
+# Fraction of the lower Nyquist frequency kept by the anti-alias filter
+RESAMPLER_ROLLOFF = 0.95
+
+# Largest polyphase table precomputed; other ratios compute weights per chunk
+_MAX_TABLE_PHASES = 4096
+
+# Output frames computed per vectorized step, bounds temporary memory
+_RESAMPLE_CHUNK_FRAMES = 16384
+
+# Frames per value of a clip's RMS envelope
+ENVELOPE_WINDOW_FRAMES = 1024
+
+
+class Resampler:
+    """Band-limited windowed-sinc sample rate converter.
+
+    Works on (frames, channels) float32 blocks and keeps the filter
+    history between calls, so a clip can be converted in one call or
+    streamed through in pieces with identical output. For rational
+    ratios such as 44100 -> 48000 the filter weights for every phase are
+    precomputed once; each output frame is then a gather plus a dot
+    product, done for thousands of frames per numpy call.
+    """
+
+    def __init__(self, src_rate: int, dst_rate: int, channels: int):
+        """Create a resampler.
+
+        Args:
+            src_rate: Input sample rate
+            dst_rate: Output sample rate
+            channels: Channel count of every block passed to process()
+        """
+        ratio = Fraction(int(dst_rate), int(src_rate))
+        self.src_rate = int(src_rate)
+        self.dst_rate = int(dst_rate)
+        self.channels = channels
+        self._up = ratio.numerator
+        self._down = ratio.denominator
+
+        cutoff = min(1.0, dst_rate / src_rate) * RESAMPLER_ROLLOFF
+        self._cutoff = cutoff
+        self._half = int(np.ceil(RESAMPLER_ZERO_CROSSINGS / cutoff))
+        self._taps = 2 * self._half
+        self._offsets = np.arange(self._taps) - (self._half - 1)
+        self._table = None
+        if self._up <= _MAX_TABLE_PHASES:
+            self._table = self._weights(np.arange(self._up) / self._up)
+
+        # Input history starts with half a kernel of silence so the first
+        # output frame is centred on the first input frame
+        self._buffer = np.zeros((self._half - 1, channels), dtype=np.float32)
+        self._buffer_start = -(self._half - 1)
+        self._frames_in = 0
+        self._frames_out = 0
+
+    def _weights(self, frac: np.ndarray) -> np.ndarray:
+        """Kernel weights for fractional positions, shaped (len(frac), taps)."""
+        u = frac[:, None] - self._offsets[None, :]
+        kernel = self._cutoff * np.sinc(self._cutoff * u)
+        edge = np.clip(1.0 - (u / self._half) ** 2, 0.0, None)
+        window = np.i0(RESAMPLER_KAISER_BETA * np.sqrt(edge)) / np.i0(RESAMPLER_KAISER_BETA)
+        weights = kernel * window
+        weights /= weights.sum(axis=1, keepdims=True)
+        return weights.astype(np.float32)
+
+    def process(self, block: np.ndarray, final: bool = False) -> np.ndarray:
+        """Convert the next block of input.
+
+        Args:
+            block: float32 samples shaped (frames, channels); may be empty
+            final: True for the last block; flushes the filter tail
+
+        Returns:
+            float32 output samples shaped (frames, channels)
+        """
+        if len(block):
+            self._buffer = np.concatenate((self._buffer, block.astype(np.float32, copy=False)))
+            self._frames_in += len(block)
+        if final:
+            tail = np.zeros((self._half, self.channels), dtype=np.float32)
+            self._buffer = np.concatenate((self._buffer, tail))
+
+        buffer_end = self._buffer_start + len(self._buffer)
+        # Output j needs input up to floor(j * down / up) + half
+        last_j = ((buffer_end - self._half) * self._up) // self._down
+        if final:
+            total_out = -(-self._frames_in * self._up // self._down)
+            last_j = min(last_j, total_out - 1)
+        if last_j < self._frames_out:
+            return np.zeros((0, self.channels), dtype=np.float32)
+
+        out = np.empty((last_j - self._frames_out + 1, self.channels), dtype=np.float32)
+        for start in range(0, len(out), _RESAMPLE_CHUNK_FRAMES):
+            j = np.arange(
+                self._frames_out + start,
+                self._frames_out + min(start + _RESAMPLE_CHUNK_FRAMES, len(out)),
+                dtype=np.int64,
+            )
+            base, phase = np.divmod(j * self._down, self._up)
+            if self._table is not None:
+                weights = self._table[phase]
+            else:
+                weights = self._weights(phase / self._up)
+            index = (base - self._buffer_start)[:, None] + self._offsets[None, :]
+            window = self._buffer[index]  # (n, taps, channels)
+            out[start:start + len(j)] = np.einsum('nt,ntc->nc', weights, window)
+
+        self._frames_out = last_j + 1
+        # Drop input no future output frame can reach
+        keep_from = (self._frames_out * self._down) // self._up - (self._half - 1)
+        drop = keep_from - self._buffer_start
+        if drop > 0:
+            self._buffer = self._buffer[drop:]
+            self._buffer_start = keep_from
+        return out
+
+
+def resample(samples: np.ndarray, src_rate: int, dst_rate: int) -> np.ndarray:
+    """Convert a whole (frames, channels) float32 buffer to another rate.
+
+    Args:
+        samples: Input samples
+        src_rate: Input sample rate
+        dst_rate: Output sample rate
+
+    Returns:
+        Resampled float32 samples; the input itself if the rates match
+    """
+    if src_rate == dst_rate or len(samples) == 0:
+        return samples
+    return Resampler(src_rate, dst_rate, samples.shape[1]).process(samples, final=True)
+
+
+def rms_envelope(samples: np.ndarray, window: int = ENVELOPE_WINDOW_FRAMES) -> np.ndarray:
+    """Coarse RMS level of a (frames, channels) buffer.
+
+    Args:
+        samples: Input samples
+        window: Frames per envelope value
+
+    Returns:
+        float32 array with one RMS value per ``window`` frames
+    """
+    n = -(-len(samples) // window)
+    if n == 0:
+        return np.zeros(0, dtype=np.float32)
+    padded = np.zeros((n * window, samples.shape[1]), dtype=np.float32)
+    padded[:len(samples)] = samples
+    power = np.square(padded).reshape(n, -1).mean(axis=1)
+    return np.sqrt(power).astype(np.float32)
+
+
+# Gain within this of unity counts as fully recovered
+_UNITY_EPSILON = 1e-6
+
+
+def run_ops(ops: list) -> None:
+    """Apply a precomputed list of (ufunc, a, b, out) steps.
+
+    Indexes with a while loop: iterating a list allocates an iterator,
+    and the real-time render path must not allocate.
+    """
+    count = len(ops)
+    i = 0
+    while i < count:
+        func, a, b, out = ops[i]
+        func(a, b, out=out)
+        i += 1
+
+
+def run_copies(copies: list) -> None:
+    """Apply a precomputed list of (destination, source) copies."""
+    count = len(copies)
+    i = 0
+    while i < count:
+        dst, src = copies[i]
+        np.copyto(dst, src)
+        i += 1
+
+
+def _shift_plan(buffer: np.ndarray, frames: int, history: int) -> list:
+    """Copies moving the last ``history`` rows of a block to the front."""
+    src = buffer[frames:frames + history]
+    dst = buffer[:history]
+    if frames >= history:
+        return [(dst, src)]
+    tmp = np.empty_like(src)
+    return [(tmp, src), (dst, tmp)]
+
+
+def fold_plan(func, values: np.ndarray, scratch: np.ndarray) -> tuple:
+    """Plan the minimum or maximum of ``values`` as element-wise steps.
+
+    Numpy reductions allocate internally even with ``out``, so the
+    reduction is done as log2(n) pairwise steps between two halves of a
+    scratch buffer. No step writes over its own input: single-element
+    ufuncs allocate when they do.
+
+    Args:
+        func: np.minimum or np.maximum
+        values: 1-D input view, read when the plan runs
+        scratch: Buffer at least one longer than ``values``
+
+    Returns:
+        Tuple of (ops for run_ops, 0-d view holding the result)
+    """
+    half_len = (len(values) + 1) // 2
+    buffers = (scratch[:half_len], scratch[half_len:2 * half_len])
+    ops = []
+    src = values
+    size = len(values)
+    steps = 0
+    while size > 1:
+        half = size // 2
+        keep = size - half
+        dst = buffers[steps % 2]
+        steps += 1
+        ops.append((func, src[:half], src[keep:size], dst[:half]))
+        if keep > half:
+            ops.append((func, src[half:keep], src[half:keep], dst[half:keep]))
+        src = dst
+        size = keep
+    return ops, src[:1].reshape(())
+
+
+def sliding_min_plan(values: np.ndarray, window: int, out: np.ndarray, scratch: tuple) -> list:
+    """Plan the minimum of every run of ``window`` consecutive values.
+
+    A sparse table: each step halves the work left by taking minima of
+    pairs of runs twice as long, and the last step combines two
+    overlapping power-of-two runs, so the cost is log2(window) passes.
+
+    Args:
+        values: 1-D input view of len(out) + window - 1 values
+        window: Run length
+        out: Receives the minima
+        scratch: Two buffers as long as ``values``
+
+    Returns:
+        Ops for run_ops
+    """
+    ops = []
+    src = values
+    length = len(values)
+    span = 1
+    while span * 2 <= window:
+        length -= span
+        dst = scratch[len(ops) % 2]
+        ops.append((np.minimum, src[:length], src[span:span + length], dst[:length]))
+        src = dst
+        span *= 2
+    n = len(out)
+    ops.append((np.minimum, src[:n], src[window - span:window - span + n], out))
+    return ops
+
+
+def moving_sum_plan(values: np.ndarray, window: int, out: np.ndarray, scratch: tuple) -> list:
+    """Plan the sum of every run of ``window`` consecutive values.
+
+    Sums over power-of-two runs are built by doubling, and each run is
+    the sum of the pieces given by the binary digits of ``window``.
+
+    Args:
+        values: 1-D input view of len(out) + window - 1 values
+        window: Run length
+        out: Receives the sums
+        scratch: Two buffers as long as ``values``
+
+    Returns:
+        Ops for run_ops
+    """
+    ops = []
+    n = len(out)
+    # A 0-d array, not a numpy scalar: scalar operands allocate per call
+    one = np.ones((), dtype=out.dtype)
+    src = values
+    length = len(values)
+    span = 1
+    offset = 0
+    doublings = 0
+    while True:
+        if window & span:
+            piece = src[offset:offset + n]
+            if offset == 0:
+                ops.append((np.multiply, piece, one, out))
+            else:
+                ops.append((np.add, out, piece, out))
+            offset += span
+        if span * 2 > window:
+            return ops
+        length -= span
+        dst = scratch[doublings % 2]
+        ops.append((np.add, src[:length], src[span:span + length], dst[:length]))
+        src = dst
+        span *= 2
+        doublings += 1
+
+
+class Limiter:
+    """Look-ahead peak limiter for the master bus.
+
+    The signal is delayed by the look-ahead time. Each output frame's gain
+    is the smallest gain any frame in the following look-ahead window
+    needs to stay under the ceiling, smoothed by a moving average over the
+    same window, so gain reduction ramps in before a peak arrives instead
+    of clipping it. Gain recovers linearly over the release time.
+
+    process() allocates nothing once it has seen a block size: the delay
+    line, histories and scratch space are preallocated, and every step is
+    an element-wise ufunc on views planned in advance (see run_ops).
+    Blocks that need no reduction only pass through the delay line.
+    """
+
+    def __init__(
+        self,
+        samplerate: int,
+        channels: int,
+        ceiling_db: float = -1.0,
+        lookahead_ms: float = 2.0,
+        release_ms: float = 100.0,
+    ):
+        """Create a limiter.
+
+        Args:
+            samplerate: Sample rate of the bus
+            channels: Channel count of the bus
+            ceiling_db: Highest output peak in dBFS
+            lookahead_ms: Look-ahead (and added latency) in milliseconds
+            release_ms: Time to recover from full reduction to unity gain
+        """
+        self.ceiling = float(10.0 ** (ceiling_db / 20.0))
+        self.lookahead = max(1, int(round(samplerate * lookahead_ms / 1000.0)))
+        self.channels = channels
+        self._release_step = 1.0 / max(1.0, samplerate * release_ms / 1000.0)
+        self._gain = np.ones((), dtype=np.float32)
+        self._ceiling = np.array(self.ceiling, dtype=np.float32)
+        self._one = np.ones((), dtype=np.float32)
+        self._floor = np.array(1e-12, dtype=np.float32)
+        self._window = np.array(self.lookahead + 1, dtype=np.float32)
+        self._frames = 0
+        self._idle = True
+        self._quiet_blocks = 0
+
+    @property
+    def gain(self) -> float:
+        """Gain applied to the most recent output frame."""
+        return float(self._gain)
+
+    def _prepare(self, frames: int) -> None:
+        """Allocate buffers and plan the steps for blocks of ``frames``.
+
+        The delay line and gain histories carry over from the previous
+        block size.
+        """
+        lookahead = self.lookahead
+        n = frames
+        total = lookahead + n
+        x = np.zeros((total, self.channels), dtype=np.float32)
+        r = np.ones(total, dtype=np.float32)
+        m = np.ones(total, dtype=np.float32)
+        if self._frames:
+            x[:lookahead] = self._x[:lookahead]
+            r[:lookahead] = self._r[:lookahead]
+            m[:lookahead] = self._m[:lookahead]
+        self._x, self._r, self._m = x, r, m
+        self._frames = n
+        # Enough quiet blocks for the quiet frames to fill both histories
+        self._settle_blocks = -(-2 * lookahead // n) + 1
+
+        scratch = (np.empty(total, dtype=np.float32), np.empty(total, dtype=np.float32))
+        magnitudes = np.empty((n, self.channels), dtype=np.float32)
+        peaks = np.empty(n, dtype=np.float32)
+        gains = np.empty(n, dtype=np.float32)
+        required = r[lookahead:]
+        self._magnitudes = magnitudes
+        self._gains = gains
+        self._gain_last = gains[n - 1:n].reshape(())
+        self._delayed = x[:n]
+        self._x_tail = x[lookahead:]
+        self._y = np.empty((n, self.channels), dtype=np.float32)
+
+        columns = [magnitudes[:, c] for c in range(self.channels)]
+        ops = [(np.maximum, columns[0], columns[-1], peaks)]
+        ops += [(np.maximum, peaks, column, peaks) for column in columns[1:-1]]
+        ops += [
+            (np.maximum, peaks, self._floor, peaks),
+            (np.divide, self._ceiling, peaks, peaks),
+            (np.minimum, peaks, self._one, required),
+        ]
+        fold, self._block_min = fold_plan(np.minimum, required, scratch[0])
+        self._required_ops = ops + fold
+
+        ops = sliding_min_plan(r, lookahead + 1, m[lookahead:], scratch)
+        ops += moving_sum_plan(m, lookahead + 1, gains, scratch)
+        ops.append((np.divide, gains, self._window, gains))
+
+        # Linear release: gain may rise by at most one step per frame, a
+        # running minimum done as a log-step scan between two buffers
+        steps = (np.arange(1, n + 1) * self._release_step).astype(np.float32)
+        src, dst = scratch[0][:n], scratch[1][:n]
+        ops += [(np.subtract, gains, steps, src), (np.minimum, src, self._gain, src)]
+        shift = 1
+        while shift < n:
+            ops.append((np.minimum, src[shift:], src[:n - shift], dst[shift:]))
+            ops.append((np.minimum, src[:shift], src[:shift], dst[:shift]))
+            src, dst = dst, src
+            shift *= 2
+        ops += [
+            (np.add, src, steps, src),
+            (np.minimum, gains, src, gains),
+            (np.minimum, gains, self._one, gains),
+        ]
+        ops += [(np.multiply, x[:n, c], gains, self._y[:, c]) for c in range(self.channels)]
+        self._limit_ops = ops
+
+        # Histories move to the front of each buffer; through a temporary
+        # when source and destination overlap
+        self._x_shift = _shift_plan(x, n, lookahead)
+        self._history_shift = _shift_plan(r, n, lookahead) + _shift_plan(m, n, lookahead)
+
+    def process(self, block: np.ndarray) -> None:
+        """Limit one block in place; the output lags the input by ``lookahead``.
+
+        Args:
+            block: float32 samples shaped (frames, channels)
+        """
+        n = len(block)
+        if n == 0:
+            return
+        if n != self._frames:
+            self._prepare(n)
+        np.copyto(self._x_tail, block)
+        np.abs(block, out=self._magnitudes)
+        run_ops(self._required_ops)
+        quiet = float(self._block_min) >= 1.0
+
+        if quiet and self._idle:
+            # Nothing to limit: only the delay line moves
+            np.copyto(block, self._delayed)
+            run_copies(self._x_shift)
+            return
+
+        run_ops(self._limit_ops)
+        np.copyto(block, self._y)
+        np.copyto(self._gain, self._gain_last)
+        run_copies(self._x_shift)
+        run_copies(self._history_shift)
+
+        if not quiet:
+            self._quiet_blocks = 0
+        elif self._quiet_blocks < self._settle_blocks:
+            self._quiet_blocks += 1
+        elif float(self._gain) >= 1.0 - _UNITY_EPSILON:
+            self._gain.fill(1.0)
+            self._idle = True
+            return
+        self._idle = False
+
+
+
+# Loudness analysis after ITU-R BS.1770: 400 ms blocks every 100 ms,
+# gated at -70 LUFS absolute and 10 LU below the ungated level
+LOUDNESS_BLOCK_SECONDS = 0.4
+LOUDNESS_STEP_SECONDS = 0.1
+LOUDNESS_ABSOLUTE_GATE = -70.0
+LOUDNESS_RELATIVE_GATE = -10.0
+
+# Level reported for digital silence
+SILENCE_DB = -120.0
+
+# True peak is measured on a 4x upsampling with a 48-tap polyphase FIR,
+# as in ITU-R BS.1770 Annex 2
+TRUE_PEAK_OVERSAMPLE = 4
+TRUE_PEAK_TAPS_PER_PHASE = 12
+
+# Frames analysed per step, and history prepended to each FFT so the
+# K-weighting filter has settled at the segment start
+_ANALYSIS_SEGMENT_FRAMES = 65536
+_ANALYSIS_MARGIN_FRAMES = 8192
+
+
+def _biquad_response(b: tuple, a: tuple, z: np.ndarray) -> np.ndarray:
+    zi = 1.0 / z
+    return (b[0] + b[1] * zi + b[2] * zi * zi) / (a[0] + a[1] * zi + a[2] * zi * zi)
+
+
+@lru_cache(maxsize=8)
+def _k_weighting(samplerate: int, fft_len: int) -> np.ndarray:
+    """Complex response of the BS.1770 K-weighting filter on an rfft grid.
+
+    Both stages (the head-related high shelf and the RLB high-pass) are
+    designed from their analog prototypes, so any sample rate works.
+    """
+    z = np.exp(2j * np.pi * np.fft.rfftfreq(fft_len))
+
+    # Stage 1: +4 dB high shelf around 1.5 kHz
+    k = np.tan(np.pi * 1681.974450955533 / samplerate)
+    vh = 10.0 ** (3.999843853973347 / 20.0)
+    vb = vh ** 0.4996667741545416
+    q = 0.7071752369554196
+    a0 = 1.0 + k / q + k * k
+    shelf = _biquad_response(
+        ((vh + vb * k / q + k * k) / a0, 2.0 * (k * k - vh) / a0, (vh - vb * k / q + k * k) / a0),
+        (1.0, 2.0 * (k * k - 1.0) / a0, (1.0 - k / q + k * k) / a0),
+        z,
+    )
+
+    # Stage 2: high-pass around 38 Hz
+    k = np.tan(np.pi * 38.13547087602444 / samplerate)
+    q = 0.5003270373238773
+    a0 = 1.0 + k / q + k * k
+    highpass = _biquad_response(
+        (1.0, -2.0, 1.0),
+        (1.0, 2.0 * (k * k - 1.0) / a0, (1.0 - k / q + k * k) / a0),
+        z,
+    )
+    response = (shelf * highpass).astype(np.complex64)
+    response.flags.writeable = False
+    return response
+
+
+def _true_peak_kernel() -> np.ndarray:
+    """Interpolation weights for the in-between phases, shaped (taps, phases - 1)."""
+    half = TRUE_PEAK_TAPS_PER_PHASE // 2
+    offsets = np.arange(-half + 1, half + 1)
+    frac = np.arange(1, TRUE_PEAK_OVERSAMPLE) / TRUE_PEAK_OVERSAMPLE
+    u = frac[None, :] - offsets[:, None]
+    window = np.i0(RESAMPLER_KAISER_BETA * np.sqrt(np.clip(1.0 - (u / half) ** 2, 0.0, None)))
+    return (np.sinc(u) * window / np.i0(RESAMPLER_KAISER_BETA)).astype(np.float32)
+
+
+def _to_db(power: float, scale: float = 10.0) -> float:
+    return float(scale * np.log10(power)) if power > 0 else SILENCE_DB
+
+
+def analyze_loudness(samples: np.ndarray, samplerate: int) -> dict:
+    """Measure the loudness and peaks of a (frames, channels) buffer.
+
+    Loudness is K-weighted in the frequency domain, one FFT per segment,
+    then gated over overlapping blocks found with a running sum. The true
+    peak interpolates the three in-between phases of every frame with one
+    matrix product per segment.
+
+    Args:
+        samples: float32 samples in [-1, 1]
+        samplerate: Sample rate in Hz
+
+    Returns:
+        Dictionary with 'lufs' (gated integrated loudness), 'rms_db',
+        'peak_db' and 'true_peak_db'; silence reads as SILENCE_DB
+    """
+    frames, channels = samples.shape
+    if frames == 0:
+        return {'lufs': SILENCE_DB, 'rms_db': SILENCE_DB, 'peak_db': SILENCE_DB, 'true_peak_db': SILENCE_DB}
+
+    margin = _ANALYSIS_MARGIN_FRAMES
+    segment = min(_ANALYSIS_SEGMENT_FRAMES, frames)
+    # Power-of-two transforms; other lengths can have large prime factors
+    fft_len = 1 << (segment + margin - 1).bit_length()
+    weighting = _k_weighting(samplerate, fft_len)
+    kernel = _true_peak_kernel()
+    taps = len(kernel)
+
+    # Channel-major copy with leading silence for the filter history
+    padded = np.zeros((channels, margin + frames + taps), dtype=np.float32)
+    padded[:, margin:margin + frames] = samples.T
+
+    weighted_power = np.empty(frames, dtype=np.float64)
+    true_peak = 0.0
+    for start in range(0, frames, segment):
+        n = min(segment, frames - start)
+        spectrum = np.fft.rfft(padded[:, start:start + margin + n], n=fft_len)
+        filtered = np.fft.irfft(spectrum * weighting, n=fft_len)[:, margin:margin + n]
+        weighted_power[start:start + n] = np.square(filtered, dtype=np.float64).sum(axis=0)
+
+        # Frames start - half + 1 .. start + n + half around each output
+        first = margin + start - taps // 2 + 1
+        windows = np.lib.stride_tricks.sliding_window_view(padded[:, first:first + n + taps - 1], taps, axis=1)
+        true_peak = max(true_peak, float(np.abs(windows @ kernel).max()))
+
+    # Mean square of every gating block, via a running sum
+    block = min(frames, int(round(LOUDNESS_BLOCK_SECONDS * samplerate)))
+    step = max(1, int(round(LOUDNESS_STEP_SECONDS * samplerate)))
+    sums = np.concatenate(([0.0], np.cumsum(weighted_power)))
+    starts = np.arange(0, frames - block + 1, step)
+    block_power = (sums[starts + block] - sums[starts]) / block
+    with np.errstate(divide='ignore'):
+        block_lufs = -0.691 + 10.0 * np.log10(block_power)
+
+    gated = block_power[block_lufs > LOUDNESS_ABSOLUTE_GATE]
+    lufs = SILENCE_DB
+    if len(gated):
+        relative_gate = -0.691 + 10.0 * np.log10(gated.mean()) + LOUDNESS_RELATIVE_GATE
+        gated = gated[-0.691 + 10.0 * np.log10(gated) > relative_gate]
+        lufs = -0.691 + _to_db(float(gated.mean()))
+
+    peak = float(np.abs(samples).max())
+    return {
+        'lufs': round(lufs, 3),
+        'rms_db': round(_to_db(float(np.mean(np.square(samples, dtype=np.float64)))), 3),
+        'peak_db': round(_to_db(peak, 20.0), 3),
+        'true_peak_db': round(_to_db(max(true_peak, peak), 20.0), 3),
+    }
+
+
+# Frames scanned per step when looking for a clip's first audible frame
+_ONSET_CHUNK_FRAMES = 8192
+
+
+def find_onset(samples: np.ndarray, threshold_db: float) -> int:
+    """Find the first frame of a (frames, channels) buffer that is audible.
+
+    Scans from the start in chunks, so only the leading silence and one
+    chunk of the clip are read.
+
+    Args:
+        samples: float32 samples in [-1, 1]
+        threshold_db: Level in dBFS a sample on any channel must reach
+
+    Returns:
+        Index of the first frame at or above the threshold, or 0 if the
+        whole buffer stays below it
+    """
+    threshold = np.float32(10.0 ** (threshold_db / 20.0))
+    for start in range(0, len(samples), _ONSET_CHUNK_FRAMES):
+        chunk = samples[start:start + _ONSET_CHUNK_FRAMES]
+        loud = np.flatnonzero((np.abs(chunk) >= threshold).any(axis=1))
+        if len(loud):
+            return start + int(loud[0])
+    return 0
+
+
+# Frames per bucket of a peak pyramid's finest level
+PEAK_BASE_FRAMES = 256
+
+# Frames reduced per step when building the finest level; a multiple of
+# PEAK_BASE_FRAMES that bounds temporary memory for mapped clips
+_PEAK_CHUNK_FRAMES = PEAK_BASE_FRAMES * 1024
+
+
+class PeakPyramid:
+    """Multi-resolution min/max peaks of a clip, for drawing waveforms.
+
+    Level 0 holds the minimum and maximum sample (over all channels) of
+    every PEAK_BASE_FRAMES frames, and each further level halves the
+    resolution, down to a single bucket. All levels live in one float32
+    array shaped (buckets, 2), so a pyramid is stored next to its clip
+    as one extra array about 1/256 the size of mono PCM. peaks() draws
+    from the coarsest level that still resolves each pixel, touching at
+    most about two buckets per pixel whatever the zoom.
+    """
+
+    def __init__(self, data: np.ndarray, frames: int, base_frames: int = PEAK_BASE_FRAMES):
+        """Wrap pyramid data built by from_samples().
+
+        Args:
+            data: float32 (buckets, 2) array of every level, finest first
+            frames: Frames in the clip the peaks were taken from
+            base_frames: Frames per bucket of level 0
+
+        Raises:
+            ValueError: If ``data`` does not match ``frames``
+        """
+        sizes = self._level_sizes(frames, base_frames)
+        if data.shape != (sum(sizes), 2):
+            raise ValueError(f"Peak data shaped {data.shape} does not fit {frames} frames")
+        self.data = data
+        self.frames = frames
+        self.base_frames = base_frames
+        self.levels = []
+        offset = 0
+        for size in sizes:
+            self.levels.append(data[offset:offset + size])
+            offset += size
+
+    @staticmethod
+    def _level_sizes(frames: int, base_frames: int) -> list:
+        sizes = []
+        size = -(-frames // base_frames)
+        while size > 1:
+            sizes.append(size)
+            size = -(-size // 2)
+        if size == 1:
+            sizes.append(1)
+        return sizes
+
+    @classmethod
+    def from_samples(cls, samples: np.ndarray, base_frames: int = PEAK_BASE_FRAMES) -> 'PeakPyramid':
+        """Build the pyramid of a (frames, channels) buffer.
+
+        Args:
+            samples: float32 samples
+            base_frames: Frames per bucket of level 0
+
+        Returns:
+            PeakPyramid of the samples
+        """
+        frames = len(samples)
+        sizes = cls._level_sizes(frames, base_frames)
+        data = np.empty((sum(sizes), 2), dtype=np.float32)
+        if not sizes:
+            return cls(data, frames, base_frames)
+
+        finest = data[:sizes[0]]
+        chunk_frames = _PEAK_CHUNK_FRAMES // base_frames * base_frames or base_frames
+        for start in range(0, frames, chunk_frames):
+            chunk = np.ascontiguousarray(samples[start:start + chunk_frames])
+            bucket = start // base_frames
+            whole = len(chunk) // base_frames
+            if whole:
+                rows = chunk[:whole * base_frames].reshape(whole, -1)
+                np.min(rows, axis=1, out=finest[bucket:bucket + whole, 0])
+                np.max(rows, axis=1, out=finest[bucket:bucket + whole, 1])
+            if whole * base_frames < len(chunk):
+                tail = chunk[whole * base_frames:]
+                finest[bucket + whole] = tail.min(), tail.max()
+
+        offset = 0
+        for size, coarser in zip(sizes, sizes[1:]):
+            level = data[offset:offset + size]
+            offset += size
+            parent = data[offset:offset + coarser]
+            pairs = size // 2
+            np.minimum(level[0:2 * pairs:2, 0], level[1:2 * pairs:2, 0], out=parent[:pairs, 0])
+            np.maximum(level[0:2 * pairs:2, 1], level[1:2 * pairs:2, 1], out=parent[:pairs, 1])
+            if size % 2:
+                parent[-1] = level[-1]
+        return cls(data, frames, base_frames)
+
+    def peaks(self, pixels: int, start: int = 0, end: int = None) -> np.ndarray:
+        """Min/max of each pixel column across a range of the clip.
+
+        Args:
+            pixels: Number of columns to draw
+            start: First frame of the range
+            end: Frame after the range; defaults to the end of the clip
+
+        Returns:
+            float32 array shaped (pixels, 2) of (min, max) per column;
+            zeros where the range is empty
+        """
+        end = self.frames if end is None else min(end, self.frames)
+        start = max(0, start)
+        pixels = max(0, int(pixels))
+        if pixels == 0 or end <= start or not self.levels:
+            return np.zeros((pixels, 2), dtype=np.float32)
+
+        # Coarsest level whose buckets are no wider than a pixel
+        per_pixel = (end - start) / pixels
+        index = 0
+        while index + 1 < len(self.levels) and (self.base_frames << (index + 1)) <= per_pixel:
+            index += 1
+        bucket_frames = self.base_frames << index
+        level = self.levels[index]
+
+        edges = start + np.arange(pixels + 1, dtype=np.int64) * (end - start) // pixels
+        first = edges[:-1] // bucket_frames
+        last = np.maximum(-(-edges[1:] // bucket_frames), first + 1) - 1
+        # reduceat covers first[i]..first[i + 1] - 1; the bucket straddling
+        # the next pixel's edge is folded in separately
+        span = level[:last[-1] + 1]
+        out = np.empty((pixels, 2), dtype=np.float32)
+        np.minimum(np.minimum.reduceat(span[:, 0], first), level[last, 0], out=out[:, 0])
+        np.maximum(np.maximum.reduceat(span[:, 1], first), level[last, 1], out=out[:, 1])
+        return out
@@ -0,0 +1,463 @@
+"""Audio engine hosted in a child process, driven over a command pipe."""
+
+import logging
+import multiprocessing
+import pickle
+import struct
+import threading
+from concurrent.futures import CancelledError, Future, as_completed
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .latency import get_latency_tracker
+
+logger = logging.getLogger(__name__)
+
+# How long start() waits for the child to import numpy, open its caches
+# and answer
+START_TIMEOUT_SECONDS = 15.0
+
+# How long stats() and stop_all() wait for the child
+REPLY_TIMEOUT_SECONDS = 5.0
+
+# Command opcodes, the first byte of every message to the engine
+_OP_TRIGGER = 1
+_OP_NAME = 2
+_OP_CALL = 3
+_OP_STOP = 4
+
+# Trigger: opcode, path id, gain, key id (-1 for none), and the input
+# event and dispatch times in perf_counter nanoseconds (0 when unknown).
+# Strings are sent once as names and referred to by id afterwards, so a
+# trigger is a fixed 29-byte message
+_TRIGGER = struct.Struct('<BIfiqq')
+_NAME = struct.Struct('<BI')
+_NO_KEY = -1
+
+
+class EngineProcess:
+    """Run the mixer, cache and output backend in a dedicated process.
+
+    The GUI, the hotkey listener and logging share one interpreter and
+    GIL, so a long repaint or asset load in the UI can hold up the audio
+    callback. With the engine in a child process the parent only sends
+    commands: triggers are packed into small binary messages on a pipe,
+    and everything else (preloads, pins, stats) is a pickled call whose
+    reply arrives on a second pipe. The child's main thread does nothing
+    but read commands, so triggers are handled as soon as they arrive.
+
+    Trigger latency keeps being measured end to end: the input event and
+    dispatch times stamped in this process travel with each trigger, and
+    the child's tracker measures from them. perf_counter is the system's
+    monotonic clock, which both processes share.
+
+    Exposes the AudioCache methods the app uses, so it can stand in for
+    the cache through audio.set_audio_engine().
+    """
+
+    def __init__(
+        self,
+        settings: Dict[str, Any],
+        keys: Optional[Dict[str, Dict[str, Any]]] = None,
+        cache_dir: Optional[str] = None,
+        log_path: Optional[str] = None,
+    ):
+        """Describe the engine to start.
+
+        Args:
+            settings: ``audio`` section of config.json
+            keys: Per-key settings for AudioCache.configure_keys()
+            cache_dir: Disk cache directory, or None for no disk cache
+            log_path: File the child also logs to
+        """
+        self._args = (settings, keys or {}, cache_dir, log_path)
+        self._process = None
+        self._commands = None
+        self._replies = None
+        self._send_lock = threading.Lock()
+        self._names: Dict[str, int] = {}
+        self._calls: Dict[int, Future] = {}
+        self._next_call = 0
+        self._reader: Optional[threading.Thread] = None
+        # Playhead fractions from the last answered query, and the query
+        # in flight
+        self._playheads: Dict[str, Optional[float]] = {}
+        self._playhead_query: Optional[Future] = None
+        # Answered waveforms and the queries in flight, by request
+        self._waveforms: Dict[Tuple, Any] = {}
+        self._waveform_queries: Dict[Tuple, Future] = {}
+
+    @property
+    def running(self) -> bool:
+        """Whether the child process is alive."""
+        return self._process is not None and self._process.is_alive()
+
+    def start(self) -> bool:
+        """Spawn the engine process and wait until it is ready.
+
+        Returns:
+            True if the engine answered within START_TIMEOUT_SECONDS
+        """
+        if self.running:
+            return True
+        try:
+            # Never fork the GUI process: its threads and Qt state do not
+            # survive it
+            context = multiprocessing.get_context('spawn')
+            commands_in, commands_out = context.Pipe(duplex=False)
+            replies_in, replies_out = context.Pipe(duplex=False)
+            self._process = context.Process(
+                target=_engine_main,
+                args=(commands_in, replies_out) + self._args,
+                name='audio-engine',
+                daemon=True,
+            )
+            self._process.start()
+            commands_in.close()
+            replies_out.close()
+            self._commands = commands_out
+            self._replies = replies_in
+            self._reader = threading.Thread(target=self._read_replies, name='audio-engine-replies', daemon=True)
+            self._reader.start()
+            if self._call('ping').result(timeout=START_TIMEOUT_SECONDS):
+                logger.info(f"Audio engine running in process {self._process.pid}")
+                return True
+        except Exception as e:
+            logger.error(f"Could not start audio engine process: {e}")
+        self.stop_all()
+        return False
+
+    def _send(self, message: bytes) -> bool:
+        try:
+            self._commands.send_bytes(message)
+            return True
+        except Exception as e:
+            logger.error(f"Audio engine unreachable: {e}")
+            return False
+
+    def _name_id(self, text: str) -> int:
+        """Id of a path or key, registering it with the child first (send lock held)."""
+        name_id = self._names.get(text)
+        if name_id is None:
+            name_id = len(self._names)
+            self._send(_NAME.pack(_OP_NAME, name_id) + text.encode('utf-8'))
+            self._names[text] = name_id
+        return name_id
+
+    def _call(self, method: str, *args) -> Future:
+        """Run a method in the child; the future resolves to its result."""
+        future: Future = Future()
+        with self._send_lock:
+            call_id = self._next_call
+            self._next_call += 1
+            self._calls[call_id] = future
+            if not self._send(bytes([_OP_CALL]) + pickle.dumps((call_id, method, args))):
+                self._calls.pop(call_id, None)
+                future.set_result(None)
+        return future
+
+    def _read_replies(self) -> None:
+        """Resolve call futures as the child's replies arrive."""
+        replies = self._replies
+        while True:
+            try:
+                call_id, result = replies.recv()
+            except (EOFError, OSError):
+                break
+            future = self._calls.pop(call_id, None)
+            if future is not None and not future.done():
+                future.set_result(result)
+        # The child is gone: nothing still pending will be answered
+        for call_id in list(self._calls):
+            future = self._calls.pop(call_id, None)
+            if future is not None and not future.done():
+                future.set_result(None)
+
+    def play_audio(self, file_path: str, gain: float = 1.0, key: Optional[str] = None) -> bool:
+        """Send a trigger to the engine.
+
+        Args:
+            file_path: Path to a WAV, MP3, FLAC or OGG file
+            gain: Linear gain for this voice
+            key: Pad that triggered playback, for per-key settings
+
+        Returns:
+            True if the trigger was sent; whether the clip could be played
+            is only known to the engine, which logs failures
+        """
+        stamps = get_latency_tracker().begin(key).stamps
+        with self._send_lock:
+            if self._commands is None:
+                return False
+            message = _TRIGGER.pack(
+                _OP_TRIGGER,
+                self._name_id(file_path),
+                gain,
+                self._name_id(key) if key is not None else _NO_KEY,
+                stamps.get('event', 0),
+                stamps.get('dispatch', 0),
+            )
+            return self._send(message)
+
+    def preload_async(self, file_path: str) -> Future:
+        """Decode an audio file into the engine's cache.
+
+        Args:
+            file_path: Path to a WAV, MP3, FLAC or OGG file
+
+        Returns:
+            Future resolving to True once the clip is ready to play (or
+            will stream), False if it failed to load
+        """
+        return self._call('preload', file_path)
+
+    def preload_many(
+        self,
+        file_paths: Iterable[str],
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> Dict[str, bool]:
+        """Decode many files in the engine and wait for them.
+
+        Args:
+            file_paths: Paths to load; duplicates are loaded once
+            progress: Called as progress(done, total) on the calling thread
+                before the first and after each completed load
+
+        Returns:
+            Dictionary mapping each path to whether it is ready to play
+        """
+        futures = {self.preload_async(p): p for p in dict.fromkeys(file_paths)}
+        total = len(futures)
+        results: Dict[str, bool] = {}
+        if progress:
+            progress(0, total)
+        for done, future in enumerate(as_completed(futures), start=1):
+            try:
+                results[futures[future]] = bool(future.result())
+            except CancelledError:
+                results[futures[future]] = False
+            if progress:
+                progress(done, total)
+        return results
+
+    def pin(self, file_paths: Iterable[str]) -> None:
+        """Keep files in the engine's cache regardless of its budget."""
+        self._call('pin', [str(p) for p in file_paths])
+
+    def unpin(self, file_paths: Iterable[str]) -> None:
+        """Let pinned files be evicted from the engine's cache again."""
+        self._call('unpin', [str(p) for p in file_paths])
+
+    def waveform(self, file_path: str, pixels: int, start: int = 0, end: Optional[int] = None):
+        """Waveform of a clip cached in the engine, without waiting for it.
+
+        The first call for a clip and width sends one query and returns
+        None; later calls return its answer once it has arrived, so a UI
+        timer polling this never blocks. A clip the engine had not cached
+        yet is asked for again on the next call.
+
+        Returns:
+            (pixels, 2) array of (min, max) per column, or None if the
+            clip is not cached or the engine has not answered yet
+        """
+        request = (str(file_path), pixels, start, end)
+        peaks = self._waveforms.get(request)
+        if peaks is not None:
+            return peaks
+        if request not in self._waveform_queries:
+            query = self._waveform_queries[request] = self._call('waveform', *request)
+            query.add_done_callback(lambda query, request=request: self._store_waveform(request, query))
+        return None
+
+    def playhead(self, key: str) -> Optional[float]:
+        """Fraction of its clip the newest voice of a key has played.
+
+        Does not wait for the engine (see playheads()).
+
+        Returns:
+            0 to 1, or None if the key is not playing or not answered yet
+        """
+        return self.playheads([key])[key]
+
+    def playheads(self, keys: Iterable[str]) -> Dict[str, Optional[float]]:
+        """Playhead fractions of several keys, without waiting for the engine.
+
+        Returns the answer to the previous query and sends a new one for
+        all ``keys`` unless one is still in flight, so a UI timer polling
+        this never blocks and sees positions one tick old.
+
+        Returns:
+            Dictionary mapping each key to 0 to 1, or None if it is not
+            playing or not answered yet
+        """
+        keys = list(keys)
+        query = self._playhead_query
+        if query is None or query.done():
+            query = self._playhead_query = self._call('playheads', keys)
+            query.add_done_callback(self._store_playheads)
+        playheads = self._playheads
+        return {key: playheads.get(key) for key in keys}
+
+    def _store_playheads(self, query: Future) -> None:
+        if not query.cancelled() and query.result() is not None:
+            self._playheads = query.result()
+
+    def _store_waveform(self, request: Tuple, query: Future) -> None:
+        if not query.cancelled() and query.result() is not None:
+            self._waveforms[request] = query.result()
+        self._waveform_queries.pop(request, None)
+
+    def bank_paths(self) -> List[str]:
+        """Paths of the clips in the engine's clip bank.
+
+        Waits for the engine, so call it at startup rather than from a UI
+        timer.
+        """
+        try:
+            return self._call('bank_paths').result(timeout=REPLY_TIMEOUT_SECONDS) or []
+        except Exception as e:
+            logger.warning(f"No clip bank listing from audio engine: {e}")
+            return []
+
+    def stats(self) -> Optional[Dict[str, Any]]:
+        """Get the engine's cache, backend and latency statistics.
+
+        Returns:
+            Dictionary with 'cache' (AudioCache.stats()), 'backend' (the
+            output backend's stats, or None) and 'latency' (trigger
+            latency summary lines), or None if the engine did not answer
+        """
+        try:
+            return self._call('stats').result(timeout=REPLY_TIMEOUT_SECONDS)
+        except Exception as e:
+            logger.warning(f"No stats from audio engine: {e}")
+            return None
+
+    def stop_all(self) -> None:
+        """Fade out playback, stop the engine and wait for it to exit."""
+        process = self._process
+        with self._send_lock:
+            commands, self._commands = self._commands, None
+        if commands is not None:
+            try:
+                commands.send_bytes(bytes([_OP_STOP]))
+            except Exception:
+                pass
+        if process is not None and process.pid is not None:
+            process.join(REPLY_TIMEOUT_SECONDS)
+            if process.is_alive():
+                logger.warning("Audio engine did not exit; terminating it")
+                process.terminate()
+                process.join(REPLY_TIMEOUT_SECONDS)
+        if commands is not None:
+            commands.close()
+        if self._reader is not None:
+            self._reader.join(REPLY_TIMEOUT_SECONDS)
+            self._reader = None
+        if self._replies is not None:
+            self._replies.close()
+            self._replies = None
+        self._process = None
+        self._names.clear()
+
+
+def _engine_main(
+    commands,
+    replies,
+    settings: Dict[str, Any],
+    keys: Dict[str, Dict[str, Any]],
+    cache_dir: Optional[str],
+    log_path: Optional[str],
+) -> None:
+    """Entry point of the engine process: serve commands until told to stop."""
+    handlers: List[logging.Handler] = [logging.StreamHandler()]
+    if log_path:
+        handlers.append(logging.FileHandler(log_path))
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(processName)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=handlers,
+    )
+
+    from .audio import get_audio_cache
+
+    cache = get_audio_cache()
+    cache.configure(settings)
+    cache.configure_keys(keys)
+    if cache_dir:
+        cache.set_disk_cache(cache_dir)
+    tracker = get_latency_tracker()
+
+    reply_lock = threading.Lock()
+
+    def reply(call_id: int, result: Any) -> None:
+        # Decode workers reply too
+        with reply_lock:
+            try:
+                replies.send((call_id, result))
+            except (OSError, ValueError):
+                pass
+
+    def preload(call_id: int, file_path: str) -> None:
+        if cache.is_streamed(file_path):
+            reply(call_id, True)
+            return
+        future = cache.preload_async(file_path)
+        future.add_done_callback(
+            lambda done: reply(call_id, not done.cancelled() and done.result() is not None)
+        )
+
+    def stats() -> Dict[str, Any]:
+        backend = cache.mixer.backend
+        return {
+            'cache': cache.stats(),
+            'backend': backend.stats() if backend is not None else None,
+            'latency': tracker.format_summary(),
+        }
+
+    calls = {
+        'ping': lambda: True,
+        'pin': cache.pin,
+        'unpin': cache.unpin,
+        'waveform': cache.waveform,
+        'playhead': cache.playhead,
+        'playheads': cache.playheads,
+        'bank_paths': cache.bank_paths,
+        'stats': stats,
+    }
+    names: Dict[int, str] = {}
+
+    try:
+        while True:
+            try:
+                message = commands.recv_bytes()
+            except (EOFError, OSError):
+                break  # parent exited
+            op = message[0]
+            if op == _OP_TRIGGER:
+                _, path_id, gain, key_id, event, dispatch = _TRIGGER.unpack(message)
+                key = names[key_id] if key_id != _NO_KEY else None
+                if key is not None and event:
+                    tracker.adopt(key, event, dispatch)
+                cache.play_audio(names[path_id], gain, key)
+            elif op == _OP_NAME:
+                _, name_id = _NAME.unpack_from(message)
+                names[name_id] = message[_NAME.size:].decode('utf-8')
+            elif op == _OP_CALL:
+                call_id, method, args = pickle.loads(message[1:])
+                if method == 'preload':
+                    preload(call_id, *args)
+                    continue
+                try:
+                    result = calls[method](*args)
+                except Exception as e:
+                    logger.error(f"Audio engine call {method} failed: {e}")
+                    result = None
+                reply(call_id, result)
+            elif op == _OP_STOP:
+                break
+    finally:
+        cache.stop_all()
+        backend = cache.mixer.backend
+        if backend is not None:
+            logger.info(f"Audio backend stats: {backend.stats()}")
+        replies.close()
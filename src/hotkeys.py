@@ -5,6 +5,8 @@ import threading
 from typing import Callable, Dict, Optional
 from pynput import keyboard
 
+from .latency import get_latency_tracker
+
 logger = logging.getLogger(__name__)
 
 
@@ -86,12 +88,20 @@ class GlobalHotKeyListener:
             
             # Call registered callback if exists
             if key_str and key_str in self._callbacks:
+                get_latency_tracker().mark_event(key_str)
                 callback = self._callbacks[key_str]
-                threading.Thread(target=callback, args=(key_str,), daemon=True).start()
+                threading.Thread(
+                    target=self._dispatch, args=(callback, key_str), daemon=True
+                ).start()
         
         except Exception as e:
             logger.error(f"Error handling key press: {e}")
     
+    def _dispatch(self, callback: Callable, key_str: str) -> None:
+        """Run a hotkey callback on its worker thread."""
+        get_latency_tracker().mark_dispatch(key_str)
+        callback(key_str)
+    
     def __del__(self):
         """Cleanup on deletion."""
         self.stop()
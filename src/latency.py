@@ -0,0 +1,227 @@
+"""Trigger-to-first-sample latency instrumentation."""
+
+import logging
+import math
+import queue
+import threading
+import time
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Stages stamped on the way from a key press or click to audible output:
+# the input event, handler dispatch, play_audio entry, clip ready in the
+# cache, voice queued on the mixer, and first sample written to the
+# output buffer
+STAGES = ('event', 'dispatch', 'trigger', 'lookup', 'voice_start', 'output')
+
+# Pending events older than this are dropped instead of being matched
+# with a later trigger of the same key
+STALE_EVENT_NS = 1_000_000_000
+
+# Histogram resolution: buckets per doubling of latency, from 1 us up
+_BUCKETS_PER_OCTAVE = 8
+_BUCKET_COUNT = 24 * _BUCKETS_PER_OCTAVE  # up to ~16 s
+
+
+class Trace:
+    """Monotonic timestamps for one trigger, in perf_counter nanoseconds."""
+
+    __slots__ = ('key', 'stamps', '_tracker')
+
+    def __init__(self, key: str, tracker: 'LatencyTracker'):
+        self.key = key
+        self.stamps: Dict[str, int] = {}
+        self._tracker = tracker
+
+    def stamp(self, stage: str) -> None:
+        """Record the current time for a stage."""
+        self.stamps[stage] = time.perf_counter_ns()
+
+    def finish(self, output: bool = True) -> None:
+        """Stamp the output stage and hand the trace to its tracker.
+
+        Called from the audio callback: no locks, just a queue put.
+
+        Args:
+            output: Stamp the output stage; False hands over the stages
+                stamped so far, e.g. for a voice waiting for the tempo grid
+        """
+        if output:
+            self.stamps['output'] = time.perf_counter_ns()
+        self._tracker._completed.put(self)
+
+
+class Histogram:
+    """Log-bucketed latency histogram with percentile queries."""
+
+    def __init__(self):
+        self.counts = [0] * _BUCKET_COUNT
+        self.total = 0
+
+    def add(self, nanoseconds: int) -> None:
+        """Count one latency sample."""
+        micros = max(nanoseconds / 1000.0, 1.0)
+        index = min(int(math.log2(micros) * _BUCKETS_PER_OCTAVE), _BUCKET_COUNT - 1)
+        self.counts[index] += 1
+        self.total += 1
+
+    def percentile(self, fraction: float) -> float:
+        """Latency in milliseconds below which ``fraction`` of samples fall.
+
+        Reported as the upper edge of the matching bucket, so it is at most
+        ~9% above the true value.
+        """
+        if self.total == 0:
+            return 0.0
+        rank = max(1, math.ceil(fraction * self.total))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return 2 ** ((index + 1) / _BUCKETS_PER_OCTAVE) / 1000.0
+        return 2 ** (_BUCKET_COUNT / _BUCKETS_PER_OCTAVE) / 1000.0
+
+
+class LatencyTracker:
+    """Collect per-key, per-stage latency histograms.
+
+    Input handlers call mark_event() and mark_dispatch() with the pad's
+    key; play_audio() claims the pending trace with begin(), the mixer
+    calls Trace.finish() when it renders the voice's first block, and
+    completed traces are folded into histograms whenever they are queried.
+    Every stage is measured from the input event, or from play_audio
+    entry when there was none (e.g. the startup sound).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Trace] = {}
+        self._completed: 'queue.SimpleQueue[Trace]' = queue.SimpleQueue()
+        self._histograms: Dict[str, Dict[str, Histogram]] = {}
+
+    def mark_event(self, key: str) -> None:
+        """Start a trace when an input event for ``key`` arrives."""
+        trace = Trace(key, self)
+        trace.stamp('event')
+        with self._lock:
+            self._pending[key] = trace
+
+    def mark_dispatch(self, key: str) -> None:
+        """Stamp the moment the first handler for ``key`` starts running."""
+        with self._lock:
+            trace = self._pending.get(key)
+        if trace is not None and 'dispatch' not in trace.stamps:
+            trace.stamp('dispatch')
+
+    def adopt(self, key: str, event: int, dispatch: int = 0) -> None:
+        """Start a trace from stamps taken in another process.
+
+        Used by the engine process for triggers sent by the GUI process;
+        perf_counter_ns is the system's monotonic clock, shared by both.
+
+        Args:
+            key: Pad the input event was for
+            event: Input event time in perf_counter nanoseconds
+            dispatch: Handler dispatch time, or 0 if unknown
+        """
+        trace = Trace(key, self)
+        trace.stamps['event'] = event
+        if dispatch:
+            trace.stamps['dispatch'] = dispatch
+        with self._lock:
+            self._pending[key] = trace
+
+    def begin(self, key: Optional[str]) -> Trace:
+        """Claim the pending trace for a trigger, or start a new one.
+
+        Args:
+            key: Pad that triggered playback, or None
+
+        Returns:
+            Trace with its trigger stage stamped
+        """
+        name = key if key is not None else 'other'
+        trace = None
+        if key is not None:
+            with self._lock:
+                trace = self._pending.pop(key, None)
+        now = time.perf_counter_ns()
+        if trace is None or now - trace.stamps['event'] > STALE_EVENT_NS:
+            trace = Trace(name, self)
+        trace.stamps['trigger'] = now
+        self._collect()
+        return trace
+
+    def _collect(self) -> None:
+        """Fold completed traces into the histograms."""
+        while True:
+            try:
+                trace = self._completed.get_nowait()
+            except queue.Empty:
+                return
+            stamps = trace.stamps
+            origin = stamps.get('event', stamps['trigger'])
+            with self._lock:
+                stages = self._histograms.setdefault(trace.key, {})
+                for stage in STAGES:
+                    if stage in stamps:
+                        stages.setdefault(stage, Histogram()).add(stamps[stage] - origin)
+
+    def summary(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Get latency percentiles for every key and stage.
+
+        Returns:
+            {key: {stage: {'count', 'p50', 'p95', 'p99'}}} with
+            percentiles in milliseconds since the input event
+        """
+        self._collect()
+        with self._lock:
+            return {
+                key: {
+                    stage: {
+                        'count': histogram.total,
+                        'p50': histogram.percentile(0.50),
+                        'p95': histogram.percentile(0.95),
+                        'p99': histogram.percentile(0.99),
+                    }
+                    for stage, histogram in stages.items()
+                }
+                for key, stages in sorted(self._histograms.items())
+            }
+
+    def format_summary(self) -> List[str]:
+        """Get one log line per key with its trigger-to-output percentiles."""
+        lines = []
+        for key, stages in self.summary().items():
+            output = stages.get('output')
+            if output is None:
+                continue
+            breakdown = ', '.join(
+                f"{stage} {stages[stage]['p50']:.2f}"
+                for stage in STAGES[1:-1] if stage in stages
+            )
+            lines.append(
+                f"Key {key}: {output['count']} triggers, p50 {output['p50']:.2f} ms, "
+                f"p95 {output['p95']:.2f} ms, p99 {output['p99']:.2f} ms "
+                f"(p50 by stage: {breakdown})"
+            )
+        return lines
+
+    def reset(self) -> None:
+        """Discard all recorded latencies."""
+        self._collect()
+        with self._lock:
+            self._histograms.clear()
+
+
+# Global tracker instance
+_tracker: Optional[LatencyTracker] = None
+
+
+def get_latency_tracker() -> LatencyTracker:
+    """Get or create the global latency tracker."""
+    global _tracker
+    if _tracker is None:
+        _tracker = LatencyTracker()
+    return _tracker
@@ -0,0 +1,198 @@
+"""Offline rendering ("bounce") of timed key triggers to a WAV file."""
+
+import json
+import logging
+import struct
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .audio import DEFAULT_BLOCKSIZE, WAVE_FORMAT_IEEE_FLOAT, WAVE_FORMAT_PCM, AudioCache, Voice
+from .config import Config
+from .cycler import ClipCycler
+
+logger = logging.getLogger(__name__)
+
+
+def load_triggers(file_path: str) -> List[Dict[str, Any]]:
+    """Read a trigger list.
+
+    The file is either JSON, a list of ``{"time": seconds, "key": "1"}``
+    objects with an optional ``"gain"``, or text with one ``<seconds> <key>
+    [gain]`` trigger per line (``#`` starts a comment).
+
+    Args:
+        file_path: Path to the trigger list
+
+    Returns:
+        Triggers sorted by time
+    """
+    text = Path(file_path).read_text()
+    if text.lstrip().startswith('['):
+        triggers = [
+            {'time': float(t['time']), 'key': str(t['key']), 'gain': float(t.get('gain', 1.0))}
+            for t in json.loads(text)
+        ]
+    else:
+        triggers = []
+        for line in text.splitlines():
+            fields = line.split('#', 1)[0].split()
+            if not fields:
+                continue
+            gain = float(fields[2]) if len(fields) > 2 else 1.0
+            triggers.append({'time': float(fields[0]), 'key': fields[1], 'gain': gain})
+    return sorted(triggers, key=lambda t: t['time'])
+
+
+def render_triggers(
+    triggers: Iterable[Dict[str, Any]],
+    config: Config,
+    cache: AudioCache,
+    blocksize: int = DEFAULT_BLOCKSIZE,
+) -> tuple:
+    """Mix timed key triggers into one buffer as fast as possible.
+
+    Uses the live engine's pieces: clips come from ``cache``, each key
+    cycles through its clips like a pad press, and mixing is done by a
+    Mixer with the live voice limits, key gains, loudness normalization,
+    silence trimming and master bus. Every voice starts on the exact
+    sample of its trigger time, or for quantized keys of the next tempo
+    grid line; the master bus latency is removed from the result.
+
+    Args:
+        triggers: Dicts with 'time' (seconds), 'key' and optional 'gain'
+        config: Configuration providing the key clips
+        cache: Audio cache that loads and holds the clips
+        blocksize: Frames mixed per render call between triggers
+
+    Returns:
+        Tuple of (float32 samples shaped (frames, channels), samplerate)
+    """
+    mixer = cache.offline_mixer(blocksize)
+    rate = mixer.samplerate
+    cycler = ClipCycler(config)
+    blocks: List[np.ndarray] = []
+    position = 0
+    end = 0
+
+    def render_to(frame: int) -> None:
+        nonlocal position
+        while position < frame:
+            out = np.empty((min(blocksize, frame - position), mixer.channels), dtype=np.float32)
+            mixer.render(out)
+            blocks.append(out)
+            position += len(out)
+
+    for trigger in sorted(triggers, key=lambda t: t['time']):
+        key = str(trigger['key'])
+        start = int(round(trigger['time'] * rate))
+        render_to(start)
+        selected = cycler.next_clip(key, now=trigger['time'])
+        if selected is None:
+            logger.warning(f"No clips configured for key {trigger['key']}")
+            continue
+        clip = cache.load_audio_file(selected[2])
+        if clip is None or clip.frames == 0:
+            logger.warning(f"Skipping trigger at {trigger['time']:.3f}s: no audio for {selected[2]}")
+            continue
+        gain = trigger.get('gain', 1.0) * cache.key_gain(key) * cache.normalization_gain(clip)
+        offset = cache.start_frame(clip, key)
+        # Quantized voices wait in the mixer for their grid line
+        start = cache.quantize_frame(start, key, rate)
+        mixer.add_voice(Voice(clip.samples, gain, key, clip.envelope, offset), start)
+        end = max(end, start + clip.frames - offset)
+
+    # Let every voice ring out and flush the limiter's delay line
+    render_to(end + mixer.latency)
+
+    if not blocks:
+        return np.zeros((0, mixer.channels), dtype=np.float32), rate
+    return np.concatenate(blocks)[mixer.latency:], rate
+
+
+def write_wav(file_path: str, samples: np.ndarray, samplerate: int, float32: bool = False) -> None:
+    """Write (frames, channels) float32 samples to a WAV file.
+
+    Args:
+        file_path: Output path
+        samples: Samples in [-1, 1]
+        samplerate: Sample rate in Hz
+        float32: Write 32-bit float instead of clipped 16-bit PCM
+    """
+    if float32:
+        data = np.ascontiguousarray(samples, dtype='<f4')
+        format_tag, bits = WAVE_FORMAT_IEEE_FLOAT, 32
+    else:
+        data = (np.clip(samples, -1.0, 1.0) * 32767.0).round().astype('<i2')
+        format_tag, bits = WAVE_FORMAT_PCM, 16
+    channels = samples.shape[1]
+    block_align = channels * bits // 8
+    payload = data.tobytes()
+    with open(file_path, 'wb') as f:
+        f.write(b'RIFF' + struct.pack('<I', 36 + len(payload)) + b'WAVE')
+        f.write(b'fmt ' + struct.pack(
+            '<IHHIIHH', 16, format_tag, channels, samplerate,
+            samplerate * block_align, block_align, bits,
+        ))
+        f.write(b'data' + struct.pack('<I', len(payload)))
+        f.write(payload)
+
+
+def bounce(
+    triggers: Iterable[Dict[str, Any]],
+    output_path: str,
+    config: Optional[Config] = None,
+    samplerate: Optional[int] = None,
+    float32: bool = False,
+    blocksize: int = DEFAULT_BLOCKSIZE,
+) -> Dict[str, Any]:
+    """Render timed key triggers to a WAV file.
+
+    Args:
+        triggers: Dicts with 'time' (seconds), 'key' and optional 'gain'
+        output_path: WAV file to write
+        config: Configuration; defaults to config.json
+        samplerate: Output rate; defaults to the audio section's samplerate
+            or 44100 Hz
+        float32: Write 32-bit float instead of 16-bit PCM
+        blocksize: Frames mixed per render call between triggers
+
+    Returns:
+        Dictionary with frames, seconds, load_seconds, mix_seconds and
+        realtime_factor (audio seconds mixed per wall-clock second)
+    """
+    config = config or Config()
+    settings = dict(config.get_audio_settings())
+    settings['samplerate'] = samplerate or settings.get('samplerate') or 44100
+    cache = AudioCache(settings.get('cache_budget_bytes'))
+    cache.configure(settings)
+    cache.configure_keys({key: config.get_key_config(key) for key in config.get_all_keys()})
+    triggers = list(triggers)
+
+    # Decode up front so the mix timing measures the mixer alone
+    started = time.perf_counter()
+    clips = [
+        clip for key in {str(t['key']) for t in triggers}
+        for clip in config.get_key_config(key).get('clips', [])
+    ]
+    cache.preload_many(clips)
+    load_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    samples, rate = render_triggers(triggers, config, cache, blocksize)
+    mix_seconds = time.perf_counter() - started
+    write_wav(output_path, samples, rate, float32)
+    cache.stop_all()
+
+    seconds = len(samples) / rate
+    stats = {
+        'frames': len(samples),
+        'seconds': seconds,
+        'load_seconds': load_seconds,
+        'mix_seconds': mix_seconds,
+        'realtime_factor': seconds / mix_seconds if mix_seconds > 0 else float('inf'),
+    }
+    logger.info(f"Bounced {len(triggers)} triggers to {output_path}: {stats}")
+    return stats
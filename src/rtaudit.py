@@ -0,0 +1,103 @@
+"""Allocation audit for the real-time render path.
+
+The audio callback must not allocate: each Python object it creates counts
+towards the cyclic garbage collector's next pause and goes through the
+allocator the UI and decode threads share, and either can make a block
+miss its deadline. This module measures what a callback allocates with
+tracemalloc, so tests can assert that steady-state blocks allocate
+nothing.
+"""
+
+import tracemalloc
+from typing import Callable, Dict
+
+import numpy as np
+
+# Blocks rendered by default: about 27 s of audio at 256 frames / 48 kHz
+DEFAULT_AUDIT_BLOCKS = 5000
+
+# Blocks rendered before measuring, so voices settle into steady state
+DEFAULT_AUDIT_WARMUP = 100
+
+
+def count_allocations(
+    callback: Callable[[], None],
+    calls: int = DEFAULT_AUDIT_BLOCKS,
+    warmup: int = DEFAULT_AUDIT_WARMUP,
+) -> Dict[str, int]:
+    """Call ``callback`` repeatedly and measure what each call allocates.
+
+    Each call is measured on its own: traced memory is sampled before the
+    call and its peak is reset, so any allocation inside the call shows up
+    even when it is freed again before the call returns.
+
+    Args:
+        callback: Function under test, e.g. one mixer block
+        calls: Number of measured calls
+        warmup: Unmeasured calls made first
+
+    Returns:
+        Dictionary with calls measured, allocating_calls (calls that
+        allocated anything), max_bytes (largest peak allocation of a
+        single call) and retained_bytes (traced memory still held after
+        the last call)
+    """
+    for _ in range(warmup):
+        callback()
+
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    traced = tracemalloc.get_traced_memory
+    reset_peak = tracemalloc.reset_peak
+    allocating = 0
+    worst = 0
+    try:
+        baseline = traced()[0]
+        for _ in range(calls):
+            before = traced()[0]
+            reset_peak()
+            callback()
+            allocated = traced()[1] - before
+            if allocated > 0:
+                allocating += 1
+                worst = max(worst, allocated)
+        retained = traced()[0] - baseline
+    finally:
+        if started:
+            tracemalloc.stop()
+    return {
+        'calls': calls,
+        'allocating_calls': allocating,
+        'max_bytes': worst,
+        'retained_bytes': max(0, retained),
+    }
+
+
+def audit_mixer(
+    mixer,
+    blocks: int = DEFAULT_AUDIT_BLOCKS,
+    warmup: int = DEFAULT_AUDIT_WARMUP,
+    backend=None,
+) -> Dict[str, int]:
+    """Render blocks from a mixer under count_allocations().
+
+    Voices should already be queued and long enough to play through the
+    whole audit; voices starting or ending are expected to allocate.
+
+    Args:
+        mixer: Mixer to render from, at its current block size
+        blocks: Number of measured blocks
+        warmup: Unmeasured blocks rendered first
+        backend: Optional OutputBackend whose per-block accounting (load,
+            counters, adaptive block size) wraps each render, as it does
+            in a live stream; the backend is not started
+
+    Returns:
+        count_allocations() results
+    """
+    out = np.zeros((mixer.blocksize, mixer.channels), dtype=np.float32)
+    if backend is None:
+        return count_allocations(lambda: mixer.render(out), blocks, warmup)
+    backend.attach(mixer)
+    return count_allocations(lambda: backend._render(out), blocks, warmup)
@@ -0,0 +1,386 @@
+"""Decoded clips shared between processes through named shared memory."""
+
+import hashlib
+import json
+import logging
+import os
+import struct
+import time
+from typing import Any, Dict, List, Optional, Set
+
+import numpy as np
+
+try:
+    from multiprocessing import resource_tracker, shared_memory
+    SHARED_MEMORY_AVAILABLE = True
+except ImportError:
+    SHARED_MEMORY_AVAILABLE = False
+
+from .diskcache import CACHE_FORMAT_VERSION
+
+logger = logging.getLogger(__name__)
+
+# Default bank name; segment names are "<bank>-<16 hex digits>", and macOS
+# limits shared memory names to 31 characters
+DEFAULT_BANK_NAME = 'swampizzo'
+MAX_BANK_NAME_LENGTH = 12
+
+# Clip segment layout: header, JSON metadata, then float32 samples at a
+# 64-byte aligned offset. The state word flips to READY once the samples
+# are complete, so readers never see a half-written clip. The publisher's
+# pid lets others reclaim a segment whose publisher died mid-write
+_SEGMENT_MAGIC = b'SIZCLIP2'
+_SEGMENT_HEADER = struct.Struct('<8sIIQIII')  # magic, state, meta bytes, frames, channels, data offset, pid
+_STATE_WRITING = 0
+_STATE_READY = 1
+_DATA_ALIGN = 64
+
+# Index segment: a header and an open-addressed table of fixed-size slots
+# listing the bank's clips. Slots are written field by field with the
+# digest last, so a slot is only visible once it is complete
+_INDEX_MAGIC = b'SIZBANK1'
+_INDEX_HEADER = struct.Struct('<8sI4x')  # magic, slot count
+_INDEX_SLOT = struct.Struct('<8sQIII')  # digest, bytes, frames, channels, samplerate
+INDEX_SLOTS = 4096
+
+# How long to wait for another process to finish publishing a clip
+PUBLISH_WAIT_SECONDS = 2.0
+
+# Segments created by this process, which the resource tracker must keep
+_created = set()
+# Attached segments unregistered from the resource tracker
+_untracked = set()
+
+
+def _open_segment(name: str):
+    """Attach to an existing segment without taking ownership of it.
+
+    Before Python 3.13 the resource tracker also claims attached
+    segments and unlinks them when this process exits, which would pull
+    clips out from under the process that published them.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        segment = shared_memory.SharedMemory(name=name)
+        if os.name == 'posix' and name not in _created:
+            resource_tracker.unregister(segment._name, 'shared_memory')
+            _untracked.add(name)
+        return segment
+
+
+def _create_segment(name: str, size: int):
+    segment = shared_memory.SharedMemory(name=name, create=True, size=size)
+    _created.add(name)
+    return segment
+
+
+def _remove_segment(segment) -> None:
+    """Unlink and close a segment this process attached to."""
+    if segment.name in _untracked:
+        # unlink() unregisters the name, which _open_segment() already did
+        resource_tracker.register(segment._name, 'shared_memory')
+        _untracked.discard(segment.name)
+    try:
+        segment.unlink()
+    except FileNotFoundError:
+        pass
+    segment.close()
+
+
+def _process_alive(pid: int) -> bool:
+    """Whether a process exists; assumed so where it cannot be checked.
+
+    Windows frees a segment with its last handle, so only POSIX systems
+    are left with the segments of crashed publishers.
+    """
+    if pid <= 0 or os.name != 'posix':
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass  # exists but belongs to another user
+    return True
+
+
+class SharedBank:
+    """Publish decoded clips once for every soundboard process on the host.
+
+    Each clip lives in its own named shared memory segment holding its
+    samples in the mixer's format plus the metadata the disk cache keeps
+    (analysis results), and a small index segment lists the bank's clips.
+    The first process to decode a clip publishes it; the others attach and
+    play straight out of the shared pages through read-only views, so
+    memory grows with the library rather than with the number of
+    instances.
+
+    Segment names include the source file's size and modification time,
+    so an edited file is published afresh. A publisher's segments are
+    unlinked when it exits; processes already attached keep their
+    mappings, and later instances publish again. A segment left
+    half-written by a publisher that crashed is reclaimed by the next
+    process that publishes the clip.
+    """
+
+    def __init__(self, name: str = DEFAULT_BANK_NAME):
+        """Open the bank, creating its index if no other process has.
+
+        Args:
+            name: Bank name shared by the cooperating processes
+
+        Raises:
+            RuntimeError: If shared memory is unavailable
+            ValueError: If the name is too long for a segment name
+        """
+        if not SHARED_MEMORY_AVAILABLE:
+            raise RuntimeError("multiprocessing.shared_memory is not available")
+        if not name or len(name) > MAX_BANK_NAME_LENGTH:
+            raise ValueError(f"Bank name must be 1-{MAX_BANK_NAME_LENGTH} characters: {name!r}")
+        self.name = name
+        # Segments this process published or attached; the numpy views
+        # handed out need their mappings to stay open
+        self._segments: Dict[str, Any] = {}
+        self._published: List[str] = []
+        # Clips another process never finished publishing; not waited for again
+        self._stalled: Set[str] = set()
+        self._owns_index = False
+        self._index = self._open_index()
+
+    def _open_index(self):
+        index_name = f"{self.name}-index"
+        size = _INDEX_HEADER.size + INDEX_SLOTS * _INDEX_SLOT.size
+        try:
+            index = _create_segment(index_name, size)
+            _INDEX_HEADER.pack_into(index.buf, 0, _INDEX_MAGIC, INDEX_SLOTS)
+            self._owns_index = True
+        except FileExistsError:
+            index = _open_segment(index_name)
+            magic, _ = _INDEX_HEADER.unpack_from(index.buf, 0)
+            if magic != _INDEX_MAGIC:
+                index.close()
+                raise RuntimeError(f"Shared memory {index_name} is not a sample bank index")
+        return index
+
+    def _digest(self, file_path: str, samplerate: int, channels: int) -> Optional[bytes]:
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        key = f"{file_path}|{stat.st_size}|{stat.st_mtime_ns}|{samplerate}|{channels}|v{CACHE_FORMAT_VERSION}"
+        return hashlib.sha1(key.encode('utf-8')).digest()[:8]
+
+    def _segment_name(self, digest: bytes) -> str:
+        return f"{self.name}-{digest.hex()}"
+
+    def load(self, file_path: str, samplerate: int, channels: int) -> Optional[tuple]:
+        """Attach to a published clip.
+
+        Args:
+            file_path: Resolved source audio path
+            samplerate: Engine sample rate the clip was rendered for
+            channels: Engine channel count the clip was rendered for
+
+        Returns:
+            Tuple of (read-only float32 samples viewing the shared memory,
+            metadata dict), or None if the clip is not in the bank
+        """
+        digest = self._digest(file_path, samplerate, channels)
+        if digest is None:
+            return None
+        name = self._segment_name(digest)
+        segment = self._segments.get(name)
+        if segment is None:
+            try:
+                segment = _open_segment(name)
+            except FileNotFoundError:
+                return None
+            except Exception as e:
+                logger.debug(f"Could not attach shared clip {name}: {e}")
+                return None
+        return self._view(name, segment, wait=0.0)
+
+    def store(
+        self,
+        file_path: str,
+        samplerate: int,
+        channels: int,
+        samples: np.ndarray,
+        extra: Optional[Dict[str, Any]] = None,
+    ) -> Optional[np.ndarray]:
+        """Publish decoded samples, or attach if another process beat us to it.
+
+        Args:
+            file_path: Resolved source audio path
+            samplerate: Engine sample rate the samples were rendered for
+            channels: Engine channel count the samples were rendered for
+            samples: float32 samples shaped (frames, channels)
+            extra: Additional metadata to keep with the clip
+
+        Returns:
+            Read-only view of the shared copy, to use in place of
+            ``samples``, or None if the clip could not be shared
+        """
+        digest = self._digest(file_path, samplerate, channels)
+        if digest is None:
+            return None
+        name = self._segment_name(digest)
+        meta = json.dumps({'path': file_path, 'samplerate': samplerate, **(extra or {})}).encode('utf-8')
+        offset = -(-(_SEGMENT_HEADER.size + len(meta)) // _DATA_ALIGN) * _DATA_ALIGN
+        try:
+            segment = self._create_clip_segment(name, offset + samples.nbytes)
+        except Exception as e:
+            logger.warning(f"Could not publish {file_path} to shared sample bank: {e}")
+            return None
+        if segment is None:
+            # Another live process has published the clip or is publishing it
+            if name in self._stalled:
+                return None
+            try:
+                shared = self._view(name, _open_segment(name), wait=PUBLISH_WAIT_SECONDS)
+            except Exception as e:
+                logger.debug(f"Could not attach shared clip {name}: {e}")
+                return None
+            if shared is None:
+                logger.debug(f"Shared clip {name} was not published in time; keeping a private copy")
+                self._stalled.add(name)
+                return None
+            return shared[0]
+
+        frames = len(samples)
+        _SEGMENT_HEADER.pack_into(
+            segment.buf, 0, _SEGMENT_MAGIC, _STATE_WRITING, len(meta), frames, samples.shape[1], offset, os.getpid()
+        )
+        segment.buf[_SEGMENT_HEADER.size:_SEGMENT_HEADER.size + len(meta)] = meta
+        data = np.ndarray(samples.shape, dtype=np.float32, buffer=segment.buf, offset=offset)
+        data[:] = samples
+        struct.pack_into('<I', segment.buf, 8, _STATE_READY)
+        self._segments[name] = segment
+        self._published.append(name)
+        self._add_to_index(digest, samples.nbytes, frames, samples.shape[1], samplerate)
+        logger.debug(f"Published {file_path} to shared sample bank as {name}")
+
+        data.flags.writeable = False
+        return data
+
+    def _create_clip_segment(self, name: str, size: int):
+        """Create a clip segment, replacing one whose publisher died mid-write.
+
+        Returns:
+            The new segment, or None if the name belongs to a live publisher
+            or a complete clip
+        """
+        try:
+            return _create_segment(name, size)
+        except FileExistsError:
+            pass
+        try:
+            existing = _open_segment(name)
+        except FileNotFoundError:
+            existing = None  # unlinked since
+        if existing is not None:
+            magic, state, _, _, _, _, pid = _SEGMENT_HEADER.unpack_from(existing.buf, 0)
+            if magic != _SEGMENT_MAGIC or state != _STATE_WRITING or _process_alive(pid):
+                existing.close()
+                return None
+            logger.info(f"Reclaiming shared clip {name} abandoned by process {pid}")
+            _remove_segment(existing)
+        try:
+            return _create_segment(name, size)
+        except FileExistsError:
+            return None
+
+    def _view(self, name: str, segment, wait: float) -> Optional[tuple]:
+        """Read a clip segment's header and wrap its samples, once complete."""
+        deadline = time.monotonic() + wait
+        while True:
+            magic, state, meta_len, frames, channels, offset, _ = _SEGMENT_HEADER.unpack_from(segment.buf, 0)
+            if magic == _SEGMENT_MAGIC and state == _STATE_READY:
+                break
+            if time.monotonic() >= deadline:
+                if name not in self._segments:
+                    segment.close()
+                return None
+            time.sleep(0.005)
+
+        meta = json.loads(bytes(segment.buf[_SEGMENT_HEADER.size:_SEGMENT_HEADER.size + meta_len]))
+        samples = np.ndarray((frames, channels), dtype=np.float32, buffer=segment.buf, offset=offset)
+        samples.flags.writeable = False
+        self._segments[name] = segment
+        return samples, meta
+
+    def _add_to_index(self, digest: bytes, nbytes: int, frames: int, channels: int, samplerate: int) -> None:
+        buf = self._index.buf
+        start = int.from_bytes(digest, 'little') % INDEX_SLOTS
+        for probe in range(INDEX_SLOTS):
+            position = _INDEX_HEADER.size + ((start + probe) % INDEX_SLOTS) * _INDEX_SLOT.size
+            slot_digest = bytes(buf[position:position + 8])
+            if slot_digest == digest:
+                return
+            if slot_digest == bytes(8):
+                _INDEX_SLOT.pack_into(buf, position, bytes(8), nbytes, frames, channels, samplerate)
+                buf[position:position + 8] = digest
+                return
+        logger.warning(f"Shared sample bank index is full ({INDEX_SLOTS} clips)")
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """List the clips in the bank's index.
+
+        Returns:
+            One dict per clip with its segment name, bytes, frames,
+            channels and samplerate
+        """
+        entries = []
+        buf = self._index.buf
+        for slot in range(INDEX_SLOTS):
+            digest, nbytes, frames, channels, samplerate = _INDEX_SLOT.unpack_from(
+                buf, _INDEX_HEADER.size + slot * _INDEX_SLOT.size
+            )
+            if digest != bytes(8):
+                entries.append({
+                    'segment': self._segment_name(digest),
+                    'bytes': nbytes,
+                    'frames': frames,
+                    'channels': channels,
+                    'samplerate': samplerate,
+                })
+        return entries
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the bank's size and this process's share of it.
+
+        Returns:
+            Dictionary with the bank name, clips and bytes listed in the
+            index, and how many clip segments this process published and
+            has attached
+        """
+        entries = self.entries()
+        return {
+            'name': self.name,
+            'clips': len(entries),
+            'bytes': sum(entry['bytes'] for entry in entries),
+            'published': len(self._published),
+            'attached': len(self._segments) - len(self._published),
+        }
+
+    def unlink(self) -> None:
+        """Remove the names of the segments this process published.
+
+        Mappings stay valid in every process that has them; new lookups
+        miss and decode again. The resource tracker does the same when
+        the process exits.
+        """
+        segments = [self._segments[name] for name in self._published]
+        if self._owns_index:
+            segments.append(self._index)
+        self._published = []
+        self._owns_index = False
+        for segment in segments:
+            _created.discard(segment.name)
+            try:
+                segment.unlink()
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.debug(f"Could not unlink shared segment {segment.name}: {e}")
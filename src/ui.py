@@ -1,7 +1,6 @@
 """UI module for the soundboard application."""
 
 import logging
-import time
 from pathlib import Path
 from typing import Dict, Callable, Optional
 from PySide6.QtWidgets import (
@@ -13,6 +12,8 @@ from PySide6.QtCore import Qt, QTimer, QSize
 
 from .config import Config
 from .audio import play_audio
+from .cycler import ClipCycler
+from .latency import get_latency_tracker
 
 logger = logging.getLogger(__name__)
 
@@ -115,8 +116,7 @@ class SoundboardWindow(QMainWindow):
         super().__init__()
         self.config = config
         self.on_hotkey_triggered = on_hotkey_triggered
-        self.button_states: Dict[str, int] = {}  # Track cycle index for each key
-        self.last_press_time: Dict[str, float] = {}  # Track last press time
+        self.cycler = ClipCycler(config)
         self.buttons: Dict[str, SoundboardButton] = {}
         self.assets_path = Path(__file__).parent.parent / 'assets' / 'ui'
         
@@ -169,8 +169,6 @@ class SoundboardWindow(QMainWindow):
             button.clicked.connect(lambda checked, k=key: self._on_button_clicked(k))
             
             self.buttons[key] = button
-            self.button_states[key] = 0
-            self.last_press_time[key] = 0
             
             row = idx // 3
             col = idx % 3
@@ -210,36 +208,19 @@ class SoundboardWindow(QMainWindow):
         Args:
             key: Key identifier (1-9)
         """
-        key_config = self.config.get_key_config(key)
-        clips = key_config.get('clips', [])
-        reset_seconds = key_config.get('reset_seconds', 10)
-        
-        if not clips:
+        selected = self.cycler.next_clip(key)
+        if selected is None:
             logger.warning(f"No clips configured for key {key}")
             return
-        
-        # Check if we should reset the cycle
-        current_time = time.time()
-        last_press = self.last_press_time.get(key, 0)
-        if current_time - last_press > reset_seconds:
-            self.button_states[key] = 0
-        
-        self.last_press_time[key] = current_time
-        
-        # Get current clip
-        clip_idx = self.button_states[key]
-        clip_path = clips[clip_idx]
-        
-        # Advance to next clip for next press
-        self.button_states[key] = (clip_idx + 1) % len(clips)
+        clip_idx, clip_count, clip_path = selected
         
         # Show button pressed state
         if key in self.buttons:
             self.buttons[key].show_pressed_state()
         
         # Play audio
-        logger.info(f"Key {key}: Playing clip {clip_idx}/{len(clips)} - {clip_path}")
-        play_audio(clip_path)
+        logger.info(f"Key {key}: Playing clip {clip_idx}/{clip_count} - {clip_path}")
+        play_audio(clip_path, key=key)
     
     def _on_button_clicked(self, key: str):
         """Handle button click.
@@ -247,6 +228,9 @@ class SoundboardWindow(QMainWindow):
         Args:
             key: Key identifier
         """
+        tracker = get_latency_tracker()
+        tracker.mark_event(key)
+        tracker.mark_dispatch(key)
         self.trigger_sound(key)
     
     def on_hotkey(self, key: str):
@@ -2,7 +2,8 @@
 
 from pathlib import Path
 import random
-from typing import Dict, List
+import time
+from typing import Dict, List, Tuple
 from PySide6.QtWidgets import (
     QMainWindow,
     QWidget,
@@ -10,10 +11,18 @@ from PySide6.QtWidgets import (
     QGridLayout,
 )
 from PySide6.QtGui import QPixmap, QPainterPath, QRegion, QIcon, QShortcut, QKeySequence
-from PySide6.QtCore import Qt, QTimer, QUrl
-from PySide6.QtMultimedia import QMediaPlayer, QAudioOutput
+from PySide6.QtCore import Qt, QTimer
 from PySide6.QtWidgets import QSizePolicy
 
+from ..audio import (
+    SUPPORTED_EXTENSIONS,
+    clip_playheads,
+    clip_waveform,
+    get_audio_engine,
+    play_audio,
+    preload_audio_async,
+)
+from ..latency import get_latency_tracker
 from .widgets import SoundButton
 
 #This is where the mapping of the number pad keys to which sound is defined
@@ -29,6 +38,13 @@ DEFAULT_MAPPING: Dict[str, Dict[str, str]] = {
     "9": {"prefix": "gunshot", "label": "GUNSHOT"},
 }
 
+# How often playing pads move their playhead
+PLAYHEAD_INTERVAL_MS = 33
+
+# How long a pad waits for its voice to reach the mixer before treating
+# the clip as finished
+PLAYHEAD_GRACE_SECONDS = 0.25
+
 
 class SoundboardWindow(QMainWindow):
     def __init__(self, assets_dir: Path):
@@ -40,10 +56,20 @@ class SoundboardWindow(QMainWindow):
         self.buttons: Dict[str, SoundButton] = {}
         self.bg_label: QLabel | None = None
         self.grid_host: QWidget | None = None
-        self.active_players: List[QMediaPlayer] = []
+        self.clip_paths: Dict[str, List[Path]] = {}
+        # Clips listed by the clip bank, for builds that ship only the bank
+        self.bank_clip_paths: List[Path] | None = None
+        # Pads whose clip may still be playing: key -> (clip path, trigger time).
+        # Written by whichever thread triggers, read by the playhead timer
+        self.now_playing: Dict[str, Tuple[str, float]] = {}
 
         self._setup_window()
         self._build_layers()
+        self._preload_clips()
+
+        self.playhead_timer = QTimer(self)
+        self.playhead_timer.timeout.connect(self._update_playheads)
+        self.playhead_timer.start(PLAYHEAD_INTERVAL_MS)
 
     def _setup_window(self) -> None:
         self.setWindowFlags(
@@ -98,7 +124,7 @@ class SoundboardWindow(QMainWindow):
             label = self.mapping[key]["label"]
             icon_path = self._icon_for_prefix(prefix)
             btn = SoundButton(key, label, icon_path, self.ui_dir)
-            btn.clicked.connect(lambda _=False, p=prefix: self._play_sound(p))
+            btn.clicked.connect(lambda _=False, k=key: self.on_hotkey(k))
             self.buttons[key] = btn
             row, col = divmod(idx, 3)
             grid_layout.addWidget(btn, row, col, alignment=Qt.AlignCenter)
@@ -122,44 +148,79 @@ class SoundboardWindow(QMainWindow):
             return candidate
         return self.ui_dir / "icons" / "icon_swamp.png"
 
-    def _audio_folder_for_prefix(self, prefix: str) -> Path | None:
+    def _audio_folder_for_prefix(self, prefix: str) -> Path:
         overrides = {
             "what_up_baby_boy": "what_up",
         }
-        folder_name = overrides.get(prefix, prefix)
-        folder = self.audio_dir / folder_name
-        return folder if folder.exists() and folder.is_dir() else None
+        return self.audio_dir / overrides.get(prefix, prefix)
 
-    def _random_audio_path(self, prefix: str) -> Path | None:
+    def _clip_candidates(self, prefix: str) -> List[Path]:
         folder = self._audio_folder_for_prefix(prefix)
-        if not folder:
-            return None
-        candidates = sorted(p for p in folder.glob("*.mp3") if p.is_file())
+        if not folder.is_dir():
+            # Builds may ship only the compiled clip bank
+            if self.bank_clip_paths is None:
+                self.bank_clip_paths = sorted(
+                    self.assets_dir.parent / p for p in get_audio_engine().bank_paths()
+                )
+            return [p for p in self.bank_clip_paths if p.parent == folder]
+        return sorted(
+            p for p in folder.iterdir()
+            if p.is_file() and p.suffix.lower() in SUPPORTED_EXTENSIONS
+        )
+
+    def _preload_clips(self) -> None:
+        # Decode every pad's clips once on the audio worker pool so presses
+        # never wait on MP3 decoding.
+        for entry in self.mapping.values():
+            prefix = entry["prefix"]
+            paths = self._clip_candidates(prefix)
+            self.clip_paths[prefix] = paths
+            get_audio_engine().pin(str(p) for p in paths)
+            for path in paths:
+                preload_audio_async(str(path))
+
+    def _random_audio_path(self, prefix: str) -> Path | None:
+        candidates = self.clip_paths.get(prefix)
+        if candidates is None:
+            candidates = self.clip_paths[prefix] = self._clip_candidates(prefix)
         if not candidates:
             return None
         return random.choice(candidates)
 
-    def _play_sound(self, prefix: str) -> None:
+    def on_hotkey(self, key: str) -> None:
+        """Play a random clip for a pad; also the global hotkey entry point."""
+        get_latency_tracker().mark_dispatch(key)
+        prefix = self.mapping.get(key, {}).get("prefix")
+        if prefix:
+            self._play_sound(prefix, key)
+
+    def _play_sound(self, prefix: str, key: str | None = None) -> None:
         audio_path = self._random_audio_path(prefix)
         if not audio_path:
             return
-        output = QAudioOutput(self)
-        output.setVolume(0.9)
-        player = QMediaPlayer(self)
-        player.setAudioOutput(output)
-        player.setSource(QUrl.fromLocalFile(str(audio_path)))
-
-        # Track to allow overlap and clean up when done.
-        self.active_players.append(player)
-        player.playbackStateChanged.connect(
-            lambda state, p=player: self._cleanup_player(p, state)
-        )
-        player.play()
+        play_audio(str(audio_path), key=key)
+        if key is not None:
+            self.now_playing[key] = (str(audio_path), time.monotonic())
 
-    def _cleanup_player(self, player: QMediaPlayer, state: QMediaPlayer.PlaybackState) -> None:
-        if state == QMediaPlayer.PlaybackState.StoppedState and player in self.active_players:
-            self.active_players.remove(player)
-            player.deleteLater()
+    def _update_playheads(self) -> None:
+        """Show each playing pad's waveform and move its playhead."""
+        playing = {key: entry for key, entry in list(self.now_playing.items()) if key in self.buttons}
+        if not playing:
+            return
+        fractions = clip_playheads(playing)
+        for key, entry in playing.items():
+            button = self.buttons[key]
+            path, started = entry
+            # Until the engine answers there are no peaks; ask again next tick
+            if button.waveform_path != path:
+                peaks = clip_waveform(path, button.waveform_width())
+                if peaks is not None:
+                    button.set_waveform(peaks, path)
+            fraction = fractions.get(key)
+            if fraction is None and time.monotonic() - started > PLAYHEAD_GRACE_SECONDS:
+                if self.now_playing.get(key) == entry:
+                    del self.now_playing[key]
+            button.set_playhead(fraction)
 
     def resizeEvent(self, event) -> None:  # type: ignore[override]
         super().resizeEvent(event)
@@ -187,10 +248,9 @@ class SoundboardWindow(QMainWindow):
             return
         key = self._key_from_event(event)
         if key and key in self.buttons:
+            get_latency_tracker().mark_event(key)
             self.buttons[key].setDown(True)
-            prefix = self.mapping.get(key, {}).get("prefix")
-            if prefix:
-                self._play_sound(prefix)
+            self.on_hotkey(key)
         super().keyPressEvent(event)
 
     def keyReleaseEvent(self, event) -> None:  # type: ignore[override]
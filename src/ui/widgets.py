@@ -1,9 +1,20 @@
 """UI widgets for the soundboard preview."""
 
 from pathlib import Path
+from typing import List, Optional
 from PySide6.QtWidgets import QToolButton, QSizePolicy
-from PySide6.QtGui import QIcon, QPixmap, QFont, QCursor
-from PySide6.QtCore import Qt, QSize
+from PySide6.QtGui import QIcon, QPixmap, QFont, QCursor, QPainter, QPen, QColor
+from PySide6.QtCore import Qt, QSize, QLineF, QRectF
+
+from ..latency import get_latency_tracker
+
+# Height of the waveform strip along the bottom of a pad, in pixels
+WAVEFORM_HEIGHT = 26
+WAVEFORM_MARGIN = 12
+
+WAVEFORM_COLOR = QColor(255, 255, 255, 90)
+WAVEFORM_PLAYED_COLOR = QColor(255, 255, 255, 200)
+PLAYHEAD_COLOR = QColor(120, 220, 255, 230)
 
 
 class SoundButton(QToolButton):
@@ -14,6 +25,10 @@ class SoundButton(QToolButton):
         self.key = key
         self.assets_path = Path(assets_path)
         self.icon_path = Path(icon_path)
+        # (min, max) peaks per waveform column and the clip they show
+        self.waveform_path: Optional[str] = None
+        self._peaks = None
+        self._playhead: Optional[float] = None
 
         self.setToolButtonStyle(Qt.ToolButtonStyle.ToolButtonIconOnly)
         self.setCheckable(False)
@@ -32,6 +47,72 @@ class SoundButton(QToolButton):
         self._apply_icon()
         self._apply_stylesheet()
 
+    def mouseReleaseEvent(self, event) -> None:  # type: ignore[override]
+        # clicked is emitted on release; stamp it for latency tracking
+        if event.button() == Qt.LeftButton and self.rect().contains(event.position().toPoint()):
+            get_latency_tracker().mark_event(self.key)
+        super().mouseReleaseEvent(event)
+
+    def waveform_width(self) -> int:
+        """Columns of waveform the pad draws; fetch peaks for this many."""
+        return max(1, self.width() - 2 * WAVEFORM_MARGIN)
+
+    def set_waveform(self, peaks, path: Optional[str] = None) -> None:
+        """Show a clip's waveform.
+
+        Args:
+            peaks: (columns, 2) array of (min, max), e.g. from
+                audio.clip_waveform(), or None to clear it
+            path: Clip the peaks belong to
+        """
+        self._peaks = peaks
+        self.waveform_path = path
+        self.update()
+
+    def set_playhead(self, fraction: Optional[float]) -> None:
+        """Move the playhead; None hides it once the clip stops."""
+        if fraction != self._playhead:
+            self._playhead = fraction
+            self.update()
+
+    def resizeEvent(self, event) -> None:  # type: ignore[override]
+        # Peaks are per column; refetch at the new width
+        self.waveform_path = None
+        super().resizeEvent(event)
+
+    def paintEvent(self, event) -> None:  # type: ignore[override]
+        super().paintEvent(event)
+        if self._peaks is None or not len(self._peaks):
+            return
+        rect = QRectF(
+            WAVEFORM_MARGIN, self.height() - WAVEFORM_MARGIN - WAVEFORM_HEIGHT,
+            self.waveform_width(), WAVEFORM_HEIGHT,
+        )
+        painter = QPainter(self)
+        played = 0
+        if self._playhead is not None:
+            played = int(self._playhead * len(self._peaks))
+        lines = self._waveform_lines(rect)
+        painter.setPen(QPen(WAVEFORM_PLAYED_COLOR, 1))
+        painter.drawLines(lines[:played])
+        painter.setPen(QPen(WAVEFORM_COLOR, 1))
+        painter.drawLines(lines[played:])
+        if self._playhead is not None:
+            x = rect.left() + self._playhead * rect.width()
+            painter.setPen(QPen(PLAYHEAD_COLOR, 2))
+            painter.drawLine(QLineF(x, rect.top(), x, rect.bottom()))
+        painter.end()
+
+    def _waveform_lines(self, rect: QRectF) -> List[QLineF]:
+        """One vertical line per column from its min to its max peak."""
+        middle = rect.center().y()
+        half = rect.height() / 2
+        left = rect.left() + 0.5
+        return [
+            QLineF(left + x, middle - float(high) * half, left + x, middle - float(low) * half)
+            for x, (low, high) in enumerate(self._peaks.clip(-1.0, 1.0))
+        ]
+
     def _apply_icon(self) -> None:
         pixmap = QPixmap(str(self.icon_path))
         if not pixmap.isNull():
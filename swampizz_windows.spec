@@ -1,14 +1,23 @@
 # -*- mode: python ; coding: utf-8 -*-
 """PyInstaller spec file for Windows."""
 
+import os
+
+# Ship the compiled clip bank (scripts/compile_bank.py) instead of every
+# clip when it exists: one file to extract and map at startup. Devices at
+# rates the bank was not compiled for resample its nearest rate at load
+if os.path.exists('assets\\audio.sizbank'):
+    AUDIO_DATAS = [('assets\\audio.sizbank', 'assets')]
+else:
+    AUDIO_DATAS = [('assets\\audio', 'assets\\audio')]
+
 a = Analysis(
     ['src\\app.py'],
     pathex=[],
     binaries=[],
     datas=[
         ('assets\\ui', 'assets\\ui'),
-        ('assets\\audio', 'assets\\audio'),
-    ],
+    ] + AUDIO_DATAS,
     hiddenimports=['PySide6'],
     hookspath=[],
     hooksconfig={},
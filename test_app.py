@@ -143,6 +143,1348 @@ def test_audio():
         return False
 
 
+def test_decoder():
+    """Test that compressed clips decode into the shared cache."""
+    logger.info("Testing decoder...")
+    
+    try:
+        from src.audio import AudioCache
+        
+        cache = AudioCache()
+        clip = cache.preload_async('assets/audio/snare/snare_1.mp3').result()
+        if clip is None or clip.frames == 0:
+            logger.error("MP3 decode returned no audio")
+            return False
+        
+        if cache.load_audio_file('assets/audio/snare/snare_1.mp3') is not clip:
+            logger.error("Decoded clip was not cached")
+            return False
+        
+        logger.info(f"MP3 decode: OK ({clip.frames} frames)")
+        return True
+    
+    except Exception as e:
+        logger.error(f"Decoder test failed: {e}")
+        return False
+
+
+def test_cache_budget():
+    """Test LRU eviction under the byte budget, pinning and cache stats."""
+    logger.info("Testing cache budget...")
+    
+    try:
+        import tempfile
+        import numpy as np
+        from src.audio import AudioCache
+        from src.render import write_wav
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = {}
+            for name in 'abcd':
+                paths[name] = str(Path(tmp) / f'{name}.wav')
+                write_wav(paths[name], np.full((1000, 2), 0.1, dtype=np.float32), 48000)
+            clip_bytes = 1000 * 2 * 4
+            
+            cache = AudioCache(budget_bytes=3 * clip_bytes)
+            cache.mixer.samplerate = 48000
+            cache.pin([paths['a']])
+            for name in 'abc':
+                cache.load_audio_file(paths[name])
+            cache.load_audio_file(paths['b'])  # b is now the most recently used
+            cache.load_audio_file(paths['d'])  # over budget: c is the LRU unpinned clip
+            
+            cached = {name for name, path in paths.items() if cache._cache_key(path) in cache._cache}
+            if cached != {'a', 'b', 'd'}:
+                logger.error(f"Wrong clips kept under the budget: {sorted(cached)}")
+                return False
+            
+            stats = cache.stats()
+            expected = {'hits': 1, 'misses': 4, 'evictions': 1, 'clips': 3, 'pinned': 1, 'bytes': 3 * clip_bytes}
+            if any(stats[name] != value for name, value in expected.items()):
+                logger.error(f"Wrong cache stats: {stats}")
+                return False
+            
+            # Shrinking the budget evicts down to it but keeps the pinned clip
+            cache.set_budget(clip_bytes)
+            if cache._cache_key(paths['a']) not in cache._cache or cache.stats()['bytes'] != clip_bytes:
+                logger.error(f"Pinned clip was evicted: {cache.stats()}")
+                return False
+        
+        logger.info("Cache budget: OK")
+        return True
+    
+    except Exception as e:
+        logger.error(f"Cache budget test failed: {e}")
+        return False
+
+
+def test_single_flight():
+    """Test that concurrent requests for one clip decode it once."""
+    logger.info("Testing single-flight loading...")
+    
+    try:
+        import tempfile
+        import threading
+        import time
+        import numpy as np
+        from src.audio import AudioCache
+        from src.render import write_wav
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / 'shared.wav')
+            write_wav(path, np.zeros((4800, 2), dtype=np.float32), 48000)
+            cache = AudioCache()
+            cache.mixer.samplerate = 48000
+            
+            decodes = []
+            decode_file = cache._decode_file
+            
+            def counting_decode(*args):
+                decodes.append(args)
+                time.sleep(0.05)  # keep the load in flight while others arrive
+                return decode_file(*args)
+            
+            cache._decode_file = counting_decode
+            start = threading.Barrier(9)
+            clips = []
+            
+            def load():
+                start.wait()
+                clips.append(cache.load_audio_file(path))
+            
+            threads = [threading.Thread(target=load) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            start.wait()
+            futures = [cache.preload_async(path) for _ in range(8)]
+            for thread in threads:
+                thread.join()
+            clips.extend(future.result() for future in futures)
+            cache.stop_all()
+            
+            if len(decodes) != 1:
+                logger.error(f"Clip decoded {len(decodes)} times for 16 requests")
+                return False
+            if len(clips) != 16 or any(clip is not clips[0] for clip in clips) or clips[0] is None:
+                logger.error("Requests did not all receive the same clip")
+                return False
+        
+        logger.info("Single-flight loading: OK")
+        return True
+    
+    except Exception as e:
+        logger.error(f"Single-flight test failed: {e}")
+        return False
+
+
+def test_wav_formats():
+    """Test that 8-bit and 24-bit WAVs are normalized to float32 correctly."""
+    logger.info("Testing WAV sample formats...")
+    
+    try:
+        import tempfile
+        import wave
+        import numpy as np
+        from src.audio import AudioCache
+        
+        expected = np.array([-1.0, -0.5, 0.0, 0.5], dtype=np.float32)
+        encodings = {
+            1: bytes([0, 64, 128, 192]),
+            3: b''.join(int(v * 2**23).to_bytes(3, 'little', signed=True) for v in expected),
+        }
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = AudioCache()
+            cache.mixer.samplerate = 8000
+            for width, frames in encodings.items():
+                path = Path(tmp) / f'{width * 8}bit.wav'
+                with wave.open(str(path), 'wb') as wav_file:
+                    wav_file.setnchannels(1)
+                    wav_file.setsampwidth(width)
+                    wav_file.setframerate(8000)
+                    wav_file.writeframes(frames)
+                
+                clip = cache.load_audio_file(str(path))
+                if clip is None or not np.allclose(clip.samples[:, 0], expected):
+                    logger.error(f"{width * 8}-bit decode mismatch")
+                    return False
+        
+        logger.info("WAV sample formats: OK")
+        return True
+    
+    except Exception as e:
+        logger.error(f"WAV format test failed: {e}")
+        return False
+
+
+def test_wav_mmap():
+    """Test that large float32 WAVs play straight from a memory map."""
+    logger.info("Testing WAV memory mapping...")
+    
+    try:
+        import mmap
+        import tempfile
+        import numpy as np
+        from src import audio
+        from src.audio import AudioCache
+        from src.render import write_wav
+        
+        rng = np.random.default_rng(5)
+        samples = (rng.standard_normal((48000, 2)) * 0.2).astype(np.float32)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / 'float.wav')
+            write_wav(path, samples, 48000, float32=True)
+            
+            mapped_cache = AudioCache()
+            mapped_cache.mixer.samplerate = 48000
+            mapped_cache.configure({'mmap_threshold_bytes': 64 * 1024})
+            clip = mapped_cache.load_audio_file(path)
+            
+            # ndarray views -> memoryview -> the file's mmap
+            base = clip.samples if clip is not None else None
+            while base is not None and not isinstance(base, mmap.mmap):
+                base = base.obj if isinstance(base, memoryview) else getattr(base, 'base', None)
+            if clip is None or not clip.mapped or base is None:
+                logger.error("Float32 WAV above the threshold was not mapped in place")
+                return False
+            
+            # Decoding copies the samples out and closes its mapping
+            maps = []
+            open_wav_map = audio._open_wav_map
+            def recording_open(file_path):
+                opened = open_wav_map(file_path)
+                maps.append(opened[0])
+                return opened
+            decoded_cache = AudioCache()
+            decoded_cache.mixer.samplerate = 48000
+            decoded_cache.configure({'mmap_threshold_bytes': 1 << 40})
+            audio._open_wav_map = recording_open
+            try:
+                decoded = decoded_cache.load_audio_file(path)
+            finally:
+                audio._open_wav_map = open_wav_map
+            if decoded is None or decoded.mapped or not np.array_equal(clip.samples, decoded.samples):
+                logger.error("Mapped samples differ from a normal decode")
+                return False
+            if len(maps) != 1 or not maps[0].closed:
+                logger.error("Decoded WAV left its memory map open")
+                return False
+        
+        logger.info("WAV memory mapping: OK")
+        return True
+    
+    except Exception as e:
+        logger.error(f"WAV memory mapping test failed: {e}")
+        return False
+
+
+def test_disk_cache():
+    """Test that disk cache entries round-trip and go stale with their source."""
+    logger.info("Testing disk cache...")
+    
+    try:
+        import os
+        import tempfile
+        import numpy as np
+        from src import diskcache
+        from src.audio import AudioCache
+        from src.diskcache import DiskCache
+        from src.render import write_wav
+        
+        samples = np.linspace(-1.0, 1.0, 2000, dtype=np.float32).reshape(-1, 2)
+        with tempfile.TemporaryDirectory() as tmp:
+            source = Path(tmp) / 'clip.raw'
+            source.write_bytes(b'a' * 64)
+            cache = DiskCache(Path(tmp) / 'cache')
+            
+            def load():
+                return cache.load(str(source), 48000, 2)
+            
+            cache.store(str(source), 48000, 2, samples, {'loudness': -20.0})
+            entry = load()
+            if entry is None or not np.array_equal(entry[0], samples) or entry[1]['loudness'] != -20.0:
+                logger.error("Stored entry did not round-trip")
+                return False
+            
+            # A new mtime with the same bytes keeps the entry
+            stat = os.stat(source)
+            os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            if load() is None:
+                logger.error("Touched source invalidated its entry")
+                return False
+            
+            # Same size, different bytes: caught by the content hash
+            cache.store(str(source), 48000, 2, samples)
+            source.write_bytes(b'b' * 64)
+            os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10**9))
+            if load() is not None:
+                logger.error("Changed contents did not invalidate the entry")
+                return False
+            
+            cache.store(str(source), 48000, 2, samples)
+            source.write_bytes(b'b' * 65)
+            if load() is not None:
+                logger.error("Changed size did not invalidate the entry")
+                return False
+            
+            cache.store(str(source), 48000, 2, samples)
+            version = diskcache.CACHE_FORMAT_VERSION
+            diskcache.CACHE_FORMAT_VERSION = version + 1
+            try:
+                if load() is not None:
+                    logger.error("Format version bump did not invalidate the entry")
+                    return False
+            finally:
+                diskcache.CACHE_FORMAT_VERSION = version
+            
+            # Wired through AudioCache: the second cache maps the first's entry
+            wav = Path(tmp) / 'clip.wav'
+            write_wav(str(wav), samples, 48000)
+            for attempt in range(2):
+                audio_cache = AudioCache()
+                audio_cache.mixer.samplerate = 48000
+                audio_cache.set_disk_cache(Path(tmp) / 'cache')
+                clip = audio_cache.load_audio_file(str(wav))
+            if clip is None or not clip.mapped:
+                logger.error("AudioCache did not load its clip from the disk cache")
+                return False
+        
+        logger.info("Disk cache: OK")
+        return True
+    
+    except Exception as e:
+        logger.error(f"Disk cache test failed: {e}")
+        return False
+
+
+def test_resampler():
+    """Test resampling accuracy and that chunked output matches one call."""
+    logger.info("Testing resampler...")
+    
+    try:
+        import numpy as np
+        from src.dsp import Resampler, resample
+        
+        def tones(rate: int, frames: int) -> np.ndarray:
+            t = np.arange(frames) / rate
+            return np.stack([np.sin(2 * np.pi * 1000 * t), 0.5 * np.cos(2 * np.pi * 3000 * t)], axis=1)
+        
+        samples = tones(44100, 44100).astype(np.float32)
+        converted = resample(samples, 44100, 48000)
+        if converted.shape != (48000, 2) or converted.dtype != np.float32:
+            logger.error(f"Wrong resampled shape: {converted.shape} {converted.dtype}")
+            return False
+        # Away from the edges, where the filter sees zeros past the clip
+        error = np.abs(converted - tones(48000, 48000))[500:-500].max()
+        if error > 1e-4:
+            logger.error(f"44.1 -> 48 kHz resampling error too large: {error:.2e}")
+            return False
+        
+        resampler = Resampler(44100, 48000, 2)
+        chunks = []
+        position = 0
+        for frames in [0, 1, 7, 1000, 4096, 333] + [5000] * 7:
+            chunks.append(resampler.process(samples[position:position + frames]))
+            position += frames
+        chunks.append(resampler.process(samples[position:], final=True))
+        if not np.array_equal(np.concatenate(chunks), converted):
+            logger.error("Chunked resampling differs from a whole-buffer call")
+            return False
+        
+        logger.info(f"Resampler: OK (max error {error:.1e})")
+        return True
+    
+    except Exception as e:
+        logger.error(f"Resampler test failed: {e}")
+        return False
+
+
+def test_mixer():
+    """Test that overlapping voices are summed by the mixer."""
+    logger.info("Testing mixer...")
+    
+    try:
+        import numpy as np
+        from src.audio import Mixer, Voice
+        
+        mixer = Mixer(blocksize=4)
+        mixer.add_voice(Voice(np.ones((6, 1), dtype=np.float32)))
+        mixer.add_voice(Voice(np.full((3, 2), 0.5, dtype=np.float32)))
+        
+        out = np.empty((4, 2), dtype=np.float32)
+        mixer.render(out)
+        if not np.allclose(out[:, 0], [1.5, 1.5, 1.5, 1.0]):
+            logger.error(f"Unexpected first block: {out[:, 0]}")
+            return False
+        
+        mixer.render(out)
+        if not np.allclose(out[:, 0], [1.0, 1.0, 0.0, 0.0]) or mixer.active_voices:
+            logger.error(f"Unexpected second block: {out[:, 0]}")
+            return False
+        
+        logger.info("Mixer overlap: OK")
+        return True
+    
+    except Exception as e:
+        logger.error(f"Mixer test failed: {e}")
+        return False
+
+
+def test_polyphony():
+    """Test global and per-key voice limits and stealing policies."""
+    logger.info("Testing polyphony limits...")
+    
+    try:
+        import numpy as np
+        from src.audio import Mixer, Voice
+        
+        def voice(level, key=None):
+            samples = np.full((100, 1), level, dtype=np.float32)
+            return Voice(samples, key=key, envelope=np.array([level], dtype=np.float32))
+        
+        out = np.empty((4, 1), dtype=np.float32)
+        
+        mixer = Mixer(blocksize=4)
+        mixer.set_polyphony(max_voices=2, steal_policy='oldest')
+        for level in (0.1, 0.2, 0.4):
+            mixer.add_voice(voice(level))
+        mixer.render(out)
+        if mixer.active_voices != 2 or not np.isclose(out[0, 0], 0.6):
+            logger.error(f"Oldest stealing failed: {mixer.active_voices} voices, {out[0, 0]}")
+            return False
+        logger.info("Oldest stealing: OK")
+        
+        mixer = Mixer(blocksize=4)
+        mixer.set_polyphony(max_voices=2, steal_policy='quietest')
+        for level in (0.4, 0.1, 0.2):
+            mixer.add_voice(voice(level))
+        mixer.render(out)
+        if not np.isclose(out[0, 0], 0.6):
+            logger.error(f"Quietest stealing failed: {out[0, 0]}")
+            return False
+        logger.info("Quietest stealing: OK")
+        
+        mixer = Mixer(blocksize=4)
+        mixer.set_polyphony(max_voices=8, key_limits={'9': (1, 'retrigger')})
+        mixer.add_voice(voice(0.1, key='1'))
+        mixer.add_voice(voice(0.2, key='9'))
+        mixer.render(out)
+        mixer.add_voice(voice(0.4, key='9'))
+        mixer.render(out)
+        if mixer.active_voices != 2 or not np.isclose(out[0, 0], 0.5):
+            logger.error(f"Retrigger choke failed: {mixer.active_voices} voices, {out[0, 0]}")
+            return False
+        logger.info("Same-key retrigger: OK")
+        
+        return True
+    
+    except Exception as e:
+        logger.error(f"Polyphony test failed: {e}")
+        return False
+
+
+def test_limiter():
+    """Test master gain and that the limiter holds the ceiling."""
+    logger.info("Testing master bus limiter...")
+    
+    try:
+        import numpy as np
+        from src.audio import Mixer, Voice
+        
+        mixer = Mixer(samplerate=48000, blocksize=256)
+        mixer.set_polyphony(max_voices=None)
+        mixer.set_master(0.5, {'ceiling_db': -1.0, 'lookahead_ms': 2.0, 'release_ms': 50.0})
+        rng = np.random.default_rng(0)
+        for _ in range(32):
+            mixer.add_voice(Voice((rng.standard_normal((48000, 2)) * 0.3).astype(np.float32)))
+        
+        out = np.empty((256, 2), dtype=np.float32)
+        peak = 0.0
+        for _ in range(100):
+            mixer.render(out)
+            peak = max(peak, float(np.abs(out).max()))
+        ceiling = 10 ** (-1.0 / 20)
+        if peak > ceiling + 1e-6 or peak < 0.5 * ceiling:
+            logger.error(f"Limiter peak {peak:.4f} vs ceiling {ceiling:.4f}")
+            return False
+        logger.info(f"Limiter ceiling: OK (peak {peak:.4f})")
+        
+        quiet = Mixer(blocksize=4)
+        quiet.set_master(0.5, None)
+        quiet.add_voice(Voice(np.full((4, 1), 0.5, dtype=np.float32)))
+        quiet.render(out[:4])
+        if not np.allclose(out[:4], 0.25):
+            logger.error(f"Master gain not applied: {out[:4, 0]}")
+            return False
+        logger.info("Master gain: OK")
+        return True
+    
+    except Exception as e:
+        logger.error(f"Limiter test failed: {e}")
+        return False
+
+
+def test_loudness():
+    """Test loudness analysis, normalization gain and its disk cache entry."""
+    logger.info("Testing loudness normalization...")
+    
+    try:
+        import tempfile
+        import numpy as np
+        from src.audio import AudioCache, Clip
+        from src.render import write_wav
+        
+        t = np.arange(48000) / 48000
+        tone = (0.1 * np.sin(2 * np.pi * 1000 * t)).astype(np.float32)
+        clip = Clip('tone', np.stack([tone, tone], axis=1), 48000)
+        if abs(clip.loudness['lufs'] + 20.0) > 0.1 or abs(clip.loudness['true_peak_db'] + 20.0) > 0.1:
+            logger.error(f"-20 dBFS 1 kHz tone measured as {clip.loudness}")
+            return False
+        
+        cache = AudioCache()
+        if cache.normalization_gain(clip) != 1.0:
+            logger.error("Normalization applied while disabled")
+            return False
+        cache.configure({'normalize_lufs': -16.0})
+        if abs(20 * np.log10(cache.normalization_gain(clip)) - 4.0) > 0.1:
+            logger.error(f"Expected +4 dB, got {cache.normalization_gain(clip)}")
+            return False
+        cache.configure({'normalize_lufs': 0.0})
+        if abs(20 * np.log10(cache.normalization_gain(clip)) - 12.0) > 0.01:
+            logger.error("Boost was not capped at normalize_max_gain_db")
+            return False
+        cache.configure({'normalize_max_gain_db': 30.0})
+        if 20 * np.log10(cache.normalization_gain(clip)) + clip.loudness['true_peak_db'] > -1.0 + 1e-6:
+            logger.error("Boost pushed the true peak over the ceiling")
+            return False
+        logger.info("Loudness analysis: OK")
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'tone.wav'
+            write_wav(str(path), clip.samples, 48000, float32=True)
+            for _ in range(2):
+                cache = AudioCache()
+                cache.mixer.samplerate = 48000
+                cache.set_disk_cache(Path(tmp) / 'cache')
+                cached = cache.load_audio_file(str(path))
+                if cached is None or cached.loudness != clip.loudness:
+                    logger.error(f"Disk cache loudness mismatch: {cached and cached.loudness}")
+                    return False
+            if not cached.mapped:
+                logger.error("Second load did not come from the disk cache")
+                return False
+        logger.info("Loudness disk cache: OK")
+        return True
+    
+    except Exception as e:
+        logger.error(f"Loudness test failed: {e}")
+        return False
+
+
+def test_trim():
+    """Test that voices skip leading silence and untrimmed keys do not."""
+    logger.info("Testing silence trimming...")
+    
+    try:
+        import tempfile
+        import numpy as np
+        from src.audio import AudioCache, Mixer, Voice
+        from src.render import write_wav
+        
+        samples = np.zeros((4000, 2), dtype=np.float32)
+        samples[1500] = 0.0005  # below -60 dBFS
+        samples[2000:] = 0.5
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'padded.wav'
+            write_wav(str(path), samples, 48000, float32=True)
+            
+            cache = AudioCache()
+            cache.mixer.samplerate = 48000
+            cache.set_disk_cache(Path(tmp) / 'cache')
+            cache.configure({'trim_silence_db': -60.0})
+            cache.configure_keys({'1': {}, '2': {'trim_silence': False}})
+            clip = cache.load_audio_file(str(path))
+            if clip.onset != 2000 or cache.start_frame(clip, '1') != 2000 or cache.start_frame(clip, '2') != 0:
+                logger.error(f"Wrong onset: {clip.onset}")
+                return False
+            if clip.frames != 4000:
+                logger.error("Trimming changed the stored samples")
+                return False
+            
+            cache.configure({'trim_silence_db': -70.0})
+            if clip.onset != 1500:
+                logger.error(f"Onset not updated for the new threshold: {clip.onset}")
+                return False
+            
+            reloaded = AudioCache()
+            reloaded.mixer.samplerate = 48000
+            reloaded.set_disk_cache(Path(tmp) / 'cache')
+            reloaded.configure({'trim_silence_db': -60.0})
+            clip = reloaded.load_audio_file(str(path))
+            if clip.onset != 2000:
+                logger.error("Onset not restored from the disk cache")
+                return False
+        
+        mixer = Mixer(blocksize=4)
+        mixer.set_master(1.0, None)
+        mixer.add_voice(Voice(clip.samples, start=reloaded.start_frame(clip, '1')))
+        out = np.empty((4, 2), dtype=np.float32)
+        mixer.render(out)
+        if not np.allclose(out, 0.5):
+            logger.error("Trimmed voice did not start at the onset")
+            return False
+        
+        logger.info("Silence trimming: OK")
+        return True
+    
+    except Exception as e:
+        logger.error(f"Trim test failed: {e}")
+        return False
+
+
+def test_waveform_peaks():
+    """Test the peak pyramid, its disk cache entry and pad playheads."""
+    logger.info("Testing waveform peaks...")
+    
+    try:
+        import tempfile
+        import numpy as np
+        from src.audio import AudioCache, Mixer, Voice
+        from src.dsp import PeakPyramid
+        from src.render import write_wav
+        
+        rng = np.random.default_rng(3)
+        samples = (rng.standard_normal((48000, 2)) * 0.2).astype(np.float32)
+        samples[30000:30010, 1] = 0.9
+        pyramid = PeakPyramid.from_samples(samples)
+        for pixels in (1, 100, 1000):
+            peaks = pyramid.peaks(pixels)
+            column = 30000 * pixels // 48000
+            if peaks.shape != (pixels, 2) or peaks[column, 1] != np.float32(0.9):
+                logger.error(f"Peak missing at {pixels} pixels")
+                return False
+            if peaks[:, 0].min() != samples.min() or peaks[:, 1].max() != samples.max():
+                logger.error(f"Peaks do not bound the clip at {pixels} pixels")
+                return False
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / 'peaks.wav')
+            write_wav(path, samples, 48000, float32=True)
+            for attempt in range(2):
+                cache = AudioCache()
+                cache.mixer.samplerate = 48000
+                cache.set_disk_cache(Path(tmp) / 'cache')
+                clip = cache.load_audio_file(path)
+            if not isinstance(clip.peaks.data.base, np.memmap):
+                logger.error("Peaks were not restored from the disk cache")
+                return False
+            waveform = cache.waveform(path, 120)
+            if waveform is None or not np.array_equal(waveform, pyramid.peaks(120)):
+                logger.error("Cached waveform differs from the clip's peaks")
+                return False
+        
+        mixer = Mixer(48000, 2, 256)
+        mixer.set_master(1.0, None)
+        mixer.add_voice(Voice(samples, key='1'))
+        out = np.empty((256, 2), dtype=np.float32)
+        for _ in range(94):
+            mixer.render(out)
+        if mixer.playhead('1') != 94 * 256 / 48000 or mixer.playhead('2') is not None:
+            logger.error(f"Wrong playhead: {mixer.playhead('1')}")
+            return False
+        
+        logger.info("Waveform peaks: OK")
+        return True
+    
+    except Exception as e:
+        logger.error(f"Waveform peaks test failed: {e}")
+        return False
+
+
+def test_clip_bank():
+    """Test packing clips into a clip bank and playing them out of it."""
+    logger.info("Testing clip bank...")
+    
+    try:
+        import os
+        import tempfile
+        import numpy as np
+        from src.audio import AudioCache, write_clip_bank
+        from src.dsp import resample
+        from src.render import write_wav
+        
+        rng = np.random.default_rng(4)
+        with tempfile.TemporaryDirectory() as tmp:
+            # The scratch directory stands in for the assets root
+            root = Path(tmp).resolve()
+            paths = []
+            for i, channels in enumerate((1, 2)):
+                path = str(Path(tmp) / f'bank_{i}.wav')
+                write_wav(path, (rng.standard_normal((4000, channels)) * 0.2).astype(np.float32), 48000, float32=True)
+                paths.append(path)
+            
+            source = AudioCache()
+            source.mixer.samplerate = 48000
+            decoded = [source.load_audio_file(path) for path in paths]
+            bank_path = str(Path(tmp) / 'clips.sizbank')
+            relative = [Path(path).relative_to(root).as_posix() for path in paths]
+            write_clip_bank(bank_path, zip(relative, decoded), source.mixer.channels)
+            for path in paths:
+                os.remove(path)  # the bank must not need the sources
+            
+            cache = AudioCache()
+            cache.mixer.samplerate = 48000
+            cache.set_clip_bank(bank_path, root)
+            if sorted(cache.bank_paths()) != relative:
+                logger.error(f"Wrong bank contents: {cache.bank_paths()}")
+                return False
+            for path, original in zip(paths, decoded):
+                clip = cache.load_audio_file(path)
+                if clip is None or not clip.mapped or clip.samples.flags.writeable:
+                    logger.error(f"{path} was not mapped from the bank")
+                    return False
+                if not np.array_equal(clip.samples, original.samples) or clip.onset != original.onset:
+                    logger.error(f"{path} differs from its decoded clip")
+                    return False
+                if cache.is_streamed(path):
+                    logger.error("Bank clips should not stream")
+                    return False
+            
+            # Engines at a rate the bank lacks resample its clips at load
+            other_rate = AudioCache()
+            other_rate.mixer.samplerate = 44100
+            other_rate.set_clip_bank(bank_path, root)
+            for path, original in zip(paths, decoded):
+                clip = other_rate.load_audio_file(path)
+                if clip is None or clip.samplerate != 44100 or clip.mapped:
+                    logger.error(f"{path} was not resampled from the bank")
+                    return False
+                if not np.array_equal(clip.samples, resample(original.samples, 48000, 44100)):
+                    logger.error(f"{path} resampled from the bank differs from a resampled decode")
+                    return False
+                if len(clip.peaks.peaks(8)) != 8 or other_rate.is_streamed(path):
+                    logger.error(f"{path} resampled from the bank lacks peaks or streams")
+                    return False
+        
+        logger.info("Clip bank: OK")
+        return True
+    
+    except Exception as e:
+        logger.error(f"Clip bank test failed: {e}")
+        return False
+
+
+def test_quantize():
+    """Test voices scheduled on the mixer clock and the tempo grid."""
+    logger.info("Testing quantized triggering...")
+    
+    try:
+        import numpy as np
+        from src.audio import AudioCache, Mixer, Voice
+        
+        mixer = Mixer(48000, 2, 256)
+        mixer.set_master(1.0, None)
+        mixer.set_fades(0.0, 0.0)
+        click = np.zeros((16, 1), dtype=np.float32)
+        click[0] = 1.0
+        out = np.empty((256, 2), dtype=np.float32)
+        blocks = []
+        mixer.add_voice(Voice(click, key='8'), at=1000)
+        mixer.add_voice(Voice(click, key='4'), at=300)
+        for block in range(8):
+            if block == 2:
+                mixer.add_voice(Voice(click), at=100)  # already passed
+            mixer.render(out)
+            blocks.append(out[:, 0].copy())
+        starts = list(np.flatnonzero(np.concatenate(blocks)))
+        if starts != [300, 512, 1000] or mixer.clock != 8 * 256:
+            logger.error(f"Scheduled voices started at {starts}")
+            return False
+        
+        cache = AudioCache()
+        cache.mixer.samplerate = 48000
+        cache.configure({'quantize': False, 'bpm': 120, 'quantize_grid': 16})
+        cache.configure_keys({'8': {'quantize': True}})
+        if cache.grid_frames() != 6000 or cache._grid_frame('1') is not None:
+            logger.error("Only the quantized key should wait for the grid")
+            return False
+        frames = [cache.quantize_frame(frame, '8') for frame in (0, 1, 6000, 6001)]
+        if frames != [0, 6000, 6000, 12000] or cache.quantize_frame(6001, '1') != 6001:
+            logger.error(f"Wrong grid lines: {frames}")
+            return False
+        if cache.set_quantize(True, bpm=0):
+            logger.error("A zero tempo was accepted")
+            return False
+        
+        logger.info("Quantized triggering: OK")
+        return True
+    
+    except Exception as e:
+        logger.error(f"Quantized triggering test failed: {e}")
+        return False
+
+
+def test_fades():
+    """Test attack and release ramps on started, stopped and stolen voices."""
+    logger.info("Testing voice fades...")
+    
+    try:
+        import numpy as np
+        from src.audio import Mixer, Voice
+        
+        mixer = Mixer(samplerate=8000, blocksize=16)
+        mixer.set_master(1.0, None)
+        mixer.set_fades(2.0, 2.0)  # 16 frames each
+        voice = Voice(np.ones((1000, 1), dtype=np.float32), key='1')
+        mixer.add_voice(voice)
+        out = np.empty((16, 2), dtype=np.float32)
+        
+        mixer.render(out)
+        attack = out[:, 0].copy()
+        if not (attack[0] < 0.05 and attack[-1] > 0.95 and np.all(np.diff(attack) > 0)):
+            logger.error(f"Bad attack ramp: {attack}")
+            return False
+        mixer.render(out)
+        if not np.allclose(out, 1.0):
+            logger.error("Voice still ramped after the attack")
+            return False
+        
+        voice.stop()
+        mixer.render(out)
+        release = out[:, 0].copy()
+        if not (release[0] > 0.95 and release[-1] < 0.05 and np.all(np.diff(release) < 0)):
+            logger.error(f"Bad release ramp: {release}")
+            return False
+        mixer.render(out)
+        if mixer.active_voices != 0 or np.any(out != 0.0):
+            logger.error("Voice kept playing after its release")
+            return False
+        logger.info("Attack and release: OK")
+        
+        # A stolen voice fades out under the voice that replaced it
+        mixer.set_fades(0.0, 2.0)
+        mixer.set_polyphony(max_voices=1)
+        mixer.add_voice(Voice(np.ones((1000, 1), dtype=np.float32)))
+        mixer.render(out)
+        mixer.add_voice(Voice(np.full((1000, 1), 2.0, dtype=np.float32)))
+        mixer.render(out)
+        if not np.allclose(out[:, 0], 2.0 + release, atol=1e-6) or mixer.active_voices != 1:
+            logger.error(f"Stolen voice did not release: {out[:, 0]}")
+            return False
+        logger.info("Voice steal release: OK")
+        
+        # Fades may change while the audio thread renders ramps
+        import threading
+        mixer.set_polyphony(max_voices=8)
+        done = threading.Event()
+        def change_fades():
+            while not done.is_set():
+                mixer.set_fades(1.0, 4.0)
+                mixer.set_fades(4.0, 1.0)
+        changer = threading.Thread(target=change_fades)
+        changer.start()
+        try:
+            for block in range(2000):
+                voice = Voice(np.ones((64, 1), dtype=np.float32))
+                mixer.add_voice(voice)
+                mixer.render(out)
+                voice.stop()
+                mixer.render(out)
+        finally:
+            done.set()
+            changer.join()
+        logger.info("Fade changes during playback: OK")
+        return True
+    
+    except Exception as e:
+        logger.error(f"Fade test failed: {e}")
+        return False
+
+
+def test_streaming():
+    """Test that a streamed clip matches the fully decoded clip."""
+    logger.info("Testing streaming voices...")
+    
+    try:
+        import time
+        import numpy as np
+        from src.audio import AudioCache, StreamingVoice, STREAM_BUFFER_FRAMES
+        
+        cache = AudioCache()
+        cache.mixer.samplerate = 48000
+        clip = cache.load_audio_file('assets/audio/startup_swamp_izzo.wav')
+        voice = StreamingVoice(clip.path, 48000, clip.channels)
+        
+        blocks = []
+        while not voice.finished:
+            chunk = voice.read(512)
+            if len(chunk):
+                blocks.append(chunk.copy())
+            else:
+                time.sleep(0.001)
+        streamed = np.concatenate(blocks)
+        
+        if streamed.shape != clip.samples.shape or not np.allclose(streamed, clip.samples, atol=1e-5):
+            logger.error(f"Streamed audio differs: {streamed.shape} vs {clip.samples.shape}")
+            return False
+        if voice._ring.shape[0] != STREAM_BUFFER_FRAMES:
+            logger.error("Streaming buffer grew")
+            return False
+        
+        logger.info(f"Streaming: OK ({len(streamed)} frames)")
+        return True
+    
+    except Exception as e:
+        logger.error(f"Streaming test failed: {e}")
+        return False
+
+
+def test_latency():
+    """Test that a trigger's stages land in the per-key histograms."""
+    logger.info("Testing latency tracking...")
+    
+    try:
+        import numpy as np
+        from src.audio import Mixer, Voice
+        from src.latency import LatencyTracker, STAGES
+        
+        tracker = LatencyTracker()
+        mixer = Mixer(blocksize=4)
+        for _ in range(3):
+            tracker.mark_event('5')
+            tracker.mark_dispatch('5')
+            trace = tracker.begin('5')
+            trace.stamp('lookup')
+            trace.stamp('voice_start')
+            voice = Voice(np.ones((4, 1), dtype=np.float32), key='5')
+            voice.trace = trace
+            mixer.add_voice(voice)
+            mixer.render(np.empty((4, 2), dtype=np.float32))
+        
+        stages = tracker.summary().get('5', {})
+        if set(stages) != set(STAGES) or stages['output']['count'] != 3:
+            logger.error(f"Unexpected latency summary: {stages}")
+            return False
+        if not stages['event']['p50'] <= stages['output']['p50'] <= stages['output']['p99']:
+            logger.error(f"Latency percentiles out of order: {stages}")
+            return False
+        
+        for line in tracker.format_summary():
+            logger.info(line)
+        return True
+    
+    except Exception as e:
+        logger.error(f"Latency test failed: {e}")
+        return False
+
+
+def test_bounce():
+    """Test that an offline render places triggers sample-accurately."""
+    logger.info("Testing offline bounce...")
+    
+    try:
+        import tempfile
+        import numpy as np
+        from src.audio import AudioCache
+        from src.config import Config
+        from src.render import render_triggers, write_wav
+        
+        config = Config()
+        cache = AudioCache()
+        cache.mixer.samplerate = 44100
+        clip = cache.load_audio_file(config.get_key_config('1')['clips'][0])
+        
+        # Quiet enough that the master limiter leaves the mix untouched
+        triggers = [{'time': 0.5, 'key': '1'}, {'time': 0.75, 'key': '1', 'gain': 0.05}]
+        samples, rate = render_triggers(triggers, config, cache, blocksize=100)
+        start, second = 22050, 33075
+        expected = np.zeros((second + clip.frames, 2), dtype=np.float32)
+        expected[start:start + clip.frames] += clip.samples
+        expected[second:] += 0.05 * clip.samples
+        if rate != 44100 or not np.allclose(samples, expected, atol=1e-6):
+            logger.error(f"Bounce mismatch: {samples.shape} vs {expected.shape}")
+            return False
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'bounce.wav'
+            write_wav(str(path), samples, rate, float32=True)
+            written = cache.load_audio_file(str(path))
+            if written is None or not np.allclose(written.samples, samples):
+                logger.error("Bounced WAV did not round-trip")
+                return False
+        
+        logger.info(f"Offline bounce: OK ({len(samples)} frames)")
+        return True
+    
+    except Exception as e:
+        logger.error(f"Bounce test failed: {e}")
+        return False
+
+
+def test_backends():
+    """Test backend selection and the headless null and file sinks."""
+    logger.info("Testing audio backends...")
+    
+    try:
+        import os
+        import tempfile
+        import time
+        import wave
+        import numpy as np
+        from src.audio import Mixer, Voice
+        from src.backends import BACKEND_ENV_VAR, FileBackend, NullBackend, create_backend
+        
+        previous = os.environ.pop(BACKEND_ENV_VAR, None)
+        try:
+            if not isinstance(create_backend('null'), NullBackend):
+                logger.error("null backend not selected")
+                return False
+            os.environ[BACKEND_ENV_VAR] = 'file:override.wav'
+            backend = create_backend('null')
+            if not isinstance(backend, FileBackend) or backend.file_path != 'override.wav':
+                logger.error("Environment override not applied")
+                return False
+        finally:
+            os.environ.pop(BACKEND_ENV_VAR, None)
+            if previous is not None:
+                os.environ[BACKEND_ENV_VAR] = previous
+        logger.info("Backend selection: OK")
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'sink.wav'
+            mixer = Mixer(samplerate=8000, blocksize=80, backend=FileBackend(str(path)))
+            mixer.add_voice(Voice(np.full((400, 1), 0.5, dtype=np.float32)))
+            if not mixer.start():
+                logger.error("File backend did not start")
+                return False
+            time.sleep(0.2)
+            stats = mixer.backend.stats()
+            mixer.close()
+            
+            with wave.open(str(path), 'rb') as wav_file:
+                frames = np.frombuffer(wav_file.readframes(wav_file.getnframes()), dtype='<i2')
+            if stats['blocks'] == 0 or stats['blocksize'] != 80 or np.count_nonzero(frames) != 400 * 2:
+                logger.error(f"Unexpected file sink output: {stats}, {np.count_nonzero(frames)} samples")
+                return False
+        
+        logger.info(f"File sink: OK (mixer load {stats['load']:.4f})")
+        return True
+    
+    except Exception as e:
+        logger.error(f"Backend test failed: {e}")
+        return False
+
+
+def test_blocksize_controller():
+    """Test that the adaptive block size shrinks with headroom and grows on xruns."""
+    logger.info("Testing adaptive block size...")
+    
+    try:
+        from src.backends import BlocksizeController
+        
+        controller = BlocksizeController(256, 48000, min_blocksize=64, max_blocksize=1024)
+        
+        def play(seconds, load=0.05, xrun_every=0):
+            changes = []
+            blocks = int(seconds * 48000 / controller.blocksize)
+            for i in range(blocks):
+                period = controller.blocksize / 48000
+                xrun = bool(xrun_every) and i % xrun_every == 0
+                size = controller.update(controller.blocksize, load * period, xrun)
+                if size is not None:
+                    changes.append(size)
+            return changes
+        
+        if play(31.0) != [128]:
+            logger.error("Block size did not shrink after a clean run")
+            return False
+        if play(0.2, xrun_every=50) != [256]:
+            logger.error("Block size did not grow after repeated xruns")
+            return False
+        if play(120.0) or play(120.0, load=0.5):
+            logger.error("Block size changed back to a size that dropped out")
+            return False
+        if play(2.0, xrun_every=20) != [512, 1024] or play(2.0, xrun_every=20):
+            logger.error("Block size grew past its maximum")
+            return False
+        
+        logger.info("Adaptive block size: OK")
+        return True
+    
+    except Exception as e:
+        logger.error(f"Adaptive block size test failed: {e}")
+        return False
+
+
+def test_realtime_allocations():
+    """Test that steady-state mixer blocks allocate nothing."""
+    logger.info("Testing real-time allocations...")
+    
+    try:
+        import numpy as np
+        from src.audio import DEFAULT_LIMITER_SETTINGS, Mixer, Voice
+        from src.backends import NullBackend
+        from src.rtaudit import audit_mixer
+        
+        rng = np.random.default_rng(0)
+        stereo = (rng.standard_normal((48000 * 30, 2)) * 0.3).astype(np.float32)
+        mono = (rng.standard_normal((48000 * 30, 1)) * 0.3).astype(np.float32)
+        
+        # Quiet and limited mixes, mono and stereo voices, ramps, master
+        # gain and adaptive block size accounting all in play
+        for level in (0.1, 2.0):
+            mixer = Mixer(48000, 2, 256)
+            mixer.set_master(0.8, dict(DEFAULT_LIMITER_SETTINGS))
+            mixer.set_fades(5.0, 10.0)
+            mixer.adaptive_blocksize = (64, 2048)
+            for i in range(8):
+                clip = mono if i % 3 == 0 else stereo
+                mixer.add_voice(Voice(clip, gain=level * (1.0 if i == 1 else 0.5 + i / 10), start=i * 1000))
+            
+            result = audit_mixer(mixer, blocks=5000, backend=NullBackend())
+            if result['allocating_calls']:
+                logger.error(f"Mixer blocks allocated at level {level}: {result}")
+                return False
+            if mixer.active_voices != 8 or (level > 1.0) != (mixer.limiter.gain < 1.0):
+                logger.error(f"Audit did not render the expected mix at level {level}")
+                return False
+        
+        logger.info("Real-time allocations: OK")
+        return True
+    
+    except Exception as e:
+        logger.error(f"Real-time allocation test failed: {e}")
+        return False
+
+
+def test_shared_bank():
+    """Test that a clip decoded by one cache is shared, not copied, by another."""
+    logger.info("Testing shared sample bank...")
+    
+    try:
+        import os
+        import tempfile
+        import numpy as np
+        from src.audio import AudioCache
+        from src.render import write_wav
+        
+        name = f"sizt{os.getpid() % 100000}"
+        samples = np.full((4000, 2), 0.25, dtype=np.float32)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'shared.wav'
+            write_wav(str(path), samples, 48000)
+            
+            publisher = AudioCache()
+            publisher.mixer.samplerate = 48000
+            publisher.configure({'shared_bank': name})
+            attacher = AudioCache()
+            attacher.mixer.samplerate = 48000
+            attacher.configure({'shared_bank': name})
+            try:
+                published = publisher.load_audio_file(str(path))
+                attached = attacher.load_audio_file(str(path))
+                bank = attacher.stats()['shared_bank']
+                if (bank['clips'], bank['published'], bank['attached']) != (1, 0, 1):
+                    logger.error(f"Clip was not attached from the bank: {bank}")
+                    return False
+                if not attached.mapped or attached.samples.flags.writeable:
+                    logger.error("Attached clip is not a read-only shared view")
+                    return False
+                if not np.allclose(attached.samples, published.samples, atol=1e-4):
+                    logger.error("Attached clip differs from the published one")
+                    return False
+                
+                # Both caches must be reading the same pages
+                bank = publisher._shared_bank
+                segment = bank._segments[bank._published[0]]
+                offset = published.samples.ctypes.data - np.frombuffer(segment.buf, np.uint8).ctypes.data
+                writable = np.ndarray(published.samples.shape, np.float32, segment.buf, offset)
+                writable[0, 0] = 0.5
+                if attached.samples[0, 0] != 0.5:
+                    logger.error("Attached clip is a copy")
+                    return False
+                del writable
+            finally:
+                publisher._shared_bank.unlink()
+            
+            # Clips served from a warm disk cache, and large clips decoded
+            # into it, are published too
+            import soundfile as sf
+            flac = Path(tmp) / 'shared.flac'
+            sf.write(str(flac), samples, 48000)
+            cache_dir = Path(tmp) / 'cache'
+            warm = AudioCache()
+            warm.mixer.samplerate = 48000
+            warm.set_disk_cache(cache_dir)
+            warm.load_audio_file(str(path))
+            caches = []
+            for shared_bank, disk in ((True, True), (True, False)):
+                cache = AudioCache()
+                cache.mixer.samplerate = 48000
+                cache.configure({'shared_bank': name, 'mmap_threshold_bytes': 1})
+                if disk:
+                    cache.set_disk_cache(cache_dir)
+                caches.append(cache)
+            try:
+                for clip_path in (path, flac):
+                    caches[0].load_audio_file(str(clip_path))
+                    attached = caches[1].load_audio_file(str(clip_path))
+                    if attached is None or not attached.mapped:
+                        logger.error(f"{clip_path.name} was not attached from the bank")
+                        return False
+                stats = [cache.stats()['shared_bank'] for cache in caches]
+                if (stats[0]['published'], stats[1]['attached'], stats[1]['published']) != (2, 2, 0):
+                    logger.error(f"Disk cache hits or large decodes were not published: {stats}")
+                    return False
+            finally:
+                for cache in caches:
+                    cache._shared_bank.unlink()
+            
+            # A segment left half-written by a dead publisher is reclaimed
+            # at once; one a live process is still writing is waited for
+            # only once
+            import subprocess
+            import sys
+            import time
+            from src import sharedbank
+            
+            dead = subprocess.Popen([sys.executable, '-c', 'pass'])
+            dead.wait()
+            bank = sharedbank.SharedBank(name)
+            stuck = []
+            try:
+                for samplerate, pid in ((48000, dead.pid), (44100, os.getpid())):
+                    segment_name = bank._segment_name(bank._digest(str(path), samplerate, 2))
+                    segment = sharedbank._create_segment(segment_name, 4096)
+                    sharedbank._SEGMENT_HEADER.pack_into(
+                        segment.buf, 0, sharedbank._SEGMENT_MAGIC, sharedbank._STATE_WRITING, 0, 0, 2, 64, pid
+                    )
+                    stuck.append(segment)
+                started = time.perf_counter()
+                reclaimed = bank.store(str(path), 48000, 2, samples)
+                if reclaimed is None or time.perf_counter() - started > 0.5:
+                    logger.error("Abandoned segment was not reclaimed")
+                    return False
+                if bank.load(str(path), 48000, 2) is None:
+                    logger.error("Reclaimed clip cannot be attached")
+                    return False
+                
+                wait = sharedbank.PUBLISH_WAIT_SECONDS
+                sharedbank.PUBLISH_WAIT_SECONDS = 0.1
+                try:
+                    first = bank.store(str(path), 44100, 2, samples)
+                    started = time.perf_counter()
+                    second = bank.store(str(path), 44100, 2, samples)
+                finally:
+                    sharedbank.PUBLISH_WAIT_SECONDS = wait
+                if first is not None or second is not None or time.perf_counter() - started > 0.05:
+                    logger.error("Clip being published elsewhere was waited for twice")
+                    return False
+            finally:
+                bank.unlink()
+                for segment in stuck:
+                    try:
+                        segment.unlink()
+                    except FileNotFoundError:
+                        pass
+                    segment.close()
+        
+        logger.info("Shared sample bank: OK")
+        return True
+    
+    except Exception as e:
+        logger.error(f"Shared bank test failed: {e}")
+        return False
+
+
+def test_engine_process():
+    """Test triggering clips in an engine running in a child process."""
+    logger.info("Testing engine process...")
+    
+    try:
+        import tempfile
+        import time
+        import numpy as np
+        from src.engine import EngineProcess
+        from src.latency import get_latency_tracker
+        from src.render import write_wav
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / 'engine.wav')
+            write_wav(path, np.full((24000, 2), 0.25, dtype=np.float32), 48000)
+            
+            engine = EngineProcess({'backend': 'null', 'samplerate': 48000}, {'1': {'gain': 0.5}})
+            if not engine.start():
+                logger.error("Engine process did not start")
+                return False
+            try:
+                if engine.preload_many([path, path]) != {path: True}:
+                    logger.error("Clip was not preloaded in the engine")
+                    return False
+                
+                tracker = get_latency_tracker()
+                tracker.mark_event('1')
+                tracker.mark_dispatch('1')
+                if not engine.play_audio(path, key='1'):
+                    logger.error("Trigger was not sent")
+                    return False
+                time.sleep(0.1)
+                
+                # Playheads never wait for the engine: the first query
+                # answers from the (empty) previous result
+                started = time.perf_counter()
+                engine.playheads(['1', '2'])
+                if time.perf_counter() - started > 0.01:
+                    logger.error("Playhead query blocked the caller")
+                    return False
+                time.sleep(0.05)
+                playheads = engine.playheads(['1', '2'])
+                if not 0.0 < (playheads['1'] or 0.0) < 1.0 or playheads['2'] is not None:
+                    logger.error(f"Wrong playheads from the engine: {playheads}")
+                    return False
+                
+                # Nor do waveforms: the first call sends one query and the
+                # answer is returned once it has arrived
+                started = time.perf_counter()
+                if engine.waveform(path, 64) is not None:
+                    logger.error("Waveform answered before the engine replied")
+                    return False
+                engine.waveform(path, 64)
+                if time.perf_counter() - started > 0.01 or len(engine._waveform_queries) > 1:
+                    logger.error("Waveform query blocked or was sent twice")
+                    return False
+                time.sleep(0.05)
+                peaks = engine.waveform(path, 64)
+                if peaks is None or peaks.shape != (64, 2) or engine._waveform_queries:
+                    logger.error(f"Wrong waveform from the engine: {peaks}")
+                    return False
+                time.sleep(0.5)
+                
+                stats = engine.stats()
+                if stats['cache']['clips'] != 1 or not stats['backend']['blocks']:
+                    logger.error(f"Engine did not render the clip: {stats}")
+                    return False
+                if not any(line.startswith('Key 1: 1 triggers') for line in stats['latency']):
+                    logger.error(f"Trigger latency not measured from the key press: {stats['latency']}")
+                    return False
+                time.sleep(0.05)
+                if engine._calls:
+                    logger.error(f"Calls left unanswered: {list(engine._calls)}")
+                    return False
+            finally:
+                engine.stop_all()
+            if engine.running or engine.play_audio(path):
+                logger.error("Engine still accepting triggers after stop_all()")
+                return False
+        
+        logger.info("Engine process: OK")
+        return True
+    
+    except Exception as e:
+        logger.error(f"Engine process test failed: {e}")
+        return False
+
+
 def test_hotkeys():
     """Test hotkey module initialization."""
     logger.info("Testing hotkeys module...")
@@ -170,14 +1512,12 @@ def test_ui():
     
     try:
         from PySide6.QtWidgets import QApplication
-        from src.config import Config
         from src.ui import SoundboardWindow
         
         # Create app instance if needed
         app = QApplication.instance() or QApplication([])
         
-        config = Config()
-        window = SoundboardWindow(config)
+        window = SoundboardWindow(Path(__file__).resolve().parent / 'assets')
         logger.info("SoundboardWindow created: OK")
         
         # Check buttons created
@@ -202,6 +1542,30 @@ def main():
         ("Assets", test_assets),
         ("Configuration", test_config),
         ("Audio Module", test_audio),
+        ("Decoder", test_decoder),
+        ("Cache Budget", test_cache_budget),
+        ("Single-Flight Loading", test_single_flight),
+        ("WAV Formats", test_wav_formats),
+        ("WAV Memory Mapping", test_wav_mmap),
+        ("Disk Cache", test_disk_cache),
+        ("Resampler", test_resampler),
+        ("Mixer", test_mixer),
+        ("Polyphony", test_polyphony),
+        ("Limiter", test_limiter),
+        ("Loudness", test_loudness),
+        ("Silence Trim", test_trim),
+        ("Fades", test_fades),
+        ("Streaming", test_streaming),
+        ("Latency", test_latency),
+        ("Bounce", test_bounce),
+        ("Backends", test_backends),
+        ("Adaptive Block Size", test_blocksize_controller),
+        ("Real-Time Allocations", test_realtime_allocations),
+        ("Shared Sample Bank", test_shared_bank),
+        ("Waveform Peaks", test_waveform_peaks),
+        ("Clip Bank", test_clip_bank),
+        ("Quantized Triggering", test_quantize),
+        ("Engine Process", test_engine_process),
         ("Hotkeys Module", test_hotkeys),
         ("UI Module", test_ui),
     ]